@@ -0,0 +1,169 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import contextmanager
+
+from main import build_parser, convert_presentation
+
+# Written to the batch output directory beside the per-deck directories
+SUMMARY_FILENAME = 'batch_summary.json'
+LOG_FILENAME = 'conversion.log'
+
+
+def find_decks(source):
+    """Decks to convert: every .pptx under a directory, or the paths listed in a text file.
+
+    A list file holds one path per line, relative to the file; blank lines
+    and lines starting with # are ignored.
+    """
+    if os.path.isdir(source):
+        return sorted(
+            os.path.join(root, filename)
+            for root, _, filenames in os.walk(source)
+            for filename in filenames
+            if filename.lower().endswith('.pptx') and not filename.startswith('~$')  # Skip PowerPoint lock files
+        )
+    list_dir = os.path.dirname(os.path.abspath(source))
+    with open(source, encoding='utf-8') as deck_list:
+        lines = [line.strip() for line in deck_list]
+    return [os.path.join(list_dir, line) for line in lines if line and not line.startswith('#')]
+
+
+def get_deck_dirs(deck_paths, output_dir):
+    """Output directory of each deck, named after the deck; repeated names get a numbered suffix."""
+    deck_dirs = []
+    used = set()
+    for deck_path in deck_paths:
+        name = os.path.splitext(os.path.basename(deck_path))[0]
+        candidate, number = name, 1
+        while candidate in used:
+            number += 1
+            candidate = f'{name}_{number}'
+        used.add(candidate)
+        deck_dirs.append(os.path.join(output_dir, candidate))
+    return deck_dirs
+
+
+@contextmanager
+def redirect_output(log_path):
+    """Send this process's stdout and stderr, including those of its subprocesses, to a log file."""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved_fds = os.dup(1), os.dup(2)
+    with open(log_path, 'w', encoding='utf-8') as log_file:
+        os.dup2(log_file.fileno(), 1)
+        os.dup2(log_file.fileno(), 2)
+        try:
+            yield
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved_fds[0], 1)
+            os.dup2(saved_fds[1], 2)
+            os.close(saved_fds[0])
+            os.close(saved_fds[1])
+
+
+def convert_deck(deck_path, deck_dir, image_dir, main_args):
+    """Convert one deck in its own output directory; runs in a worker process.
+
+    Conversions write into the current directory (scripts, manifests, manim's
+    media and slides folders, the HTML), so the worker changes into the
+    deck's directory for the duration of the job; each worker runs one job at
+    a time. Returns the deck's entry of the batch summary.
+    """
+    os.makedirs(deck_dir, exist_ok=True)
+    previous_dir = os.getcwd()
+    start = time.perf_counter()
+    error = None
+    try:
+        args = build_parser().parse_args([deck_path, '--image-dir', image_dir, '--no-open', *main_args])
+        if args.segment_store:
+            args.segment_store = os.path.abspath(args.segment_store)  # Shared by every deck's directory
+        os.chdir(deck_dir)
+        with redirect_output(LOG_FILENAME):
+            succeeded = convert_presentation(args)
+        if not succeeded:
+            error = f"conversion failed, see {os.path.join(deck_dir, LOG_FILENAME)}"
+    except SystemExit as exit_error:  # Raised by argparse for invalid options
+        succeeded, error = False, f"invalid options (exit code {exit_error.code})"
+    except Exception as exception:
+        succeeded, error = False, f"{type(exception).__name__}: {exception}"
+    finally:
+        os.chdir(previous_dir)
+    return {'deck': deck_path, 'output_dir': deck_dir, 'succeeded': succeeded,
+            'seconds': time.perf_counter() - start, 'error': error}
+
+
+def convert_decks(deck_paths, output_dir, workers=None, main_args=()):
+    """Convert decks on a pool of `workers` processes, all sharing one image store.
+
+    Each deck gets its own directory under `output_dir`, named after the deck,
+    and the image store is `output_dir`/extracted_images, so an image used by
+    several decks is stored once. Returns the summary entries in deck order.
+    """
+    output_dir = os.path.abspath(output_dir)
+    image_dir = os.path.join(output_dir, 'extracted_images')
+    os.makedirs(image_dir, exist_ok=True)
+    deck_paths = [os.path.abspath(deck_path) for deck_path in deck_paths]
+    deck_dirs = get_deck_dirs(deck_paths, output_dir)
+
+    results = [None] * len(deck_paths)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(convert_deck, deck_path, deck_dir, image_dir, list(main_args)): index
+                   for index, (deck_path, deck_dir) in enumerate(zip(deck_paths, deck_dirs))}
+        for done, future in enumerate(as_completed(futures), 1):
+            result = results[futures[future]] = future.result()
+            status = 'ok' if result['succeeded'] else 'FAILED'
+            print(f"[{done}/{len(deck_paths)}] {status:>6} {result['seconds']:8.2f}s  {result['deck']}")
+    return results
+
+
+def format_summary(results, wall_seconds):
+    """Per-deck status and timing, slowest first, followed by the totals."""
+    lines = [f"{'status':>6} {'seconds':>9}  deck"]
+    for result in sorted(results, key=lambda result: result['seconds'], reverse=True):
+        status = 'ok' if result['succeeded'] else 'FAILED'
+        lines.append(f"{status:>6} {result['seconds']:9.2f}  {result['deck']}")
+        if result['error']:
+            lines.append(f"{'':>17}{result['error']}")
+    succeeded = sum(result['succeeded'] for result in results)
+    lines.append(f"{succeeded} of {len(results)} deck(s) converted in {wall_seconds:.1f}s "
+                 f"({sum(result['seconds'] for result in results):.1f}s of conversion time)")
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Convert many decks with a pool of worker processes. Options not listed here (such as "
+                    "--render, --engine lxml or --quality) are passed on to main.py for every deck.")
+    parser.add_argument('source', help="Directory searched for .pptx files, or a text file listing one deck per line")
+    parser.add_argument('--output-dir', default='batch_output',
+                        help="Directory holding one output directory per deck and the shared image store")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Number of decks converted at the same time (default: the number of CPUs)")
+    args, main_args = parser.parse_known_args()
+
+    if not os.path.exists(args.source):
+        print(f"Error: '{args.source}' does not exist.")
+        exit(1)
+    deck_paths = find_decks(args.source)
+    if not deck_paths:
+        print(f"Error: No .pptx decks found in '{args.source}'.")
+        exit(1)
+
+    print(f"Converting {len(deck_paths)} deck(s) into {args.output_dir}...")
+    start = time.perf_counter()
+    results = convert_decks(deck_paths, args.output_dir, args.workers, main_args)
+    wall_seconds = time.perf_counter() - start
+    print(format_summary(results, wall_seconds))
+
+    summary_path = os.path.join(args.output_dir, SUMMARY_FILENAME)
+    with open(summary_path, 'w', encoding='utf-8') as summary_file:
+        json.dump({'wall_seconds': wall_seconds, 'decks': results}, summary_file, indent=2)
+    print(f"Summary saved to {summary_path}")
+    if not all(result['succeeded'] for result in results):
+        exit(1)
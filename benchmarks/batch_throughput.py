@@ -0,0 +1,63 @@
+"""Wall time of converting many decks one process at a time against batch.py's worker pool.
+
+    python benchmarks/batch_throughput.py --decks 24 --slides 20 --workers 4
+
+Builds `--decks` synthetic decks, then converts them once with a separate
+main.py process per deck, run one after another, and once with batch.py.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+
+sys.path.insert(0, BENCHMARK_DIR)
+
+from synthetic_deck import build_deck  # noqa: E402
+
+
+def time_serial(deck_paths, work_dir):
+    """Seconds to convert the decks with one main.py process per deck, one after another."""
+    start = time.perf_counter()
+    for deck_path in deck_paths:
+        subprocess.run([sys.executable, os.path.join(REPO_DIR, 'main.py'), deck_path], cwd=work_dir,
+                       stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+def time_batch(deck_paths, work_dir, workers):
+    """Seconds to convert the decks with batch.py on `workers` processes."""
+    list_path = os.path.join(work_dir, 'decks.txt')
+    with open(list_path, 'w', encoding='utf-8') as deck_list:
+        deck_list.write('\n'.join(deck_paths))
+    start = time.perf_counter()
+    subprocess.run([sys.executable, os.path.join(REPO_DIR, 'batch.py'), list_path, '--workers', str(workers)],
+                   cwd=work_dir, stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare serial per-deck processes with batch.py.")
+    parser.add_argument('--decks', type=int, default=24)
+    parser.add_argument('--slides', type=int, default=20, help="Slides per deck")
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        deck_paths = []
+        for deck_index in range(args.decks):
+            deck_path = os.path.join(tmp_dir, f'course{deck_index:03d}.pptx')
+            build_deck(deck_path, slides=args.slides, seed=deck_index)
+            deck_paths.append(deck_path)
+
+        for name in ('serial', 'batch'):
+            os.makedirs(os.path.join(tmp_dir, name))
+        serial_seconds = time_serial(deck_paths, os.path.join(tmp_dir, 'serial'))
+        batch_seconds = time_batch(deck_paths, os.path.join(tmp_dir, 'batch'), args.workers)
+        print(f"{args.decks} decks of {args.slides} slides")
+        print(f"  one process per deck: {serial_seconds:.2f}s")
+        print(f"  batch.py, {args.workers} workers: {batch_seconds:.2f}s ({serial_seconds / batch_seconds:.1f}x)")
@@ -0,0 +1,62 @@
+"""Check that the lxml extraction engine returns the same shapes as the python-pptx one.
+
+    python benchmarks/check_extract_parity.py deck1.pptx deck2.pptx ...
+
+Exits with a non-zero status and prints the first differing shapes if any
+slide differs, and reports the extraction time of both engines.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import extract_presentation  # noqa: E402
+
+
+def timed_extract(presentation_path, engine, image_dir):
+    """Extract a deck with one engine, returning (seconds, result)."""
+    start = time.perf_counter()
+    result = extract_presentation(presentation_path, image_dir=image_dir, engine=engine)
+    return time.perf_counter() - start, result
+
+
+def check_deck(presentation_path, image_dir):
+    """Compare both engines on one deck; return True when every slide matches."""
+    pptx_seconds, (pptx_width, pptx_height, pptx_slides) = timed_extract(presentation_path, 'pptx', image_dir)
+    lxml_seconds, (lxml_width, lxml_height, lxml_slides) = timed_extract(presentation_path, 'lxml', image_dir)
+    print(f"{presentation_path}: pptx {pptx_seconds:.3f}s, lxml {lxml_seconds:.3f}s "
+          f"({pptx_seconds / max(lxml_seconds, 1e-9):.1f}x)")
+
+    if (pptx_width, pptx_height) != (lxml_width, lxml_height):
+        print(f"  Frame size differs: {(pptx_width, pptx_height)} != {(lxml_width, lxml_height)}")
+        return False
+    if len(pptx_slides) != len(lxml_slides):
+        print(f"  Slide count differs: {len(pptx_slides)} != {len(lxml_slides)}")
+        return False
+    for slide_index, (pptx_shapes, lxml_shapes) in enumerate(zip(pptx_slides, lxml_slides)):
+        if pptx_shapes != lxml_shapes:
+            print(f"  Slide {slide_index + 1} differs")
+            for pptx_shape, lxml_shape in zip(pptx_shapes, lxml_shapes):
+                if pptx_shape != lxml_shape:
+                    print(f"    pptx: {pptx_shape}\n    lxml: {lxml_shape}")
+                    break
+            else:
+                print(f"    {len(pptx_shapes)} shapes != {len(lxml_shapes)} shapes")
+            return False
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the pptx and lxml extraction engines.")
+    parser.add_argument('presentations', nargs='+', help="PowerPoint files to compare")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as image_dir:
+        results = [check_deck(presentation_path, image_dir) for presentation_path in args.presentations]
+    if not all(results):
+        print("Error: the extraction engines disagree.")
+        exit(1)
+    print("Both engines returned identical shapes.")
@@ -0,0 +1,92 @@
+"""Peak memory of streaming code generation on synthetic decks.
+
+Slides are generated lazily and the code is streamed into a temporary file, so
+the peak should stay flat as the slide count grows:
+
+    python benchmarks/codegen_memory.py --slides 500 1000 5000
+
+An untimed warm-up deck is generated first, so one-time allocations (the
+font advance table, first-use imports, interpreter free lists filling up)
+do not count towards the first measured deck and hide growth. The tuple
+free lists alone take a couple of thousand slides of table rows to fill,
+so by default the warm-up is as large as the largest measured deck.
+Absolute peaks are then compared between the measured decks.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import write_manim_code  # noqa: E402
+from shape_record import ShapeRecord  # noqa: E402
+
+
+def synthetic_slide(slide_index):
+    """Shapes of one synthetic slide: a title, a body text, shapes, a line, an image and a table."""
+    return [
+        ShapeRecord(slide_index, 2, type='text', text=f'Slide {slide_index} title', position=(0.0, 3.0, 0),
+                    dimensions=(9.0, 1.0)),
+        ShapeRecord(slide_index, 3, type='text', text='Body text ' * 20, position=(0.0, 0.0, 0),
+                    dimensions=(9.0, 4.0)),
+        ShapeRecord(slide_index, 4, type='rectangle', position=(-3.0, -2.0, 0), dimensions=(2.0, 1.0)),
+        ShapeRecord(slide_index, 5, type='oval', position=(3.0, -2.0, 0), dimensions=(1.0, 1.0)),
+        ShapeRecord(slide_index, 6, type='line', position=(0.0, -3.0, 0),
+                    dimensions=((-4.0, -3.0, 0), (4.0, -3.0, 0)), color='000000'),
+        ShapeRecord(slide_index, 7, type='image', position=(4.0, 3.0, 0), dimensions=(1.0, 0.5),
+                    image_path='extracted_images/logo.png'),
+        ShapeRecord(slide_index, 8, type='table', position=(0.0, -1.0, 0), dimensions=(6.0, 2.0),
+                    table_data=[[f'{row}{column}' for column in range(6)] for row in range(8)]),
+    ]
+
+
+def measure(slide_count, first_slide=0):
+    """Return (seconds, peak bytes, output bytes) for streaming `slide_count` slides to disk.
+
+    Slides are numbered from `first_slide`, so decks measured one after the
+    other have distinct texts and a cache of earlier decks' content shows up
+    as growth.
+    """
+    slides = (synthetic_slide(slide_index) for slide_index in range(first_slide, first_slide + slide_count))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        output_path = os.path.join(tmp_dir, 'generated.py')
+        tracemalloc.start()
+        start = time.perf_counter()
+        with open(output_path, 'w', encoding='utf-8') as output_file:
+            write_manim_code(output_file, slides, 'WHITE', 13.333, 7.5)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return elapsed, peak, os.path.getsize(output_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure peak memory of streaming code generation.")
+    parser.add_argument('--slides', type=int, nargs='+', default=[500, 1000, 2000, 5000],
+                        help="Slide counts of the synthetic decks")
+    parser.add_argument('--max-growth', type=float, default=1.5,
+                        help="Fail if the peak of the largest deck exceeds the smallest one by this factor")
+    parser.add_argument('--warm-up', type=int, default=None,
+                        help="Slides of the untimed warm-up deck (default: the largest measured deck)")
+    args = parser.parse_args()
+
+    first_slide = args.warm_up if args.warm_up is not None else max(args.slides)
+    measure(first_slide)
+
+    peaks = []
+    print(f"{'slides':>8} {'seconds':>9} {'peak KiB':>10} {'output KiB':>11}")
+    for slide_count in args.slides:
+        elapsed, peak, output_size = measure(slide_count, first_slide)
+        first_slide += slide_count
+        peaks.append(peak)
+        print(f"{slide_count:>8} {elapsed:>9.3f} {peak / 1024:>10.1f} {output_size / 1024:>11.1f}")
+
+    growth = peaks[-1] / peaks[0]
+    print(f"Peak memory growth from {args.slides[0]} to {args.slides[-1]} slides: {growth:.2f}x "
+          f"({peaks[0] / 1024:.1f} to {peaks[-1] / 1024:.1f} KiB)")
+    if growth > args.max_growth:
+        print("Error: peak memory grows with the slide count.")
+        exit(1)
@@ -0,0 +1,66 @@
+"""Size and load time of the generated script, unrolled and with --compact.
+
+    python benchmarks/compact_output.py --slides 500 --shapes 10 --tables 1
+
+Builds a synthetic deck, generates it with main.py in both output modes and
+measures what Python does with the output before manim starts: compiling
+the script, plus reading the slide data file for the compact output. manim
+is not needed, since the script is compiled but not run.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_PATH = os.path.join(os.path.dirname(BENCHMARK_DIR), 'main.py')
+
+sys.path.insert(0, BENCHMARK_DIR)
+
+from synthetic_deck import build_deck  # noqa: E402
+
+
+def load_seconds(script_path, data_path=None, runs=5):
+    """Best time of compiling the script and, if given, parsing its slide data."""
+    with open(script_path, encoding='utf-8') as script:
+        source = script.read()
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        compile(source, script_path, 'exec')
+        if data_path:
+            with open(data_path, encoding='utf-8') as data_file:
+                json.load(data_file)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the unrolled and the compact generated output.")
+    parser.add_argument('--slides', type=int, default=500)
+    parser.add_argument('--shapes', type=int, default=10, help="Rectangles, ovals and text boxes per slide")
+    parser.add_argument('--tables', type=int, default=1, help="Tables per slide")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        deck_path = os.path.join(tmp_dir, 'deck.pptx')
+        build_deck(deck_path, slides=args.slides, shapes=args.shapes, tables=args.tables)
+        script_path = os.path.join(tmp_dir, 'generated_manim_code_for_deck.py')
+        data_path = os.path.join(tmp_dir, 'generated_manim_code_for_deck.slides.json')
+
+        results = {}
+        for mode, extra_args in (('unrolled', []), ('compact', ['--compact'])):
+            subprocess.run([sys.executable, MAIN_PATH, deck_path, '--full-rebuild', *extra_args], cwd=tmp_dir,
+                           stdout=subprocess.DEVNULL, check=True)
+            with open(script_path, encoding='utf-8') as script:
+                lines = sum(1 for _ in script)
+            sizes = [os.path.getsize(script_path)] + ([os.path.getsize(data_path)] if extra_args else [])
+            results[mode] = lines, sum(sizes), load_seconds(script_path, data_path if extra_args else None)
+
+    print(f"{args.slides} slides of {args.shapes} shapes and {args.tables} table(s)")
+    for mode, (lines, size, seconds) in results.items():
+        print(f"  {mode:>8}: {lines:6d} lines of code, {size / 1024:8.1f} KiB in total, loaded in {seconds * 1000:7.1f} ms")
+    print(f"  compact loads {results['unrolled'][2] / results['compact'][2]:.0f}x faster")
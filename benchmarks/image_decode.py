@@ -0,0 +1,77 @@
+"""Time to decode the pictures of a deck at full resolution and as variants for a render quality.
+
+    python benchmarks/image_decode.py --slides 20 --image-size 4000 3000 --quality low
+
+Builds a synthetic deck with a distinct photo-like image on every slide,
+converts it with main.py at the given --quality and then decodes every
+picture the generated script loads, the way ImageMobject does (Pillow,
+converted to RGBA), once from the originals and once from the variants the
+script refers to.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_PATH = os.path.join(os.path.dirname(BENCHMARK_DIR), 'main.py')
+
+# Image paths loaded by a generated script
+LOAD_IMAGE_PATTERN = re.compile(r"load_image\('([^']+)'\)")
+
+
+def decode_seconds(image_paths):
+    """Seconds to decode every image into RGBA pixels."""
+    start = time.perf_counter()
+    for image_path in image_paths:
+        with Image.open(image_path) as image:
+            image.convert('RGBA').load()
+    return time.perf_counter() - start
+
+
+def original_path(image_path):
+    """Stored image a variant was resampled from."""
+    image_dir, filename = os.path.split(image_path)
+    if os.path.basename(image_dir) != 'variants':
+        return image_path
+    stored_dir = os.path.dirname(image_dir)
+    digest = filename.split('.')[0]
+    return next(os.path.join(stored_dir, name) for name in os.listdir(stored_dir) if name.startswith(f'{digest}.'))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare decoding original pictures with their variants.")
+    parser.add_argument('--slides', type=int, default=20)
+    parser.add_argument('--image-size', type=int, nargs=2, default=[4000, 3000], metavar=('WIDTH', 'HEIGHT'))
+    parser.add_argument('--quality', default='low', help="Render quality passed to main.py")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        deck_path = os.path.join(tmp_dir, 'photos.pptx')
+        subprocess.run([sys.executable, os.path.join(BENCHMARK_DIR, 'synthetic_deck.py'), deck_path,
+                        '--slides', str(args.slides), '--shapes', '2', '--images', '1',
+                        '--unique-images', str(args.slides), '--image-size', *map(str, args.image_size),
+                        '--noise-images'], stdout=subprocess.DEVNULL, check=True)
+        start = time.perf_counter()
+        subprocess.run([sys.executable, MAIN_PATH, deck_path, '--quality', args.quality], cwd=tmp_dir,
+                       stdout=subprocess.DEVNULL, check=True)
+        convert_seconds = time.perf_counter() - start
+
+        with open(os.path.join(tmp_dir, 'generated_manim_code_for_photos.py'), encoding='utf-8') as script:
+            variant_paths = [os.path.join(tmp_dir, path) for path in LOAD_IMAGE_PATTERN.findall(script.read())]
+        original_paths = [original_path(path) for path in variant_paths]
+
+        original_seconds = decode_seconds(original_paths)
+        variant_seconds = decode_seconds(variant_paths)
+        print(f"{len(variant_paths)} pictures of {args.image_size[0]}x{args.image_size[1]}, {args.quality} quality "
+              f"(conversion with variants took {convert_seconds:.2f}s)")
+        print(f"  originals: {original_seconds:.3f}s, "
+              f"{sum(map(os.path.getsize, original_paths)) / 2 ** 20:.1f} MiB")
+        print(f"  variants:  {variant_seconds:.3f}s, "
+              f"{sum(map(os.path.getsize, variant_paths)) / 2 ** 20:.1f} MiB "
+              f"({original_seconds / max(variant_seconds, 1e-9):.0f}x faster to decode)")
@@ -0,0 +1,171 @@
+"""End-to-end benchmarks of the converter phases on synthetic decks.
+
+Each deck size is timed phase by phase: loading, extract_shapes_from_slide
+(python-pptx engine), the lxml engine, xml_testing.extract_shape_info,
+generate_manim_code and, with --render, a `manim -ql` render. Results are
+written as JSON; with --baseline, the run fails when a phase is slower than
+the baseline by more than --threshold.
+
+    python benchmarks/run_benchmarks.py --slides 50 200 --output results.json
+    python benchmarks/run_benchmarks.py --slides 50 200 --baseline results.json --threshold 0.2
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pptx import Presentation  # noqa: E402
+
+import main  # noqa: E402
+import pptx_package  # noqa: E402
+from synthetic_deck import build_deck  # noqa: E402
+
+# Phases slower than the baseline by less than this many seconds are never reported
+MIN_REGRESSION_SECONDS = 0.005
+
+
+def best_time(function, repeat):
+    """Fastest of `repeat` runs of `function`, and its last result."""
+    best, result = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def load_xml_testing():
+    """xml_testing needs manim at import time; return None when it is not installed."""
+    try:
+        import xml_testing
+    except ImportError as error:
+        print(f"Skipping extract_shape_info: {error}")
+        return None
+    return xml_testing
+
+
+def benchmark_deck(deck_path, work_dir, repeat, render, xml_testing=None):
+    """Time every phase on one deck and return {phase: seconds}."""
+    image_dir = os.path.join(work_dir, 'extracted_images')
+    os.makedirs(image_dir, exist_ok=True)
+    phases = {}
+
+    phases['load'], presentation = best_time(lambda: Presentation(deck_path), repeat)
+    frame_width, frame_height = main.get_frame_size(presentation)
+
+    def extract_pptx():
+        return [main.extract_shapes_from_slide(slide, frame_width, frame_height, slide_index, image_dir)
+                for slide_index, slide in enumerate(presentation.slides)]
+
+    phases['extract_shapes_from_slide'], slides_shapes_info = best_time(extract_pptx, repeat)
+
+    def extract_lxml():
+        reader = main.open_presentation(deck_path, 'lxml')
+        try:
+            return [reader.extract_slide(slide_index, frame_width, frame_height, image_dir)
+                    for slide_index in range(len(reader.slides))]
+        finally:
+            reader.close()
+
+    phases['extract_slide_xml'], _ = best_time(extract_lxml, repeat)
+
+    if xml_testing is not None:
+        from color_resolver import ThemeResolver
+
+        def extract_xml_testing():
+            with zipfile.ZipFile(deck_path) as package:
+                theme_resolver = ThemeResolver(package)
+                results = []
+                for member in pptx_package.get_slide_members(package):
+                    resolver = theme_resolver.get_resolver(member)
+                    results.append(xml_testing.extract_shape_info(package.read(member), resolver.clr_map,
+                                                                  resolver.theme_colors, resolver))
+                return results
+
+        phases['extract_shape_info'], _ = best_time(extract_xml_testing, repeat)
+
+    phases['generate_manim_code'], manim_code = best_time(
+        lambda: main.generate_manim_code(slides_shapes_info, main.background_color, frame_width, frame_height),
+        repeat)
+
+    if render:
+        script_path = os.path.join(work_dir, 'generated_benchmark.py')
+        with open(script_path, 'w', encoding='utf-8') as script:
+            script.write(manim_code)
+        start = time.perf_counter()
+        result = subprocess.run(['manim', '-ql', script_path, 'GeneratedPresentation'], cwd=work_dir,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if result.returncode == 0:
+            phases['render'] = time.perf_counter() - start
+        else:
+            print(f"Rendering failed with exit code {result.returncode}; render phase skipped")
+
+    return phases
+
+
+def find_regressions(results, baseline, threshold):
+    """List of (deck, phase, baseline seconds, seconds) slower than the baseline by `threshold`."""
+    regressions = []
+    for deck_name, deck_result in results['decks'].items():
+        baseline_phases = baseline.get('decks', {}).get(deck_name, {}).get('phases', {})
+        for phase, seconds in deck_result['phases'].items():
+            baseline_seconds = baseline_phases.get(phase)
+            if baseline_seconds is None:
+                continue
+            if seconds > baseline_seconds * (1 + threshold) and seconds - baseline_seconds > MIN_REGRESSION_SECONDS:
+                regressions.append((deck_name, phase, baseline_seconds, seconds))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the converter phases on synthetic decks.")
+    parser.add_argument('--slides', type=int, nargs='+', default=[50, 200], help="Slide counts of the decks")
+    parser.add_argument('--shapes', type=int, default=8, help="Rectangles, ovals and text boxes per slide")
+    parser.add_argument('--images', type=int, default=1, help="Pictures per slide")
+    parser.add_argument('--tables', type=int, default=1, help="Tables per slide")
+    parser.add_argument('--connectors', type=int, default=2, help="Connectors per slide")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per phase; the fastest is reported")
+    parser.add_argument('--render', action='store_true', help="Also time a manim -ql render")
+    parser.add_argument('--output', help="Write the results to this JSON file")
+    parser.add_argument('--baseline', help="JSON results of an earlier run to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Allowed slowdown over the baseline, as a fraction (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    xml_testing = load_xml_testing()
+    results = {'python': platform.python_version(), 'machine': platform.machine(), 'decks': {}}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for slide_count in args.slides:
+            deck_name = (f"slides={slide_count},shapes={args.shapes},images={args.images},"
+                         f"tables={args.tables},connectors={args.connectors}")
+            deck_path = os.path.join(work_dir, f'synthetic_{slide_count}.pptx')
+            build_deck(deck_path, slide_count, args.shapes, args.images, args.tables, args.connectors)
+
+            phases = benchmark_deck(deck_path, work_dir, args.repeat, args.render, xml_testing)
+            results['decks'][deck_name] = {'slides': slide_count, 'phases': phases}
+            print(deck_name)
+            for phase, seconds in phases.items():
+                print(f"  {phase:<28} {seconds:>9.4f}s  {seconds / slide_count * 1000:>8.3f} ms/slide")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(results, output_file, indent=2)
+        print(f"Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        regressions = find_regressions(results, baseline, args.threshold)
+        for deck_name, phase, baseline_seconds, seconds in regressions:
+            print(f"Regression in {phase} on {deck_name}: {baseline_seconds:.4f}s -> {seconds:.4f}s")
+        if regressions:
+            exit(1)
+        print(f"No phase regressed by more than {args.threshold:.0%} against {args.baseline}")
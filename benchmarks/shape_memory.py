@@ -0,0 +1,62 @@
+"""Memory taken by extracted shapes: ShapeRecords against the per-shape dicts they replaced.
+
+    python benchmarks/shape_memory.py --shapes 10000 50000
+
+Builds the records of a synthetic deck with tracemalloc running and reports
+the bytes per shape of both representations.
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shape_record import ShapeRecord  # noqa: E402
+
+SHAPES_PER_SLIDE = 10
+
+
+def shape_fields(shape_index):
+    """Fields of a synthetic text or rectangle shape, as extraction produces them."""
+    return {
+        'id': shape_index % SHAPES_PER_SLIDE + 2,
+        'type': 'text' if shape_index % 2 else 'rectangle',
+        'position': [shape_index * 0.001, -shape_index * 0.001, 0],
+        'dimensions': (2.0 + shape_index * 0.0001, 1.0),
+        'text': None,
+        'image_path': None,
+    }
+
+
+def build_dicts(shape_count):
+    return [shape_fields(shape_index) for shape_index in range(shape_count)]
+
+
+def build_records(shape_count):
+    return [ShapeRecord(shape_index // SHAPES_PER_SLIDE, **shape_fields(shape_index))
+            for shape_index in range(shape_count)]
+
+
+def measure(build, shape_count):
+    """Bytes still allocated after building `shape_count` shapes."""
+    tracemalloc.start()
+    shapes = build(shape_count)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del shapes
+    return size
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the memory of shape dicts and ShapeRecords.")
+    parser.add_argument('--shapes', type=int, nargs='+', default=[10000, 50000],
+                        help="Numbers of shapes to build")
+    args = parser.parse_args()
+
+    print(f"{'shapes':>8} {'dict B/shape':>13} {'record B/shape':>15} {'saving':>7}")
+    for shape_count in args.shapes:
+        dict_bytes = measure(build_dicts, shape_count)
+        record_bytes = measure(build_records, shape_count)
+        print(f"{shape_count:>8} {dict_bytes / shape_count:>13.0f} {record_bytes / shape_count:>15.0f} "
+              f"{1 - record_bytes / dict_bytes:>7.0%}")
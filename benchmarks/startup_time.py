@@ -0,0 +1,98 @@
+"""Startup time of main.py, checked against a budget.
+
+    python benchmarks/startup_time.py --runs 20 --budget-ms 100
+
+Times `main.py --help` and a codegen-only conversion of a one-slide deck,
+each in a fresh interpreter, against a bare `python -c pass`. It also
+checks which heavy modules each path imports: --help must not load
+python-pptx, lxml, Pillow, manim or manim_slides, and code generation must
+not load manim or manim_slides. Exits with code 1 when the median --help
+time over the bare interpreter exceeds the budget or a forbidden module is
+imported.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+
+sys.path.insert(0, BENCHMARK_DIR)
+
+from synthetic_deck import build_deck  # noqa: E402
+
+HEAVY_MODULES = ['pptx', 'lxml', 'PIL', 'manim', 'manim_slides']
+FORBIDDEN = {
+    'help': {'pptx', 'lxml', 'PIL', 'manim', 'manim_slides'},
+    'codegen': {'manim', 'manim_slides'},
+}
+
+# Runs main.py's command line in this interpreter, then reports the heavy modules it loaded
+LOADED_MODULES_SCRIPT = f"""
+import sys
+sys.path.insert(0, {REPO_DIR!r})
+sys.argv = ['main.py', *sys.argv[1:]]
+import main
+try:
+    main.convert_presentation(main.build_parser().parse_args())
+except SystemExit:
+    pass
+print(' '.join(module for module in {HEAVY_MODULES!r} if module in sys.modules), file=sys.stderr)
+"""
+
+
+def median_seconds(command, runs, cwd=None):
+    """Median wall time of running `command` in a fresh process."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=cwd, stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def loaded_heavy_modules(main_args, cwd):
+    """Heavy modules imported by running main.py with `main_args`."""
+    result = subprocess.run([sys.executable, '-c', LOADED_MODULES_SCRIPT, *main_args], cwd=cwd,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    return set(result.stderr.split())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time main.py's startup and check its imports.")
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--budget-ms', type=float, default=100,
+                        help="Largest accepted median time of --help over a bare interpreter")
+    args = parser.parse_args()
+
+    main_path = os.path.join(REPO_DIR, 'main.py')
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        deck_path = os.path.join(tmp_dir, 'tiny.pptx')
+        build_deck(deck_path, slides=1, shapes=3, images=1)
+
+        bare = median_seconds([sys.executable, '-c', 'pass'], args.runs)
+        help_seconds = median_seconds([sys.executable, main_path, '--help'], args.runs)
+        codegen_seconds = median_seconds([sys.executable, main_path, deck_path, '--full-rebuild'], args.runs,
+                                         cwd=tmp_dir)
+        imports = {
+            'help': loaded_heavy_modules(['--help'], tmp_dir),
+            'codegen': loaded_heavy_modules([deck_path, '--full-rebuild'], tmp_dir),
+        }
+
+    help_ms = (help_seconds - bare) * 1000
+    print(f"bare interpreter: {bare * 1000:7.1f} ms")
+    print(f"main.py --help:   {help_seconds * 1000:7.1f} ms ({help_ms:.1f} ms over bare, budget {args.budget_ms:.0f} ms)")
+    print(f"codegen, 1 slide: {codegen_seconds * 1000:7.1f} ms")
+    failed = help_ms > args.budget_ms
+    for path, loaded in imports.items():
+        forbidden = loaded & FORBIDDEN[path]
+        print(f"{path} imports: {', '.join(sorted(loaded)) or 'none of ' + ', '.join(HEAVY_MODULES)}"
+              + (f" (must not import {', '.join(sorted(forbidden))})" if forbidden else ''))
+        failed = failed or bool(forbidden)
+    if failed:
+        print("Startup budget exceeded.")
+        exit(1)
@@ -0,0 +1,70 @@
+"""Peak memory of a full conversion with and without --stream on media-heavy synthetic decks.
+
+    python benchmarks/stream_memory.py --slides 50 100 200
+
+Every slide of the synthetic decks carries its own incompressible image, so
+the decks grow with the slide count the way training decks full of photos
+do. Each conversion runs main.py in a fresh process and directory, and its
+peak RSS is read from getrusage. With --stream the peak should stay roughly
+flat as the deck grows. The last column re-runs --stream in the same
+directory, so every slide's shapes and code come from the manifest of the
+previous run; that peak should stay flat as well.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+MAIN_PATH = os.path.join(os.path.dirname(BENCHMARK_DIR), 'main.py')
+
+
+def build_media_deck(deck_path, slide_count, image_size):
+    """Build the deck in a separate process.
+
+    A child inherits the peak RSS of the process that forked it, so the
+    images must not be generated in this process.
+    """
+    subprocess.run([sys.executable, os.path.join(BENCHMARK_DIR, 'synthetic_deck.py'), deck_path,
+                    '--slides', str(slide_count), '--shapes', '4', '--images', '1', '--unique-images', str(slide_count),
+                    '--image-size', *map(str, image_size), '--noise-images'], stdout=subprocess.DEVNULL, check=True)
+
+
+def peak_rss_of_run(deck_path, work_dir, extra_args, full_rebuild=True):
+    """Peak RSS in bytes of converting `deck_path` with main.py in its own process."""
+    rebuild_args = ['--full-rebuild'] if full_rebuild else []
+    process = subprocess.Popen([sys.executable, MAIN_PATH, deck_path, *rebuild_args, *extra_args], cwd=work_dir,
+                               stdout=subprocess.DEVNULL)
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        raise RuntimeError(f"Conversion of {deck_path} failed with exit code {process.returncode}")
+    return usage.ru_maxrss if sys.platform == 'darwin' else usage.ru_maxrss * 1024  # KiB except on macOS
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the peak memory of --stream with the default mode.")
+    parser.add_argument('--slides', type=int, nargs='+', default=[50, 100, 200],
+                        help="Slide counts of the synthetic decks")
+    parser.add_argument('--image-size', type=int, nargs=2, default=[800, 600], metavar=('WIDTH', 'HEIGHT'),
+                        help="Pixel size of the image on every slide")
+    args = parser.parse_args()
+
+    modes = [('default', []), ('lxml', ['--engine', 'lxml']), ('stream', ['--stream']), ('warm', ['--stream'])]
+    print(f"{'slides':>7} {'deck MiB':>9} " + ' '.join(f"{name + ' MiB':>12}" for name, _ in modes))
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for slide_count in args.slides:
+            deck_path = os.path.join(tmp_dir, f'deck{slide_count}.pptx')
+            build_media_deck(deck_path, slide_count, args.image_size)
+            peaks = []
+            for name, extra_args in modes:
+                work_dir = os.path.join(tmp_dir, f'{name}{slide_count}')
+                if name == 'warm':  # Reuses the manifest the stream run left in its directory
+                    work_dir = os.path.join(tmp_dir, f'stream{slide_count}')
+                    peaks.append(peak_rss_of_run(deck_path, work_dir, extra_args, full_rebuild=False))
+                    continue
+                os.makedirs(work_dir)
+                peaks.append(peak_rss_of_run(deck_path, work_dir, extra_args))
+            print(f"{slide_count:>7} {os.path.getsize(deck_path) / 2 ** 20:>9.1f} "
+                  + ' '.join(f"{peak / 2 ** 20:>12.1f}" for peak in peaks))
@@ -0,0 +1,173 @@
+"""Build synthetic PowerPoint decks of tunable size with python-pptx.
+
+    python benchmarks/synthetic_deck.py deck.pptx --slides 200 --shapes 10 --images 2 --tables 1 --connectors 2
+    python benchmarks/synthetic_deck.py branded.pptx --slides 200 --branded
+    python benchmarks/synthetic_deck.py animated.pptx --slides 200 --animated-every 10
+"""
+import argparse
+import io
+import random
+
+from PIL import Image
+from pptx import Presentation
+from pptx.oxml import parse_xml
+from pptx.enum.shapes import MSO_CONNECTOR, MSO_SHAPE
+from pptx.util import Emu, Pt
+
+# Layouts of the default template: title only and title and content
+TITLE_ONLY_LAYOUT = 5
+TITLE_AND_CONTENT_LAYOUT = 1
+BLANK_LAYOUT = 6
+
+# Animation timeline of a slide whose shape {shape_id} appears on the first click
+APPEAR_TIMING = """<p:timing xmlns:p="http://schemas.openxmlformats.org/presentationml/2006/main"><p:tnLst><p:par>
+<p:cTn id="1" dur="indefinite" restart="never" nodeType="tmRoot"><p:childTnLst><p:seq concurrent="1" nextAc="seek">
+<p:cTn id="2" dur="indefinite" nodeType="mainSeq"><p:childTnLst><p:par><p:cTn id="3" fill="hold"><p:stCondLst>
+<p:cond delay="indefinite"/></p:stCondLst><p:childTnLst><p:par><p:cTn id="4" fill="hold"><p:stCondLst>
+<p:cond delay="0"/></p:stCondLst><p:childTnLst><p:par><p:cTn id="5" presetID="1" presetClass="entr" presetSubtype="0"
+fill="hold" nodeType="clickEffect"><p:stCondLst><p:cond delay="0"/></p:stCondLst><p:childTnLst><p:set><p:cBhvr>
+<p:cTn id="6" dur="1" fill="hold"><p:stCondLst><p:cond delay="0"/></p:stCondLst></p:cTn><p:tgtEl>
+<p:spTgt spid="{shape_id}"/></p:tgtEl><p:attrNameLst><p:attrName>style.visibility</p:attrName></p:attrNameLst>
+</p:cBhvr><p:to><p:strVal val="visible"/></p:to></p:set></p:childTnLst></p:cTn></p:par></p:childTnLst></p:cTn>
+</p:par></p:childTnLst></p:cTn></p:par></p:childTnLst></p:cTn><p:prevCondLst><p:cond evt="onPrev" delay="0">
+<p:tgtEl><p:sldTgt/></p:tgtEl></p:cond></p:prevCondLst><p:nextCondLst><p:cond evt="onNext" delay="0"><p:tgtEl>
+<p:sldTgt/></p:tgtEl></p:cond></p:nextCondLst></p:seq></p:childTnLst></p:cTn></p:par></p:tnLst></p:timing>"""
+
+
+def make_image(width, height, color):
+    """PNG bytes of a solid-color image."""
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), color).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def make_noise_image(width, height, rng):
+    """PNG bytes of a random-noise image, which does not compress, like photos in media-heavy decks."""
+    buffer = io.BytesIO()
+    Image.frombytes('RGB', (width, height), rng.randbytes(width * height * 3)).save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def add_branding(presentation, logo):
+    """Put a footer band, a caption and a logo on the slide master, so every slide shows them.
+
+    python-pptx cannot add shapes to a master, so they are built on a scratch
+    slide, moved to the master's shape tree and the scratch slide is dropped.
+    """
+    master = presentation.slide_master
+    slide_width, slide_height = presentation.slide_width, presentation.slide_height
+    band_height = slide_height // 12
+    scratch = presentation.slides.add_slide(presentation.slide_layouts[BLANK_LAYOUT])
+    band = scratch.shapes.add_shape(MSO_SHAPE.RECTANGLE, 0, slide_height - band_height, slide_width, band_height)
+    caption = scratch.shapes.add_textbox(Emu(band_height), slide_height - band_height, slide_width // 2, band_height)
+    caption.text_frame.text = "Synthetic Corp - Confidential"
+    picture = scratch.shapes.add_picture(io.BytesIO(logo), slide_width - 2 * band_height, 0, band_height, band_height)
+    _, logo_rid = master.part.get_or_add_image_part(io.BytesIO(logo))
+    picture._element.blipFill.blip.rEmbed = logo_rid
+
+    master_tree = master.shapes._spTree
+    for shape in (band, caption, picture):
+        shape._element._nvXxPr.cNvPr.id = master.shapes._next_shape_id
+        master_tree.append(shape._element)
+
+    slide_ids = presentation.slides._sldIdLst
+    scratch_id = slide_ids[-1]
+    presentation.part.drop_rel(scratch_id.rId)
+    slide_ids.remove(scratch_id)
+
+
+def build_deck(output_path, slides=100, shapes=8, images=1, tables=0, connectors=1, table_size=(6, 4),
+               unique_images=4, seed=0, image_size=(320, 240), noise_images=False, branded=False,
+               animated_every=0):
+    """Write a deck with `slides` slides, each holding the requested number of elements.
+
+    Every slide gets a title plus `shapes` rectangles, ovals and text boxes,
+    `images` pictures drawn from a pool of `unique_images` images (so images
+    repeat across slides like logos do), `tables` tables of `table_size`
+    (rows, columns) and `connectors` straight connectors. Images are solid
+    colors of `image_size` (width, height) pixels, or random noise with
+    `noise_images`. With `branded`, the slide master carries a footer band,
+    a caption and a logo shown on every slide (see add_branding). With
+    `animated_every` N, the title of every Nth slide appears on a click; the
+    other slides are static.
+    """
+    rng = random.Random(seed)
+    presentation = Presentation()
+    slide_width, slide_height = presentation.slide_width, presentation.slide_height
+    if noise_images:
+        image_pool = [make_noise_image(*image_size, rng) for _ in range(max(1, unique_images))]
+    else:
+        image_pool = [make_image(*image_size, (rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+                      for _ in range(max(1, unique_images))]
+
+    if branded:
+        add_branding(presentation, make_image(*image_size, (200, 30, 30)))
+
+    def random_box(max_width=0.3, max_height=0.3):
+        width = int(slide_width * rng.uniform(0.05, max_width))
+        height = int(slide_height * rng.uniform(0.05, max_height))
+        left = rng.randrange(0, slide_width - width)
+        top = rng.randrange(0, slide_height - height)
+        return Emu(left), Emu(top), Emu(width), Emu(height)
+
+    for slide_index in range(slides):
+        layout = presentation.slide_layouts[TITLE_ONLY_LAYOUT if slide_index % 2 else TITLE_AND_CONTENT_LAYOUT]
+        slide = presentation.slides.add_slide(layout)
+        slide.shapes.title.text = f"Slide {slide_index + 1}"
+        if animated_every and slide_index % animated_every == 0:
+            slide.element.append(parse_xml(APPEAR_TIMING.format(shape_id=slide.shapes.title.shape_id)))
+
+        for shape_index in range(shapes):
+            kind = shape_index % 3
+            if kind == 0:
+                shape = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, *random_box())
+                shape.text = f"Box {shape_index}"
+            elif kind == 1:
+                slide.shapes.add_shape(MSO_SHAPE.OVAL, *random_box())
+            else:
+                text_box = slide.shapes.add_textbox(*random_box())
+                text_box.text_frame.text = f"Text {slide_index}.{shape_index}\nSecond line"
+
+        for image_index in range(images):
+            image = io.BytesIO(image_pool[rng.randrange(len(image_pool))])
+            slide.shapes.add_picture(image, *random_box())
+
+        for _ in range(tables):
+            rows, columns = table_size
+            table = slide.shapes.add_table(rows, columns, *random_box(0.6, 0.5)).table
+            for row in range(rows):
+                for column in range(columns):
+                    cell = table.cell(row, column)
+                    cell.text = f"{row * column}"
+                    cell.text_frame.paragraphs[0].runs[0].font.size = Pt(12)
+
+        for _ in range(connectors):
+            left, top, width, height = random_box()
+            slide.shapes.add_connector(MSO_CONNECTOR.STRAIGHT, left, top, left + width, top + height)
+
+    presentation.save(output_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a synthetic PowerPoint deck.")
+    parser.add_argument('output', help="Path of the .pptx file to write")
+    parser.add_argument('--slides', type=int, default=100)
+    parser.add_argument('--shapes', type=int, default=8, help="Rectangles, ovals and text boxes per slide")
+    parser.add_argument('--images', type=int, default=1, help="Pictures per slide")
+    parser.add_argument('--tables', type=int, default=0, help="Tables per slide")
+    parser.add_argument('--connectors', type=int, default=1, help="Connectors per slide")
+    parser.add_argument('--unique-images', type=int, default=4, help="Distinct images the pictures are drawn from")
+    parser.add_argument('--image-size', type=int, nargs=2, default=[320, 240], metavar=('WIDTH', 'HEIGHT'))
+    parser.add_argument('--noise-images', action='store_true',
+                        help="Use incompressible random-noise images instead of solid colors")
+    parser.add_argument('--branded', action='store_true',
+                        help="Put a footer band, a caption and a logo on the slide master")
+    parser.add_argument('--animated-every', type=int, default=0, metavar='N',
+                        help="Animate the title of every Nth slide; the other slides are static")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    build_deck(args.output, args.slides, args.shapes, args.images, args.tables, args.connectors,
+               unique_images=args.unique_images, seed=args.seed, image_size=tuple(args.image_size),
+               noise_images=args.noise_images, branded=args.branded, animated_every=args.animated_every)
+    print(f"Synthetic deck saved to {args.output}")
@@ -0,0 +1,74 @@
+"""Time to wrap text boxes with the cached advance tables, against measuring trial lines.
+
+    python benchmarks/text_wrap.py --paragraphs 5000 --words 40 --width 4
+
+Wraps synthetic paragraphs to a text box `--width` frame units wide, once
+with text_layout.wrap_text and once by measuring every trial line with the
+font (Pillow's getlength, standing in for a Pango layout per trial), and
+checks that both break the lines alike. The first wrap_text call includes
+measuring or loading the font's advance table.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import ImageFont  # noqa: E402
+
+import text_layout  # noqa: E402
+
+# Words the synthetic paragraphs are drawn from
+WORDS = ('the', 'quarterly', 'revenue', 'grew', 'by', '12%', 'across', 'all', 'regions', 'while', 'operating',
+         'costs', 'fell', 'as', 'a', 'result', 'of', 'automation', 'and', 'consolidated', 'infrastructure')
+
+
+def wrap_by_trial_layout(paragraph, width, font):
+    """Greedy wrapping that measures each trial line, as a layout engine asked word by word would."""
+    max_width = (width - text_layout.TEXT_BOX_INSET) * text_layout.FONT_SIZE_PER_EM_UNIT \
+        / text_layout.TEXT_FONT_SIZE * text_layout.ADVANCE_UNITS_PER_EM
+    lines = []
+    line = None
+    for word in paragraph.split(' '):
+        trial = word if line is None else f'{line} {word}'
+        if line is not None and font.getlength(trial) > max_width:
+            lines.append(line)
+            trial = word
+        line = trial
+    lines.append(line)
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare wrapping with advance tables and with trial layouts.")
+    parser.add_argument('--paragraphs', type=int, default=5000)
+    parser.add_argument('--words', type=int, default=40, help="Words per paragraph")
+    parser.add_argument('--width', type=float, default=4.0, help="Text box width in frame units (inches)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    paragraphs = [' '.join(rng.choice(WORDS) for _ in range(args.words)) for _ in range(args.paragraphs)]
+    font_path = text_layout.find_sans_font()
+    font = ImageFont.truetype(font_path, text_layout.ADVANCE_UNITS_PER_EM) if font_path \
+        else ImageFont.load_default(text_layout.ADVANCE_UNITS_PER_EM)
+
+    with tempfile.TemporaryDirectory() as metrics_dir:
+        start = time.perf_counter()
+        text_layout.get_advances(font_path, metrics_dir)
+        wrapped = [text_layout.wrap_text(paragraph, (args.width, 1)) for paragraph in paragraphs]
+        table_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    measured = [wrap_by_trial_layout(paragraph, args.width, font) for paragraph in paragraphs]
+    trial_seconds = time.perf_counter() - start
+
+    same = sum(table == trial for table, trial in zip(wrapped, measured))
+    lines = sum(text.count('\n') + 1 for text in wrapped)
+    print(f"{args.paragraphs} paragraphs of {args.words} words in {args.width:g}-unit boxes "
+          f"({os.path.basename(font_path) or 'built-in font'}), {lines} lines")
+    print(f"  advance tables: {table_seconds * 1000:8.1f} ms")
+    print(f"  trial layouts:  {trial_seconds * 1000:8.1f} ms ({trial_seconds / table_seconds:.0f}x slower)")
+    print(f"  identical line breaks in {same} of {args.paragraphs} paragraphs (kerning is not in the tables)")
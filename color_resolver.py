@@ -0,0 +1,198 @@
+import colorsys
+from functools import lru_cache
+
+from lxml import etree
+
+import pptx_package
+
+ns = {'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
+      'p': 'http://schemas.openxmlformats.org/presentationml/2006/main'}
+
+# Upper bound on memoized (base color, transforms) results; decks reuse a handful of colors
+COLOR_CACHE_SIZE = 4096
+
+# Color transforms applied by this module, in DrawingML element names
+COLOR_TRANSFORMS = ('lumMod', 'lumOff', 'shade', 'tint', 'alpha')
+
+DEFAULT_COLOR = '#FFFFFF'
+
+# Precompiled lookups
+find_clr_scheme_colors = etree.XPath('//a:clrScheme[1]/*', namespaces=ns)
+find_clr_map = etree.XPath('/p:sldMaster/p:clrMap', namespaces=ns)
+find_clr_map_override = etree.XPath('/*/p:clrMapOvr/a:overrideClrMapping', namespaces=ns)
+find_transforms = etree.XPath('a:lumMod | a:lumOff | a:shade | a:tint | a:alpha', namespaces=ns)
+
+
+def _to_linear(c):
+    """sRGB channel (0-1) to linear light."""
+    return c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+
+
+def _to_srgb(c):
+    """Linear light channel (0-1) to sRGB."""
+    return c * 12.92 if c <= 0.0031308 else 1.055 * c ** (1 / 2.4) - 0.055
+
+
+@lru_cache(maxsize=COLOR_CACHE_SIZE)
+def apply_color_transforms(base_color, transforms=()):
+    """Apply DrawingML color transforms to a '#RRGGBB' color in a single pass.
+
+    `transforms` is a tuple of (name, value) pairs in document order, with
+    values in 1/1000 of a percent as stored in the XML (100000 = 100%).
+    lumMod and lumOff act on HSL luminance, shade and tint mix towards black
+    and white in linear RGB, and alpha sets the opacity. Returns the resulting
+    '#RRGGBB' color and its alpha (0-1).
+    """
+    rgb = [int(base_color[i:i + 2], 16) / 255 for i in (1, 3, 5)]
+    alpha = 1.0
+    for name, value in transforms:
+        factor = value / 100000
+        if name in ('lumMod', 'lumOff'):
+            hue, lightness, saturation = colorsys.rgb_to_hls(*rgb)
+            lightness = lightness * factor if name == 'lumMod' else lightness + factor
+            rgb = list(colorsys.hls_to_rgb(hue, min(1.0, max(0.0, lightness)), saturation))
+        elif name == 'shade':
+            rgb = [_to_srgb(_to_linear(c) * factor) for c in rgb]
+        elif name == 'tint':
+            rgb = [_to_srgb(_to_linear(c) * factor + (1 - factor)) for c in rgb]
+        elif name == 'alpha':
+            alpha = factor
+
+    rgb = [max(0, min(255, round(c * 255))) for c in rgb]
+    return '#{:02X}{:02X}{:02X}'.format(*rgb), min(1.0, max(0.0, alpha))
+
+
+def read_color_transforms(color_element):
+    """The (name, value) transforms of a color element, e.g. (('lumMod', 75000),)."""
+    return tuple((etree.QName(child).localname, int(child.get('val'))) for child in find_transforms(color_element))
+
+
+def parse_theme_color_table(theme_xml):
+    """Map of theme color names (dk1, lt1, accent1, ...) to '#RRGGBB' from a theme part."""
+    root = etree.fromstring(theme_xml)
+    theme_colors = {}
+    for color in find_clr_scheme_colors(root):
+        value = color.find('a:srgbClr', ns)
+        if value is not None:
+            theme_colors[etree.QName(color).localname] = f"#{value.get('val').upper()}"
+            continue
+        value = color.find('a:sysClr', ns)
+        if value is not None and value.get('lastClr'):
+            theme_colors[etree.QName(color).localname] = f"#{value.get('lastClr').upper()}"
+    return theme_colors
+
+
+def parse_clr_map(master_xml):
+    """The color map (bg1 -> lt1, tx1 -> dk1, ...) of a slide master part."""
+    clr_map = find_clr_map(etree.fromstring(master_xml))
+    return dict(clr_map[0].attrib) if clr_map else {}
+
+
+class ColorResolver:
+    """Resolves DrawingML colors of one deck to '#RRGGBB' strings.
+
+    The scheme-name-to-color table (theme colors seen through the master's
+    color map) is built once per deck; resolved colors are memoized with a
+    bounded cache so repeated (scheme color, transforms) pairs cost a lookup.
+    """
+
+    def __init__(self, theme_colors, clr_map=None):
+        self.theme_colors = {name: color.upper() for name, color in theme_colors.items()
+                             if isinstance(color, str) and color.startswith('#')}
+        self.clr_map = dict(clr_map or {})
+        self.color_table = dict(self.theme_colors)
+        for scheme_name, theme_name in self.clr_map.items():
+            if theme_name in self.theme_colors:
+                self.color_table[scheme_name] = self.theme_colors[theme_name]
+        self._resolve_cached = lru_cache(maxsize=COLOR_CACHE_SIZE)(self._resolve)
+
+    @classmethod
+    def from_xml(cls, theme_xml, master_xml=None):
+        """Build a resolver from a theme part and, optionally, its slide master part."""
+        return cls(parse_theme_color_table(theme_xml), parse_clr_map(master_xml) if master_xml else None)
+
+    def _resolve(self, scheme_name, transforms):
+        base_color = self.color_table.get(scheme_name, DEFAULT_COLOR)
+        return apply_color_transforms(base_color, transforms)
+
+    def resolve_scheme_color(self, scheme_name, transforms=()):
+        """'#RRGGBB' and alpha of a scheme color name such as 'accent1' or 'tx1'."""
+        return self._resolve_cached(scheme_name, transforms)
+
+    def resolve(self, color_element):
+        """'#RRGGBB' of an a:schemeClr, a:srgbClr or a:sysClr element, or None."""
+        if color_element is None:
+            return None
+        kind = etree.QName(color_element).localname
+        transforms = read_color_transforms(color_element)
+        if kind == 'schemeClr':
+            return self.resolve_scheme_color(color_element.get('val'), transforms)[0]
+        if kind == 'srgbClr':
+            return apply_color_transforms(f"#{color_element.get('val').upper()}", transforms)[0]
+        if kind == 'sysClr' and color_element.get('lastClr'):
+            return apply_color_transforms(f"#{color_element.get('lastClr').upper()}", transforms)[0]
+        return None
+
+    def cache_info(self):
+        """Hit/miss statistics of the resolved-color cache."""
+        return self._resolve_cached.cache_info()
+
+
+class ThemeResolver:
+    """Finds the ColorResolver for each slide of a deck with any number of masters.
+
+    Every slide resolves colors through its own layout -> master chain: the
+    master's theme and color map, overridden by a layout or slide clrMapOvr.
+    Master, layout and theme parts are parsed once and cached by part name,
+    and resolvers are shared by all slides with the same theme and color map.
+    """
+
+    def __init__(self, package):
+        self.package = package  # An open zipfile of the .pptx
+        self._masters = {}  # master part -> (clr_map, theme part)
+        self._layouts = {}  # layout part -> (master part, clr_map override)
+        self._themes = {}  # theme part -> theme colors
+        self._resolvers = {}  # (theme part, color map items) -> ColorResolver
+
+    def _parse(self, member):
+        return etree.fromstring(self.package.read(member))
+
+    @staticmethod
+    def _get_clr_map_override(root):
+        override = find_clr_map_override(root)
+        return dict(override[0].attrib) if override else None
+
+    def _get_master(self, master_member):
+        if master_member not in self._masters:
+            clr_map = find_clr_map(self._parse(master_member))
+            theme_member = pptx_package.get_related_member(self.package, master_member, '/theme')
+            self._masters[master_member] = (dict(clr_map[0].attrib) if clr_map else {}, theme_member)
+        return self._masters[master_member]
+
+    def _get_layout(self, layout_member):
+        if layout_member not in self._layouts:
+            master_member = pptx_package.get_related_member(self.package, layout_member, '/slideMaster')
+            override = self._get_clr_map_override(self._parse(layout_member))
+            self._layouts[layout_member] = (master_member, override)
+        return self._layouts[layout_member]
+
+    def _get_theme_colors(self, theme_member):
+        if theme_member not in self._themes:
+            self._themes[theme_member] = parse_theme_color_table(self.package.read(theme_member)) \
+                if theme_member else {}
+        return self._themes[theme_member]
+
+    def get_resolver(self, slide_member, slide_root=None):
+        """ColorResolver for a slide; pass its parsed XML to avoid parsing it again."""
+        layout_member = pptx_package.get_related_member(self.package, slide_member, '/slideLayout')
+        master_member, layout_override = self._get_layout(layout_member) if layout_member else (None, None)
+        clr_map, theme_member = self._get_master(master_member) if master_member else ({}, None)
+
+        if slide_root is None:
+            slide_root = self._parse(slide_member)
+        clr_map = self._get_clr_map_override(slide_root) or layout_override or clr_map
+
+        key = (theme_member, tuple(sorted(clr_map.items())))
+        if key not in self._resolvers:
+            self._resolvers[key] = ColorResolver(self._get_theme_colors(theme_member), clr_map)
+        return self._resolvers[key]
@@ -0,0 +1,172 @@
+import hashlib
+import math
+import os
+import time
+
+# Magic bytes used to recognise the native format of an image blob
+IMAGE_SIGNATURES = [
+    (b'\x89PNG\r\n\x1a\n', 'png'),
+    (b'\xff\xd8\xff', 'jpg'),
+    (b'GIF87a', 'gif'),
+    (b'GIF89a', 'gif'),
+    (b'BM', 'bmp'),
+    (b'II*\x00', 'tiff'),
+    (b'MM\x00*', 'tiff'),
+    (b'\xd7\xcd\xc6\x9a', 'wmf'),
+]
+
+# Images written by this process, reported by profiling
+write_stats = {'files': 0, 'bytes': 0, 'seconds': 0.0}
+
+
+def image_extension(image_bytes, fallback='png'):
+    """Detect the file extension of an image from its leading bytes."""
+    for signature, ext in IMAGE_SIGNATURES:
+        if image_bytes.startswith(signature):
+            return ext
+    if image_bytes[40:44] == b' EMF':
+        return 'emf'
+    return fallback.lower().lstrip('.') or 'png'
+
+
+def image_filename(image_bytes, fallback_ext='png'):
+    """Content-addressed file name for an image blob: {sha1}.{ext}."""
+    digest = hashlib.sha1(image_bytes).hexdigest()
+    return f"{digest}.{image_extension(image_bytes, fallback_ext)}"
+
+
+def store_image(image_bytes, image_dir, fallback_ext='png'):
+    """Write an image blob once into the store and return its shared path.
+
+    Identical blobs map to the same file, so a logo repeated on every slide is
+    written a single time. Writes go through a temporary file so concurrent
+    writers never expose a partially written image.
+    """
+    image_path = os.path.join(image_dir, image_filename(image_bytes, fallback_ext))
+    if os.path.exists(image_path):
+        return image_path
+
+    start = time.perf_counter()
+    tmp_path = f"{image_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as image_file:
+        image_file.write(image_bytes)
+    os.replace(tmp_path, image_path)
+    write_stats['files'] += 1
+    write_stats['bytes'] += len(image_bytes)
+    write_stats['seconds'] += time.perf_counter() - start
+    return image_path
+
+
+# Frame height in pixels of manim's render qualities, and the flag selecting each one
+QUALITY_PIXEL_HEIGHTS = {'low': 480, 'medium': 720, 'high': 1080, 'production': 1440, 'fourk': 2160}
+QUALITY_FLAGS = {'low': '-ql', 'medium': '-qm', 'high': '-qh', 'production': '-qp', 'fourk': '-qk'}
+
+# Formats whose variants keep the native format; the others are resampled to PNG
+VARIANT_FORMATS = {'png': 'PNG', 'jpg': 'JPEG'}
+
+# Directory of the downsampled variants, inside the image store
+VARIANT_DIR = 'variants'
+
+
+class ImageVariants:
+    """Downsampled copies of stored images, sized for one render quality.
+
+    A picture is drawn at its shape's size on screen, so decoding more pixels
+    than the frame has at that quality is wasted work. `get_path` returns a
+    variant resampled to the shape's on-screen pixel size, or the original
+    when it is not larger than that. Variants are content-addressed like the
+    images themselves ({sha1}.{width}x{height}.{ext}), so each one is written
+    once and reused by later runs and by every shape of that size.
+    """
+
+    def __init__(self, quality, frame_height):
+        self.quality = quality
+        self.pixels_per_unit = QUALITY_PIXEL_HEIGHTS[quality] / frame_height
+        self._image_sizes = {}  # Stored image -> (width, height) in pixels, or None if Pillow cannot read it
+        self._variant_paths = {}  # (stored image, variant size) -> variant path
+        self._resampled = set()  # Stored images this run created variants of
+        self.stats = {'created': 0, 'reused': 0, 'original_bytes': 0, 'variant_bytes': 0}
+
+    def _get_image_size(self, image_path):
+        from PIL import Image, ImageFile  # Pillow is only loaded once a picture is looked at
+
+        if image_path not in self._image_sizes:
+            try:
+                with Image.open(image_path) as image:  # Only reads the header
+                    # WMF and EMF open as stubs: Pillow reads their size but cannot decode them without a handler
+                    decodable = not isinstance(image, ImageFile.StubImageFile)
+                    self._image_sizes[image_path] = image.size if decodable else None
+            except (OSError, Image.DecompressionBombError):
+                self._image_sizes[image_path] = None  # Not an image Pillow can read
+        return self._image_sizes[image_path]
+
+    def get_variant_size(self, image_path, dimensions):
+        """Pixel size to draw the image at for a shape of `dimensions`, or None to use the original."""
+        image_size = self._get_image_size(image_path)
+        if image_size is None:
+            return None
+        # Never upsample: an axis that is not larger than needed keeps its size
+        variant_size = tuple(min(pixels, max(1, math.ceil(length * self.pixels_per_unit)))
+                             for pixels, length in zip(image_size, dimensions))
+        return None if variant_size == image_size else variant_size
+
+    def get_path(self, image_path, dimensions):
+        """Path of the image to draw for a shape of `dimensions` (width, height) in frame units."""
+        variant_size = self.get_variant_size(image_path, dimensions)
+        if variant_size is None:
+            return image_path
+        key = (image_path, variant_size)
+        if key not in self._variant_paths:
+            try:
+                self._variant_paths[key] = self._store_variant(image_path, variant_size)
+            except OSError:  # The header read but the pixels do not decode, e.g. a truncated file
+                self._variant_paths[key] = image_path
+        return self._variant_paths[key]
+
+    def prepare_slide(self, shapes_info):
+        """Make sure the variants of a slide's pictures exist, for code taken from the manifest."""
+        for shape_info in shapes_info:
+            if shape_info.type == 'image' and shape_info.image_path:
+                self.get_path(shape_info.image_path, shape_info.dimensions)
+
+    def _store_variant(self, image_path, variant_size):
+        from PIL import Image
+
+        image_dir, filename = os.path.split(image_path)
+        digest, ext = os.path.splitext(filename)
+        ext = ext.lstrip('.') if ext.lstrip('.') in VARIANT_FORMATS else 'png'
+        variant_dir = os.path.join(image_dir, VARIANT_DIR)
+        variant_path = os.path.join(variant_dir, f"{digest}.{variant_size[0]}x{variant_size[1]}.{ext}")
+        if os.path.exists(variant_path):
+            self.stats['reused'] += 1
+            return variant_path
+
+        os.makedirs(variant_dir, exist_ok=True)
+        with Image.open(image_path) as image:
+            # JPEGs can be decoded straight at a fraction of their size, which is much faster for photos
+            image.draft('RGB', variant_size)
+            if ext == 'jpg' and image.mode not in ('RGB', 'L', 'CMYK'):
+                image = image.convert('RGB')
+            elif ext == 'png' and image.mode not in ('RGB', 'RGBA', 'L', 'LA'):  # Palettes only resize with NEAREST
+                image = image.convert('RGBA')
+            variant = image.resize(variant_size, Image.LANCZOS)
+        tmp_path = f"{variant_path}.{os.getpid()}.tmp"
+        variant.save(tmp_path, VARIANT_FORMATS[ext], **({'quality': 90} if ext == 'jpg' else {}))
+        os.replace(tmp_path, variant_path)
+        self.stats['created'] += 1
+        if image_path not in self._resampled:
+            self._resampled.add(image_path)
+            self.stats['original_bytes'] += os.path.getsize(image_path)
+        self.stats['variant_bytes'] += os.path.getsize(variant_path)
+        return variant_path
+
+    def format_summary(self):
+        """One line on the variants created and reused, or None if no image was downsampled."""
+        if not self.stats['created'] and not self.stats['reused']:
+            return None
+        summary = f"Image variants for {self.quality} quality: {self.stats['created']} created, " \
+                  f"{self.stats['reused']} reused"
+        if self.stats['created']:
+            summary += f" ({self.stats['original_bytes'] / 2 ** 20:.1f} MiB of originals resampled to " \
+                       f"{self.stats['variant_bytes'] / 2 ** 20:.1f} MiB of variants)"
+        return summary
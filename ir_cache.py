@@ -0,0 +1,142 @@
+import os
+import pickle
+
+from shape_record import SHAPE_FIELDS, ShapeRecord
+
+# Leading bytes of an IR file, followed by pickled frames: a header, then one frame per slide
+IR_MAGIC = b'PPTX2MANIM-IR\n'
+IR_VERSION = 1
+
+
+class _PlainUnpickler(pickle.Unpickler):
+    """Unpickler that only accepts plain data, so loading an IR never imports or runs anything."""
+
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"Unexpected object {module}.{name} in IR file")
+
+
+def _plain(value):
+    """Drop int subclasses such as MSO_LINE_DASH_STYLE members, which would pickle as class references."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def get_ir_path(output_path):
+    """The IR is stored beside the generated script."""
+    return f'{os.path.splitext(output_path)[0]}.ir'
+
+
+def get_source_fingerprint(presentation_path):
+    """Size and modification time of the deck; an IR only stands for the file it was extracted from."""
+    stat = os.stat(presentation_path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class IRWriter:
+    """Writes the extracted deck to a binary IR file one slide at a time.
+
+    Each shape is stored as a tuple of its SHAPE_FIELDS values. Use it as a
+    context manager: the IR replaces the previous one when the block
+    completes, and is discarded if the block raises.
+    """
+
+    def __init__(self, ir_path, presentation_path, settings, frame_width, frame_height, slide_count):
+        self.ir_path = ir_path
+        self.tmp_path = f'{ir_path}.tmp'
+        header = {
+            'version': IR_VERSION,
+            'fields': SHAPE_FIELDS,
+            'source': get_source_fingerprint(presentation_path),
+            'settings': settings,
+            'frame_size': (frame_width, frame_height),
+            'slide_count': slide_count,
+        }
+        self.ir_file = open(self.tmp_path, 'wb')
+        self.ir_file.write(IR_MAGIC)
+        pickle.dump(header, self.ir_file, pickle.HIGHEST_PROTOCOL)
+
+    def add_slide(self, shapes):
+        """Append the shapes of the next slide."""
+        rows = [tuple(_plain(getattr(shape, field)) for field in SHAPE_FIELDS) for shape in shapes]
+        pickle.dump(rows, self.ir_file, pickle.HIGHEST_PROTOCOL)
+
+    def record(self, slide_shapes):
+        """Pass the shapes of each slide through, adding them to the IR on the way."""
+        for shapes in slide_shapes:
+            self.add_slide(shapes)
+            yield shapes
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.ir_file.close()
+        if exc_type is not None:
+            os.remove(self.tmp_path)
+            return
+        os.replace(self.tmp_path, self.ir_path)
+
+
+def save_ir(ir_path, presentation_path, settings, frame_width, frame_height, shapes_per_slide):
+    """Write the shapes of every slide to a binary IR file."""
+    with IRWriter(ir_path, presentation_path, settings, frame_width, frame_height,
+                  len(shapes_per_slide)) as ir_writer:
+        for shapes in shapes_per_slide:
+            ir_writer.add_slide(shapes)
+
+
+def _iter_frames(ir_file):
+    while True:
+        try:
+            yield _PlainUnpickler(ir_file).load()
+        except EOFError:
+            return
+
+
+def open_ir(ir_path, presentation_path, settings):
+    """Open an IR file if it is valid for the deck and settings.
+
+    An IR is valid when it has the current version and shape fields, was
+    extracted from a file of the same size and modification time with the
+    same settings, and every image it references still exists. Returns the
+    frame width, frame height, slide count and a lazy iterator over the
+    ShapeRecords of each slide, or None if the IR is missing or invalid.
+    """
+    try:
+        ir_file = open(ir_path, 'rb')
+    except OSError:
+        return None
+
+    try:
+        if ir_file.read(len(IR_MAGIC)) != IR_MAGIC:
+            raise ValueError("not an IR file")
+        header = _PlainUnpickler(ir_file).load()
+        if (header.get('version') != IR_VERSION or tuple(header.get('fields', ())) != SHAPE_FIELDS
+                or header.get('source') != get_source_fingerprint(presentation_path)
+                or header.get('settings') != settings):
+            raise ValueError("outdated IR")
+
+        # Check the images in a first pass, so the slides can then be read lazily
+        slides_offset = ir_file.tell()
+        image_index = SHAPE_FIELDS.index('image_path')
+        slide_count = 0
+        for rows in _iter_frames(ir_file):
+            slide_count += 1
+            if not all(os.path.exists(row[image_index]) for row in rows if row[image_index]):
+                raise ValueError("missing image")
+        if slide_count != header['slide_count']:
+            raise ValueError("truncated IR")
+        ir_file.seek(slides_offset)
+    except (OSError, ValueError, AttributeError, TypeError, KeyError, IndexError, pickle.UnpicklingError,
+            EOFError):
+        ir_file.close()
+        return None
+
+    def iter_slides():
+        with ir_file:
+            for rows in _iter_frames(ir_file):
+                yield [ShapeRecord(*row) for row in rows]
+
+    frame_width, frame_height = header['frame_size']
+    return frame_width, frame_height, header['slide_count'], iter_slides()
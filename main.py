@@ -1,23 +1,29 @@
-import subprocess
+import hashlib
+import json
 import os
-import webbrowser
 import argparse
-from pptx import Presentation
-from pptx.enum.shapes import MSO_SHAPE_TYPE, MSO_AUTO_SHAPE_TYPE
+from contextlib import nullcontext
+from image_store import QUALITY_FLAGS, ImageVariants, store_image
+from ir_cache import IRWriter, get_ir_path, open_ir, save_ir
+from profiling import Profiler, measure_slide
+from shape_record import ShapeRecord, is_static_slide
+from text_layout import FONT_METRICS_DIR, TEXT_FONT_SIZE, get_advances, wrap_text
+from mobject_cache import MOBJECT_CACHE_SIZE, TABLE_CELL_CACHE_SIZE, TABLE_CELL_LIMIT
+from manifest import CachedSlides, ManifestWriter, get_manifest_path, save_manifest, get_slide_hashes, \
+    get_slide_size
 
 # Initialize variables
 
 image_dir = 'extracted_images'  # Directory for storing extracted images
 slides_shapes_info = []  # Store shapes info for all slides
-global_shapes = {}  # Global dictionary to store shapes info with shape_id as key
+global_shapes = {}  # Global dictionary of all shapes keyed by (slide index, shape id)
 background_color = 'WHITE'  # Manim color for background
 
-# Ensure the image directory exists
-if not os.path.exists(image_dir):
-    os.makedirs(image_dir)
+# Presentation opened once per extraction worker process
+_worker_presentation = None
 
 
-def get_start_point_and_end_point(shape):
+def get_start_point_and_end_point(shape, frame_width, frame_height):
     """Get start and end point of a line."""
     start_point = [
         convert_margin_to_points(shape.begin_x) / 72 - frame_width / 2,
@@ -49,74 +55,108 @@ def convert_position(shape, frame_width, frame_height):
 
 
 
-def extract_shapes_from_slide(slide, frame_width, frame_height, slide_index):
-    """Function to extract relevant info from a slide and store shape details."""
-    extracted_shapes = []
+def get_slide_layers(slide):
+    """Shapes a slide shows, as (layer, shape) pairs in drawing order.
+
+    The slide master's shapes come first, then the layout's, then the slide's
+    own shapes with layer None. Master and layout placeholders only hold the
+    formatting of the slide's placeholders, so they are left out.
+    """
+    from xml_extract import shows_master_shapes
+
+    layout = slide.slide_layout
+    inherited = []
+    if shows_master_shapes(slide.element):
+        if shows_master_shapes(layout.element):
+            inherited.append(('master', layout.slide_master.shapes))
+        inherited.append(('layout', layout.shapes))
+    for layer, shapes in inherited:
+        for shape in shapes:
+            if not shape.is_placeholder:
+                yield layer, shape
     for shape in slide.shapes:
-        shape_info = {
-            'id': shape.shape_id,
-            'type': None,
-            'position': convert_position(shape, frame_width, frame_height),
-            'dimensions': (shape.width.pt / 72, shape.height.pt / 72),
-            'text': shape.text if shape.has_text_frame and shape.text else None,
-            'image_path': None
-        }
+        yield None, shape
+
+
+def extract_shapes_from_slide(slide, frame_width, frame_height, slide_index, image_dir=image_dir):
+    """Function to extract relevant info from a slide and return its shape details.
+
+    Only the slide and the arguments are read, so slides can be extracted in any
+    order or in separate processes and merged afterwards. Shapes shown from the
+    slide's master and layout are included and marked with their layer; their
+    ids are prefixed with it, since ids are only unique within one part.
+    """
+    from pptx.enum.shapes import MSO_SHAPE_TYPE, MSO_AUTO_SHAPE_TYPE
+    from xml_extract import get_animated_shape_ids
+
+    animated_ids = get_animated_shape_ids(slide.element)
+    extracted_shapes = []
+    for layer, shape in get_slide_layers(slide):
+        # Ids in the timeline refer to the slide's own shapes; master and layout shapes are never animated
+        animated = True if layer is None and shape.shape_id in animated_ids else None
+        shape_info = ShapeRecord(
+            slide_index,
+            shape.shape_id if layer is None else f"{layer}_{shape.shape_id}",
+            position=convert_position(shape, frame_width, frame_height),
+            dimensions=(shape.width.pt / 72, shape.height.pt / 72),
+            text=shape.text if shape.has_text_frame and shape.text else None,
+            layer=layer,
+            animated=animated,
+        )
 
         if shape.shape_type == MSO_SHAPE_TYPE.AUTO_SHAPE:
             if shape.name.startswith('Line'):
-                shape_info['type'] = 'line'
+                shape_info.type = 'line'
             elif shape.auto_shape_type == MSO_AUTO_SHAPE_TYPE.RECTANGLE:
-                shape_info['type'] = 'rectangle'
+                shape_info.type = 'rectangle'
             elif shape.auto_shape_type == MSO_AUTO_SHAPE_TYPE.OVAL:
-                shape_info['type'] = 'oval'
+                shape_info.type = 'oval'
 
             else:
                 continue
         elif "Arrow" in shape.name:  # Detect arrows
-            shape_info['type'] = 'arrow'
-            shape_info['width'] = shape.width / 914440 if shape.width / 914440 >= 0.1 else 1
-            start_point, end_point = get_start_point_and_end_point(shape)
-            shape_info['dimensions'] = (start_point, end_point)
+            shape_info.type = 'arrow'
+            shape_info.width = shape.width / 914440 if shape.width / 914440 >= 0.1 else 1
+            start_point, end_point = get_start_point_and_end_point(shape, frame_width, frame_height)
+            shape_info.dimensions = (tuple(start_point), tuple(end_point))
         elif "Connector" in shape.name:
-            shape_info['type'] = 'line'
-            start_point, end_point = get_start_point_and_end_point(shape)
+            shape_info.type = 'line'
+            start_point, end_point = get_start_point_and_end_point(shape, frame_width, frame_height)
 
             # Try to handle dash style
             try:
                 dash_style = shape.line.dash_style
                 if dash_style:
-                    shape_info['dash_style'] = dash_style
+                    shape_info.dash_style = dash_style
                 else:
-                    shape_info['dash_style'] = 'solid'  # Default if not recognized
+                    shape_info.dash_style = 'solid'  # Default if not recognized
             except KeyError:
-                shape_info['dash_style'] = 'solid'  # Handle unrecognized dash styles
+                shape_info.dash_style = 'solid'  # Handle unrecognized dash styles
 
             # Handle line color if it's defined
             color = shape.line.color
             if color and hasattr(color, 'rgb') and color.rgb:
-                shape_info['color'] = color.rgb
+                shape_info.color = str(color.rgb)  # Hex string such as 'FF0000'
             else:
-                shape_info['color'] = '000000'  # Default color if not specified
+                shape_info.color = '000000'  # Default color if not specified
 
-            shape_info['dimensions'] = (start_point, end_point)
+            shape_info.dimensions = (tuple(start_point), tuple(end_point))
 
         elif shape.shape_type == MSO_SHAPE_TYPE.TEXT_BOX:  # Text box
             if shape.has_text_frame and shape.text:
-                shape_info['type'] = 'text'
+                shape_info.type = 'text'
             else:
                 continue
 
         elif shape.shape_type == MSO_SHAPE_TYPE.PICTURE:  # Image
-            shape_info['type'] = 'image'
+            shape_info.type = 'image'
             image = shape.image
-            image_bytes = image.blob
-            image_filename = os.path.join(image_dir, f"slide_{slide_index}_image_{shape.shape_id}.png")
-            with open(image_filename, 'wb') as image_file:
-                image_file.write(image_bytes)
-            shape_info['image_path'] = image_filename
+            # Images are stored by content hash, so repeated images share one file
+            fallback_ext = os.path.splitext(image.filename or '')[1] or 'png'
+            shape_info.image_path = store_image(image.blob, image_dir, fallback_ext)
 
         elif shape.shape_type == MSO_SHAPE_TYPE.TABLE:  # Table
-            shape_info['type'] = 'table'
+            shape_info.type = 'table'
             table = shape.table
             table_data = []
             font_sizes = []
@@ -131,145 +171,1194 @@ def extract_shapes_from_slide(slide, frame_width, frame_height, slide_index):
                 table_data.append(row_data)
                 font_sizes.append(row_font_sizes)
 
-            shape_info['font_sizes'] = font_sizes
-            shape_info['table_data'] = table_data
+            shape_info.font_sizes = font_sizes
+            shape_info.table_data = table_data
 
         if shape.shape_type != MSO_SHAPE_TYPE.TEXT_BOX and shape.has_text_frame and shape.text and shape.shape_type:
-            text_info = {
-                'id': f"{shape.shape_id}_text",
-                'type': 'text',
-                'text': shape.text,
-                'position': convert_position(shape, frame_width, frame_height),  # Align text to the center of the shape
-                'dimensions': (shape.width.pt / 72, shape.height.pt / 72),
-                'image_path': None
-            }
+            text_info = ShapeRecord(
+                slide_index,
+                f"{shape_info.id}_text",
+                type='text',
+                text=shape.text,
+                position=shape_info.position,  # Align text to the center of the shape
+                dimensions=shape_info.dimensions,
+                layer=layer,
+                animated=animated,
+            )
             extracted_shapes.append(text_info)  # Add text as a separate shape
 
         extracted_shapes.append(shape_info)
-        global_shapes[shape_info['id']] = shape_info
 
     return extracted_shapes
 
 
-def generate_manim_code(slides_shapes_info, background_color, frame_width, frame_height):
-    """Generate Manim code as a string."""
-    manim_code = f"""
-from manim import *
-from manim_slides import Slide
+def get_frame_size(presentation):
+    """Manim frame width and height based on the PowerPoint slide dimensions."""
+    return presentation.slide_width.pt / 72, presentation.slide_height.pt / 72
+
+
+def open_presentation(presentation_path, engine='pptx'):
+    """Open a deck with the given extraction engine.
+
+    'pptx' walks python-pptx objects; 'lxml' reads the slide XML straight from
+    the zip (see xml_extract.SlideXmlReader) and returns the same shapes faster.
+    """
+    # Both engines import python-pptx and lxml, so they are only loaded once a deck is opened
+    if engine == 'lxml':
+        from xml_extract import SlideXmlReader
+        return SlideXmlReader(presentation_path)
+    from pptx import Presentation
+    return Presentation(presentation_path)
+
+
+def extract_slide(presentation, slide_index, frame_width, frame_height, image_dir=image_dir):
+    """Extract one slide of a deck opened with open_presentation."""
+    from xml_extract import SlideXmlReader
+
+    if isinstance(presentation, SlideXmlReader):
+        return presentation.extract_slide(slide_index, frame_width, frame_height, image_dir)
+    slide = presentation.slides[slide_index]
+    return extract_shapes_from_slide(slide, frame_width, frame_height, slide_index, image_dir)
+
+
+def _init_extraction_worker(presentation_path, engine):
+    """Open the presentation once in each worker process."""
+    global _worker_presentation
+    _worker_presentation = open_presentation(presentation_path, engine)
+
+
+def _extract_slide_in_worker(slide_index, image_dir, profile=False):
+    """Extract one slide of the worker's presentation; with `profile`, also return its statistics."""
+    frame_width, frame_height = get_frame_size(_worker_presentation)
+    if profile:
+        return measure_slide(lambda: extract_slide(_worker_presentation, slide_index, frame_width, frame_height,
+                                                   image_dir))
+    return extract_slide(_worker_presentation, slide_index, frame_width, frame_height, image_dir)
+
+
+def extract_presentation(presentation_path, jobs=1, image_dir=image_dir, cached_shapes=None, engine='pptx',
+                         profiler=None):
+    """Extract the shapes of every slide, optionally across a process pool.
+
+    `cached_shapes` may hold previously extracted shapes per slide (None for
+    slides that must be extracted); those slides are not extracted again.
+    When every slide is cached, the deck is not opened at all: the frame size
+    is read from presentation.xml. Returns the frame width, frame height and a list with the shapes of each
+    slide in slide order; the result does not depend on the number of jobs
+    or on the engine (see open_presentation). An enabled `profiler` records
+    the 'load' and 'extract' phases and the statistics of every slide.
+    """
+    profiler = profiler or Profiler(enabled=False)
+    if cached_shapes and all(shapes is not None for shapes in cached_shapes):
+        with profiler.phase('load'):
+            # Same arithmetic as Length.pt / 72 in get_frame_size, so the frame size is identical
+            frame_width, frame_height = (convert_margin_to_points(length) / 72
+                                         for length in get_slide_size(presentation_path))
+        return frame_width, frame_height, list(cached_shapes)
+    with profiler.phase('load'):
+        presentation = open_presentation(presentation_path, engine)
+        frame_width, frame_height = get_frame_size(presentation)
+        slide_count = len(presentation.slides)
+    shapes_per_slide = list(cached_shapes) if cached_shapes else [None] * slide_count
+    pending = [slide_index for slide_index, shapes in enumerate(shapes_per_slide) if shapes is None]
+
+    with profiler.phase('extract'):
+        if jobs <= 1 or len(pending) <= 1:
+            for slide_index in pending:
+                shapes_per_slide[slide_index] = profiler.extract_slide(
+                    slide_index, lambda: extract_slide(presentation, slide_index, frame_width, frame_height, image_dir))
+            return frame_width, frame_height, shapes_per_slide
+
+        del presentation  # Workers open their own copy
+        from concurrent.futures import ProcessPoolExecutor  # Loads multiprocessing, only needed with --jobs
+
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_extraction_worker,
+                                 initargs=(presentation_path, engine)) as executor:
+            extracted = executor.map(_extract_slide_in_worker, pending, [image_dir] * len(pending),
+                                     [profiler.enabled] * len(pending),
+                                     chunksize=max(1, len(pending) // (jobs * 4)))
+            for slide_index, result in zip(pending, extracted):
+                if profiler.enabled:
+                    result, stats = result
+                    profiler.record_slide(slide_index, stats)
+                shapes_per_slide[slide_index] = result
+    return frame_width, frame_height, shapes_per_slide
+
 
-class GeneratedPresentation(Slide):
+def stream_presentation(presentation_path, image_dir=image_dir, cached_slides=None, profiler=None):
+    """Open a deck for extraction one slide at a time, in roughly constant memory.
+
+    Returns the frame width, frame height and a lazy iterator over the shapes
+    of each slide in slide order. Slides are read from the zip with the lxml
+    engine, which unlike python-pptx does not load every part of the package
+    up front, and a slide's images are written to the store as it is
+    extracted. Slides unchanged since the last run are read from
+    `cached_slides` (see manifest.CachedSlides) as they are reached.
+    """
+    from xml_extract import SlideXmlReader
+
+    profiler = profiler or Profiler(enabled=False)
+    reader = SlideXmlReader(presentation_path)
+    frame_width, frame_height = get_frame_size(reader)
+
+    def iter_slide_shapes():
+        try:
+            for slide_index in range(len(reader.slides)):
+                shapes = cached_slides.get_shapes(slide_index) if cached_slides else None
+                if shapes is None:
+                    shapes = profiler.extract_slide(
+                        slide_index, lambda: reader.extract_slide(slide_index, frame_width, frame_height, image_dir))
+                yield shapes
+        finally:
+            reader.close()
+
+    return frame_width, frame_height, iter_slide_shapes()
+
+
+def merge_slide_shapes(shapes_per_slide):
+    """Merge per-slide extraction results into the module-level shape stores."""
+    for shapes in shapes_per_slide:
+        slides_shapes_info.append(shapes)
+        for shape_info in shapes:
+            global_shapes[shape_info.key] = shape_info
+
+
+def get_scene_name(shard_index, shard_size=None, prefix='GeneratedPresentation'):
+    """Name of the generated scene class holding the given shard."""
+    if not shard_size:
+        return prefix
+    return f'{prefix}{shard_index + 1:04d}'
+
+
+def get_scene_names(slide_count, shard_size=None, prefix='GeneratedPresentation'):
+    """Names of the generated scene classes, one per shard of `shard_size` slides."""
+    if not shard_size:
+        return [get_scene_name(0, prefix=prefix)]
+    shard_count = (slide_count + shard_size - 1) // shard_size
+    return [get_scene_name(shard_index, shard_size, prefix) for shard_index in range(shard_count)]
+
+
+def generate_scene_header(scene_name, background_color, frame_width, frame_height):
+    """Generate the class and construct() header of a scene."""
+    return f"""
+class {scene_name}(LayeredSlide):
     def construct(self):
         self.camera.background_color = {background_color}
         config.frame_width = {frame_width}
         config.frame_height = {frame_height}
     """
+
+
+def format_point(point):
+    """Source form of a point; records hold tuples, generated code has always used lists."""
+    return list(point) if isinstance(point, tuple) else point
+
+
+def generate_shapes_code(shapes_info, image_variants=None):
+    """Lines of Manim code that build and add the given shapes.
+
+    With `image_variants` (see image_store.ImageVariants), pictures refer to a
+    copy downsampled to their size on screen at the render quality. Shapes
+    that draw nothing (type None: freeforms, groups, empty placeholders) get
+    no code, as in the compact output and --direct.
+    """
+    # Lines are collected in a list and joined once, which stays linear in the slide size
+    slide_code = []
+
+    # Add slide number as a text mobject in the bottom-right corner
+    # slide_number_position = [frame_width / 2 - 1, -frame_height / 2 + 0.5, 0]  # Adjust as necessary
+    # slide_code.append(f"        slide_number = Text('Slide {i + 1}', font_size=18, color=BLACK).move_to({slide_number_position})\n")
+    # slide_code.append("        self.add(slide_number)\n")
+    for shape_info in shapes_info:
+        if shape_info.type == 'rectangle':
+            slide_code.append(f"        mobject = Rectangle(width={shape_info.dimensions[0]}, height={shape_info.dimensions[1]}, color=BLACK)\n")
+        elif shape_info.type == 'oval':
+            slide_code.append(f"        mobject = Ellipse(width={shape_info.dimensions[0]}, height={shape_info.dimensions[1]}, color=BLACK)\n")
+        elif shape_info.type == 'text':
+            # Line breaks are added here, from the font's advance table, since manim's Text does not wrap
+            text = wrap_text(shape_info.text, shape_info.dimensions)
+            slide_code.append(f"        mobject = make_text('''{text}''', font_size={TEXT_FONT_SIZE}, color=BLACK).copy()\n")
+        elif shape_info.type == 'image':
+            image_path = image_variants.get_path(shape_info.image_path, shape_info.dimensions) \
+                if image_variants else shape_info.image_path
+            slide_code.append(f"        mobject = load_image({image_path!r}).copy()\n")
+            slide_code.append(f"        mobject.width, mobject.height = {shape_info.dimensions}\n")
+        elif shape_info.type == 'line':
+            start_point, end_point = shape_info.dimensions
+            color_hex = f"0x{shape_info.color}" if shape_info.color else "0x000000"  # Default to black if color is missing
+            if shape_info.dash_style == 'dashed':
+                slide_code.append(f"        mobject = DashedLine(start={format_point(start_point)}, end={format_point(end_point)}, color=ManimColor.from_rgb({color_hex}))\n")
+            else:
+                slide_code.append(f"        mobject = Line(start={format_point(start_point)}, end={format_point(end_point)}, color=ManimColor.from_rgb({color_hex}))\n")
+
+        elif shape_info.type == 'arrow':
+            start_point, end_point = shape_info.dimensions
+            slide_code.append(f"        mobject = Arrow(start={format_point(start_point)}, end={format_point(end_point)}, color=BLACK, buff=1, max_tip_length_to_length_ratio=0.1, stroke_width = {shape_info.width}  )\n")
+        elif shape_info.type == 'table':
+            # Rows are tuples so make_table can cache the table by its contents
+            table_data = tuple(tuple(row) for row in shape_info.table_data)
+            table_data_str = str(table_data).replace("'", '"')  # Convert to a string representation
+            slide_code.append(f"        mobject = make_table({table_data_str}).copy()\n")
+        else:
+            # No mobject was built, so there is nothing to move; moving would move the previous shape's mobject
+            continue
+
+        slide_code.append(f"        mobject.move_to({format_point(shape_info.position)})\n")
+        slide_code.append("        self.add(mobject)\n")
+
+    return slide_code
+
+
+def split_slide_layers(slide_shapes_info):
+    """Split the shapes of a slide into those shown from its master and layout, and its own."""
+    layer_shapes = [shape_info for shape_info in slide_shapes_info if shape_info.layer is not None]
+    local_shapes = [shape_info for shape_info in slide_shapes_info if shape_info.layer is None]
+    return layer_shapes, local_shapes
+
+
+def get_layer_key(layer_code):
+    """Key of a slide's master and layout layer: slides with the same layer code share it."""
+    return hashlib.sha1(layer_code.encode()).hexdigest()[:12] if layer_code else None
+
+
+def generate_slide_code(i, slide_shapes_info, image_variants=None):
+    """Generate the Manim code for a single slide.
+
+    The shapes the slide shows from its master and layout are only built when
+    the previous slide of the scene showed a different layer (see
+    LayeredSlide.begin_slide); otherwise they stay on screen and only the
+    slide's own mobjects are swapped. Slides without animated shapes end on a
+    single still frame (see LayeredSlide.hold) instead of a second of identical
+    frames. The code does not depend on the neighbouring slides, so it can be
+    cached per slide.
+    """
+    layer_shapes, local_shapes = split_slide_layers(slide_shapes_info)
+    layer_code = generate_shapes_code(layer_shapes, image_variants)
+    layer_key = get_layer_key(''.join(layer_code))
+
+    slide_code = [f"\n        # Slide {i + 1}\n"]
+    if layer_key is None:
+        slide_code.append("        self.begin_slide(None)\n")
+    else:
+        slide_code.append(f"        if self.begin_slide({layer_key!r}):\n")
+        # Indent each line of the layer block; continuation lines of multi-line texts are left as they are
+        slide_code.extend(f"    {line}" for line in layer_code)
+        slide_code.append("            self.keep_layer()\n")
+    slide_code.extend(generate_shapes_code(local_shapes, image_variants))
+    if is_static_slide(slide_shapes_info):
+        slide_code.append("        self.hold()\n")
+    else:
+        slide_code.append("        self.wait(1)\n        self.next_slide()\n")
+    return ''.join(slide_code)
+
+
+def get_shape_data(shape_info, image_variants=None):
+    """Compact form of a shape for the generated build_mobject, or None for shapes that draw nothing.
+
+    The first item is the kind and the last the position; the items in between
+    are the arguments generate_shapes_code writes out for that kind.
+    """
+    if shape_info.type in ('rectangle', 'oval'):
+        data = [shape_info.type, shape_info.dimensions[0], shape_info.dimensions[1]]
+    elif shape_info.type == 'text':
+        data = ['text', wrap_text(shape_info.text, shape_info.dimensions)]
+    elif shape_info.type == 'image':
+        image_path = image_variants.get_path(shape_info.image_path, shape_info.dimensions) \
+            if image_variants else shape_info.image_path
+        data = ['image', image_path, shape_info.dimensions]
+    elif shape_info.type == 'line':
+        start_point, end_point = shape_info.dimensions
+        data = ['line', start_point, end_point, int(shape_info.color or '000000', 16),
+                shape_info.dash_style == 'dashed']
+    elif shape_info.type == 'arrow':
+        start_point, end_point = shape_info.dimensions
+        data = ['arrow', start_point, end_point, shape_info.width]
+    elif shape_info.type == 'table':
+        data = ['table', shape_info.table_data]
+    else:
+        return None
+    data.append(shape_info.position)
+    return data
+
+
+def generate_slide_data(i, slide_shapes_info, image_variants=None):
+    """Data of a single slide for the compact output, as one line of JSON.
+
+    A slide is [layer key, layer shapes, own shapes, animated], read by the
+    generated play_slides. Takes the same arguments as generate_slide_code, so
+    either can produce a slide's entry in the manifest.
+    """
+    layer_shapes, local_shapes = split_slide_layers(slide_shapes_info)
+    layer_data = [data for data in (get_shape_data(shape_info, image_variants) for shape_info in layer_shapes)
+                  if data is not None]
+    local_data = [data for data in (get_shape_data(shape_info, image_variants) for shape_info in local_shapes)
+                  if data is not None]
+    layer_key = get_layer_key(json.dumps(layer_data)) if layer_data else None
+    return json.dumps([layer_key, layer_data, local_data, not is_static_slide(slide_shapes_info)],
+                      separators=(',', ':'), ensure_ascii=False)
+
+
+def count_layer_reuse(slides_shapes_info, shard_size=None):
+    """Slides that keep the previous slide's master and layout layer, and the mobjects not rebuilt for them.
+
+    Returns (slides, mobjects); a new scene (see get_scene_names) always draws its first layer.
+    Layers are compared by their shapes without ids: the layer code, and so
+    its key, is made from the shapes alone, so this finds the slides whose
+    key matches without generating the code again.
+    """
+    kept_slides = kept_mobjects = 0
+    previous_key = None
     for i, slide_shapes_info in enumerate(slides_shapes_info):
-        slide_code = f"\n        # Slide {i + 1}\n        self.clear()\n"
+        layer_shapes, _ = split_slide_layers(slide_shapes_info)
+        layer_key = [{field: value for field, value in shape_info.to_dict().items() if field != 'id'}
+                     for shape_info in layer_shapes if shape_info.type is not None] or None
+        new_scene = i == 0 or (shard_size and i % shard_size == 0)
+        if layer_key is not None and layer_key == previous_key and not new_scene:
+            kept_slides += 1
+            kept_mobjects += sum(shape_info.type is not None for shape_info in layer_shapes)
+        previous_key = layer_key
+    return kept_slides, kept_mobjects
+
+
+# Appended to the prelude with --telemetry: times mobject construction and each slide of the render
+TELEMETRY_PRELUDE = """
+import json
+import os
+import time
+
+
+class RenderTelemetry:
+    '''Build time of each mobject type and render time of each slide, saved as JSON when manim exits.
+
+    Each scene rendered by this process gets its own report, named after the
+    scene, so scenes rendered in parallel do not overwrite each other.
+    '''
+
+    def __init__(self, report_prefix):
+        self.report_prefix = report_prefix
+        self.scenes = {}
+        self.slide = None
+        self.nested = []  # Time spent in constructors called by each constructor being timed
+
+    def timed(self, constructor):
+        '''Wrap a mobject constructor; its own time, without nested constructors, counts for the current slide.'''
+        name = constructor.__name__
+
+        def build(*args, **kwargs):
+            self.nested.append(0.0)
+            start = time.perf_counter()
+            try:
+                return constructor(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                own = elapsed - self.nested.pop()
+                if self.nested:
+                    self.nested[-1] += elapsed
+                if self.slide is not None:
+                    self.slide['build_seconds'][name] = self.slide['build_seconds'].get(name, 0.0) + own
+                    self.slide['build_counts'][name] = self.slide['build_counts'].get(name, 0) + 1
+
+        return build
+
+    def begin_slide(self, scene_name):
+        scene = self.scenes.setdefault(scene_name, {'start': time.perf_counter(), 'slides': []})
+        self.slide = {'start': time.perf_counter(), 'frames_seconds': 0.0, 'build_seconds': {}, 'build_counts': {}}
+        scene['slides'].append(self.slide)
+
+    def add_frames(self, seconds):
+        if self.slide is not None:
+            self.slide['frames_seconds'] += seconds
+
+    def end_slide(self):
+        if self.slide is not None:
+            self.slide['seconds'] = time.perf_counter() - self.slide.pop('start')
+            self.slide = None
+
+    def save(self):
+        now = time.perf_counter()
+        for scene_name, scene in self.scenes.items():
+            report = {'scene': scene_name, 'seconds': now - scene['start'], 'slides': scene['slides']}
+            with open(f'{self.report_prefix}.{scene_name}.json', 'w', encoding='utf-8') as report_file:
+                json.dump(report, report_file, indent=2)
+
+
+TELEMETRY = RenderTelemetry(os.path.splitext(os.path.abspath(__file__))[0] + '.telemetry')
+atexit.register(TELEMETRY.save)
+
+# The slides and the cached helpers above build their mobjects through these names
+Rectangle, Ellipse, Line, DashedLine, Arrow, Text, ImageMobject, MathTex, MobjectTable = map(
+    TELEMETRY.timed, (Rectangle, Ellipse, Line, DashedLine, Arrow, Text, ImageMobject, MathTex, MobjectTable))
+
+
+class LayeredSlide(LayeredSlide):
+    '''LayeredSlide that reports when each slide starts and ends, and the time spent rendering its frames.'''
+
+    def begin_slide(self, layer):
+        TELEMETRY.begin_slide(type(self).__name__)
+        return super().begin_slide(layer)
+
+    def wait(self, *args, **kwargs):
+        start = time.perf_counter()
+        super().wait(*args, **kwargs)
+        TELEMETRY.add_frames(time.perf_counter() - start)
+
+    def next_slide(self, *args, **kwargs):
+        super().next_slide(*args, **kwargs)
+        TELEMETRY.end_slide()
+
+"""
+
+
+def generate_prelude(table_cell_limit=TABLE_CELL_LIMIT, telemetry=False):
+    """Imports and helpers at the top of every generated script.
+
+    With `telemetry`, the script also times its slides and mobjects (see
+    TELEMETRY_PRELUDE); without it, nothing of the instrumentation is emitted.
+    """
+    prelude = f"""
+import atexit
+from functools import lru_cache
+from manim import *
+from manim_slides import Slide
+
+
+# Texts, tables and images repeated across slides (titles, footers, logos) are built
+# once and slides add copies of them
+@lru_cache(maxsize={MOBJECT_CACHE_SIZE})
+def load_image(path):
+    return ImageMobject(path)
+
+
+@lru_cache(maxsize={MOBJECT_CACHE_SIZE})
+def make_text(text, font_size, color):
+    return Text(text, font_size=font_size, color=color)
+
+
+# Tables with more cells than this are drawn with Text cells; typesetting each cell with LaTeX takes
+# far too long for big tables
+TABLE_CELL_LIMIT = {table_cell_limit}
+
+
+# Each distinct cell string is typeset once and tables add copies. manim also keeps the compiled
+# LaTeX of every string in media/Tex, so later renders do not run LaTeX for it again
+@lru_cache(maxsize={TABLE_CELL_CACHE_SIZE})
+def make_tex_cell(text):
+    return MathTex(text, color=BLACK)
+
+
+@lru_cache(maxsize={TABLE_CELL_CACHE_SIZE})
+def make_text_cell(text):
+    return Text(text, color=BLACK)
+
+
+@lru_cache(maxsize={MOBJECT_CACHE_SIZE})
+def make_table(table_data):
+    make_cell = make_text_cell if sum(map(len, table_data)) > TABLE_CELL_LIMIT else make_tex_cell
+    mobject = MobjectTable(
+        [[make_cell(text).copy() for text in row] for row in table_data],
+        include_outer_lines=True,
+        line_config={{"stroke_color": "BLACK", "stroke_width": 2}},
+    )
+    mobject.scale(0.4)
+    return mobject
+
+
+def report_mobject_cache():
+    for kind, cached in (('text', make_text), ('table', make_table), ('image', load_image),
+                         ('LaTeX cell', make_tex_cell), ('Text cell', make_text_cell)):
+        info = cached.cache_info()
+        calls = info.hits + info.misses
+        if calls:
+            print(f"{{kind}} mobjects: {{info.hits}} of {{calls}} reused ({{info.hits / calls:.0%}})")
+
+
+atexit.register(report_mobject_cache)
 
-        # Add slide number as a text mobject in the bottom-right corner
-        # slide_number_position = [frame_width / 2 - 1, -frame_height / 2 + 0.5, 0]  # Adjust as necessary
-        # slide_code += f"        slide_number = Text('Slide {i + 1}', font_size=18, color=BLACK).move_to({slide_number_position})\n"
-        # slide_code += "        self.add(slide_number)\n"
+
+class LayeredSlide(Slide):
+    '''Slide scene that keeps the master and layout layer on screen while consecutive slides share it.'''
+    layer = None
+    layer_ids = frozenset()
+
+    def begin_slide(self, layer):
+        '''Remove the previous slide; returns True when the slide's `layer` has to be built.'''
+        if layer is not None and layer == self.layer:
+            self.remove(*[mobject for mobject in self.mobjects if id(mobject) not in self.layer_ids])
+            return False
+        self.clear()
+        self.layer = layer
+        self.layer_ids = frozenset()
+        return True
+
+    def keep_layer(self):
+        '''Mark the mobjects added so far as the layer, kept by the next slides that show it.'''
+        self.layer_ids = frozenset(id(mobject) for mobject in self.mobjects)
+
+    def hold(self):
+        '''End a static slide on a single frame, which manim-slides shows until the next slide.'''
+        self.wait(1 / config.frame_rate)
+        self.next_slide()
+
+"""
+    return prelude + TELEMETRY_PRELUDE if telemetry else prelude
+
+
+def get_mobject_spec(shape_info):
+    """(kind, spec) of a shape whose mobject the generated code caches, or None."""
+    if shape_info.type == 'text':
+        return 'text', shape_info.text
+    if shape_info.type == 'table':
+        return 'table', tuple(tuple(row) for row in shape_info.table_data)
+    if shape_info.type == 'image':
+        return 'image', shape_info.image_path
+    return None
+
+
+def count_mobject_reuse(slides_shapes_info):
+    """For each cached kind, how many of its mobjects repeat an earlier one: {kind: (repeats, total)}."""
+    seen = set()
+    counts = {}
+    for slide_shapes_info in slides_shapes_info:
         for shape_info in slide_shapes_info:
-            if shape_info['type'] == 'rectangle':
-                slide_code += f"        mobject = Rectangle(width={shape_info['dimensions'][0]}, height={shape_info['dimensions'][1]}, color=BLACK)\n"
-            elif shape_info['type'] == 'oval':
-                slide_code += f"        mobject = Ellipse(width={shape_info['dimensions'][0]}, height={shape_info['dimensions'][1]}, color=BLACK)\n"
-            elif shape_info['type'] == 'text':
-                slide_code += f"        mobject = Text('''{shape_info['text']}''', font_size=24, color=BLACK)\n"
-            elif shape_info['type'] == 'image':
-                slide_code += f"        mobject = ImageMobject('{shape_info['image_path']}')\n"
-                slide_code += f"        mobject.width, mobject.height = {shape_info['dimensions']}\n"
-            elif shape_info['type'] == 'line':
-                start_point, end_point = shape_info['dimensions']
-                color_hex = f"0x{shape_info['color']}" if 'color' in shape_info and shape_info[
-                    'color'] else "0x000000"  # Default to black if color is missing or None
-                if shape_info.get('dash_style') == 'dashed':
-                    slide_code += f"        mobject = DashedLine(start={start_point}, end={end_point}, color=ManimColor.from_rgb({color_hex}))\n"
-                else:
-                    slide_code += f"        mobject = Line(start={start_point}, end={end_point}, color=ManimColor.from_rgb({color_hex}))\n"
-
-            elif shape_info['type'] == 'arrow':
-                start_point, end_point = shape_info['dimensions']
-                slide_code += f"        mobject = Arrow(start={start_point}, end={end_point}, color=BLACK, buff=1, max_tip_length_to_length_ratio=0.1, stroke_width = {shape_info['width']}  )\n"
-            elif shape_info['type'] == 'table':
-                table_data = shape_info['table_data']
-                line_config = shape_info.get('line_config', {"stroke_color": "BLACK", "stroke_width": 2})
-                element_to_mobject_config = shape_info.get('element_to_mobject_config', {"color": "BLACK"})
-
-                table_data_str = str(table_data).replace("'", '"')  # Convert to a string representation
-                line_config_str = str(line_config).replace("'", '"')
-                element_to_mobject_config_str = str(element_to_mobject_config).replace("'", '"')
-
-                slide_code += f"""
-        table_data = {table_data_str}
-        mobject = MathTable(
-            table_data,
-            include_outer_lines=True,
-            line_config={line_config_str},
-            element_to_mobject_config={element_to_mobject_config_str},
-        )
+            spec = get_mobject_spec(shape_info)
+            if spec is None:
+                continue
+            repeats, total = counts.get(spec[0], (0, 0))
+            counts[spec[0]] = (repeats + (spec in seen), total + 1)
+            seen.add(spec)
+    return counts
+
+
+def count_table_cells(slides_shapes_info, table_cell_limit=TABLE_CELL_LIMIT):
+    """Table cells of the deck, how many distinct strings they hold, and the tables drawn with Text cells.
+
+    Each distinct string is typeset once, so it is the number of LaTeX runs
+    a first render of the small tables needs at most.
+    """
+    cells = large_tables = 0
+    distinct = set()
+    for slide_shapes_info in slides_shapes_info:
+        for shape_info in slide_shapes_info:
+            if shape_info.type != 'table':
+                continue
+            cell_count = sum(map(len, shape_info.table_data))
+            cells += cell_count
+            large_tables += cell_count > table_cell_limit
+            distinct.update(text for row in shape_info.table_data for text in row)
+    return cells, len(distinct), large_tables
+
+
+# Appended to the prelude by the compact output: builds the slides from the slide data file
+COMPACT_BUILDER = f"""
+import json
+import os
+
+
+def build_mobject(shape):
+    '''Mobject of one shape of the slide data, moved to its position (the last item).'''
+    kind = shape[0]
+    if kind == 'rectangle':
+        mobject = Rectangle(width=shape[1], height=shape[2], color=BLACK)
+    elif kind == 'oval':
+        mobject = Ellipse(width=shape[1], height=shape[2], color=BLACK)
+    elif kind == 'text':
+        mobject = make_text(shape[1], font_size={TEXT_FONT_SIZE}, color=BLACK).copy()
+    elif kind == 'image':
+        mobject = load_image(shape[1]).copy()
+        mobject.width, mobject.height = shape[2]
+    elif kind == 'line':
+        line_class = DashedLine if shape[4] else Line
+        mobject = line_class(start=shape[1], end=shape[2], color=ManimColor.from_rgb(shape[3]))
+    elif kind == 'arrow':
+        mobject = Arrow(start=shape[1], end=shape[2], color=BLACK, buff=1, max_tip_length_to_length_ratio=0.1,
+                        stroke_width=shape[3])
+    else:
+        mobject = make_table(tuple(map(tuple, shape[1]))).copy()
+    mobject.move_to(shape[-1])
+    return mobject
+
+
+def play_slides(scene, slides):
+    '''Show slides of the slide data, each [layer key, layer shapes, own shapes, animated].'''
+    for layer, layer_shapes, shapes, animated in slides:
+        if scene.begin_slide(layer):
+            scene.add(*map(build_mobject, layer_shapes))
+            scene.keep_layer()
+        scene.add(*map(build_mobject, shapes))
+        if animated:
+            scene.wait(1)
+            scene.next_slide()
+        else:
+            scene.hold()
 """
-                slide_code += "        mobject.scale(0.4)\n"  # Adjust scale if necessary
 
-            slide_code += f"        mobject.move_to({shape_info['position']})\n"
-            slide_code += "        self.add(mobject)\n"
 
-        slide_code += "        self.wait(1)\n        self.next_slide()\n"
-        manim_code += slide_code
+def get_data_path(output_path):
+    """Path of the slide data file of a script generated with the compact output."""
+    return f'{os.path.splitext(output_path)[0]}.slides.json'
 
-    manim_code += "\n"
 
-    return manim_code
+def write_compact_manim_code(output_file, data_path, slide_datas, background_color, frame_width, frame_height,
+                             shard_size=None, table_cell_limit=TABLE_CELL_LIMIT, telemetry=False):
+    """Write the compact output: the slides as data in `data_path` and a short script that builds them.
 
+    `slide_datas` holds the JSON of each slide (see generate_slide_data) and
+    may be lazy; each entry is written as it comes. The script loads the data
+    file from its own directory and each scene passes its shard of slides to
+    play_slides, so its size does not grow with the deck.
+    """
+    slide_count = 0
+    with open(data_path, 'w', encoding='utf-8') as data_file:
+        data_file.write('[')
+        for slide_count, slide_data in enumerate(slide_datas, 1):
+            data_file.write(f"{',' if slide_count > 1 else ''}\n{slide_data}")
+        data_file.write('\n]\n')
 
-# Argument parser
-parser = argparse.ArgumentParser(description="PowerPoint to Manim and HTML conversion tool.")
-parser.add_argument('presentation', type=str, help="Path to the PowerPoint presentation file.")
-parser.add_argument('--render', action='store_true', help="Render the Manim scene")
-parser.add_argument('--convert', action='store_true', help="Convert the Manim scene to HTML and open it in the browser")
-args = parser.parse_args()
+    output_file.write(generate_prelude(table_cell_limit, telemetry))
+    output_file.write(COMPACT_BUILDER)
+    output_file.write(f"""
+
+with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), {os.path.basename(data_path)!r}),
+          encoding='utf-8') as slides_file:
+    SLIDES = json.load(slides_file)
+
+""")
+    for shard_index, scene_name in enumerate(get_scene_names(slide_count, shard_size)):
+        start, end = (shard_index * shard_size, (shard_index + 1) * shard_size) if shard_size else (0, slide_count)
+        output_file.write(generate_scene_header(scene_name, background_color, frame_width, frame_height))
+        output_file.write(f"    play_slides(self, SLIDES[{start}:{min(end, slide_count)}])\n")
+    output_file.write("\n")
+
+
+def iter_manim_code(slides_shapes_info, background_color, frame_width, frame_height, shard_size=None,
+                    slide_codes=None, image_variants=None, table_cell_limit=TABLE_CELL_LIMIT,
+                    scene_prefix='GeneratedPresentation', telemetry=False):
+    """Yield the generated Manim code one slide at a time.
+
+    By default every slide goes into a single GeneratedPresentation scene. With
+    `shard_size`, one scene is emitted per `shard_size` slides (see get_scene_names)
+    so the shards can be rendered in parallel. `slide_codes` may hold already
+    generated code per slide (see generate_slide_codes). Only the current slide
+    is held in memory, so both arguments may be lazy iterables. Tables with
+    more than `table_cell_limit` cells are drawn with Text cells. Scenes are
+    named after `scene_prefix`. With `telemetry`, the script writes a timing
+    report of its render (see generate_prelude).
+    """
+    if slide_codes is None:
+        slide_codes = (generate_slide_code(i, slide_shapes_info, image_variants)
+                       for i, slide_shapes_info in enumerate(slides_shapes_info))
+
+    yield generate_prelude(table_cell_limit, telemetry)
+    slide_count = 0
+    for i, slide_code in enumerate(slide_codes):
+        if i == 0 or (shard_size and i % shard_size == 0):
+            scene_name = get_scene_name(i // shard_size if shard_size else 0, shard_size, scene_prefix)
+            yield generate_scene_header(scene_name, background_color, frame_width, frame_height)
+        yield slide_code
+        slide_count += 1
+
+    if slide_count == 0:
+        yield generate_scene_header(get_scene_name(0, shard_size, scene_prefix), background_color, frame_width,
+                                    frame_height)
+
+    yield "\n"
+
+
+def write_manim_code(output_file, slides_shapes_info, background_color, frame_width, frame_height,
+                     shard_size=None, slide_codes=None, image_variants=None, table_cell_limit=TABLE_CELL_LIMIT,
+                     scene_prefix='GeneratedPresentation', data_path=None, telemetry=False):
+    """Stream the generated Manim code into an open text file.
+
+    With `data_path`, the compact output is written instead (see
+    write_compact_manim_code) and `slide_codes` holds slide data.
+    """
+    if data_path is not None:
+        if slide_codes is None:
+            slide_codes = (generate_slide_data(i, slide_shapes_info, image_variants)
+                           for i, slide_shapes_info in enumerate(slides_shapes_info))
+        write_compact_manim_code(output_file, data_path, slide_codes, background_color, frame_width, frame_height,
+                                 shard_size, table_cell_limit, telemetry)
+        return
+    for chunk in iter_manim_code(slides_shapes_info, background_color, frame_width, frame_height,
+                                 shard_size, slide_codes, image_variants, table_cell_limit, scene_prefix, telemetry):
+        output_file.write(chunk)
+
+
+def generate_manim_code(slides_shapes_info, background_color, frame_width, frame_height, shard_size=None,
+                        slide_codes=None, image_variants=None, table_cell_limit=TABLE_CELL_LIMIT, telemetry=False):
+    """Generate Manim code as a string (see iter_manim_code)."""
+    return ''.join(iter_manim_code(slides_shapes_info, background_color, frame_width, frame_height,
+                                   shard_size, slide_codes, image_variants, table_cell_limit, telemetry=telemetry))
+
+
+def reuse_slide_code(cached_code, slide_shapes_info, image_variants=None):
+    """Cached code of a slide, after recreating any image variant it refers to that was deleted."""
+    if image_variants:
+        image_variants.prepare_slide(slide_shapes_info)
+    return cached_code
+
+
+def generate_slide_codes(slides_shapes_info, cached_codes=None, image_variants=None, compact=False):
+    """Generate the code of every slide, or its data with `compact`.
+
+    Entries of `cached_codes` that are not None are reused.
+    """
+    generate = generate_slide_data if compact else generate_slide_code
+    return [
+        reuse_slide_code(cached_codes[i], slide_shapes_info, image_variants)
+        if cached_codes and cached_codes[i] is not None
+        else generate(i, slide_shapes_info, image_variants)
+        for i, slide_shapes_info in enumerate(slides_shapes_info)
+    ]
+
+
+def stream_manim_code(output_file, slide_shapes, slide_hashes, manifest_writer, background_color, frame_width,
+                      frame_height, shard_size=None, cached_slides=None, image_variants=None,
+                      table_cell_limit=TABLE_CELL_LIMIT, data_path=None, telemetry=False):
+    """Generate, write and record in the manifest the code of one slide at a time.
+
+    `slide_shapes` is consumed lazily (see stream_presentation), so no slide
+    is kept once its code is written. Code cached in `cached_slides` (see
+    manifest.CachedSlides) is read back one slide at a time and reused. With
+    `data_path`, slides are written as data for the compact output.
+    """
+    generate = generate_slide_data if data_path is not None else generate_slide_code
+
+    def iter_slide_codes():
+        for i, (shapes, slide_hash) in enumerate(zip(slide_shapes, slide_hashes)):
+            cached_code = cached_slides.get_code(i) if cached_slides else None
+            if cached_code is not None:
+                slide_code = reuse_slide_code(cached_code, shapes, image_variants)
+            else:
+                slide_code = generate(i, shapes, image_variants)
+            manifest_writer.add_slide(slide_hash, shapes, slide_code)
+            yield slide_code
+
+    write_manim_code(output_file, None, background_color, frame_width, frame_height, shard_size, iter_slide_codes(),
+                     table_cell_limit=table_cell_limit, data_path=data_path, telemetry=telemetry)
+
+
+def render_scenes(output_path, scene_names, jobs=1, quality='low'):
+    """Render the generated scenes with one `manim` subprocess per scene.
+
+    Up to `jobs` scenes are rendered at the same time, at the given quality
+    (see image_store.QUALITY_FLAGS). Returns True when every scene rendered
+    successfully.
+    """
+    import subprocess
+    from concurrent.futures import ThreadPoolExecutor
+
+    def render(scene_name):
+        return subprocess.run(['manim', QUALITY_FLAGS[quality], output_path, scene_name]).returncode
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        return_codes = list(executor.map(render, scene_names))
+
+    for scene_name, return_code in zip(scene_names, return_codes):
+        if return_code != 0:
+            print(f"Error: Rendering {scene_name} failed with exit code {return_code}.")
+    return all(return_code == 0 for return_code in return_codes)
+
+
+def get_telemetry_path(output_path):
+    """Path of the render timing report of a generated script (see save_render_telemetry)."""
+    return f'{os.path.splitext(output_path)[0]}.telemetry.json'
+
+
+def get_scene_slides(scene_names, slide_numbers, shard_size=None):
+    """(scene name, numbers of the slides it holds) of each scene, for scenes of `shard_size` slides."""
+    if not shard_size:
+        return [(scene_names[0], list(slide_numbers))]
+    return [(scene_name, list(slide_numbers[shard_index * shard_size:(shard_index + 1) * shard_size]))
+            for shard_index, scene_name in enumerate(scene_names)]
+
+
+def clear_render_telemetry(script_path, scene_names):
+    """Remove the per-scene timing reports an earlier render of the script left behind."""
+    for scene_name in scene_names:
+        scene_report_path = f'{os.path.splitext(script_path)[0]}.telemetry.{scene_name}.json'
+        if os.path.exists(scene_report_path):
+            os.remove(scene_report_path)
+
+
+def save_render_telemetry(script_path, scene_slides, report_path):
+    """Merge the per-scene timing reports written by a script generated with --telemetry, and print a summary.
+
+    `scene_slides` pairs each scene with the deck's numbers of its slides
+    (see get_scene_slides). Scenes that wrote no report, for example because
+    their render failed, are left out.
+    """
+    from profiling import format_render_telemetry, merge_render_telemetry
+
+    report = merge_render_telemetry(f'{os.path.splitext(script_path)[0]}.telemetry', scene_slides)
+    if not report['scenes']:
+        print("Warning: The render wrote no telemetry report.")
+        return
+    with open(report_path, 'w', encoding='utf-8') as report_file:
+        json.dump(report, report_file, indent=2)
+    print(format_render_telemetry(report))
+    print(f"Render telemetry saved to {report_path}")
+
+
+def render_with_segment_store(store, output_path, scene_names, slides_shapes_info, frame_width, frame_height,
+                              shard_size=None, jobs=1, quality='low', image_variants=None,
+                              table_cell_limit=TABLE_CELL_LIMIT, telemetry=False):
+    """Render the generated scenes, reusing slides rendered earlier by any conversion into `store`.
+
+    Each slide is looked up in the store (see segment_store.SegmentStore) by
+    the hash of its shapes and the render settings. The slides that are not
+    stored, each distinct one once, are generated into a second script of
+    PendingSegments scenes beside `output_path`, rendered with render_scenes
+    and added to the store. The manim-slides configuration of every scene in
+    `scene_names` is then written from its slides' segments, so manim-slides
+    converts the scenes as if they had been rendered whole. With `telemetry`,
+    the pending script is instrumented and its timing report saved (see
+    save_render_telemetry). Returns True when every pending scene rendered
+    successfully.
+    """
+    from segment_store import get_renderer_versions, get_segment_key, read_scene_config, write_scene_config
+
+    render_settings = {'quality': quality, 'frame_size': [frame_width, frame_height],
+                       'background_color': background_color, 'table_cell_limit': table_cell_limit,
+                       'renderer': get_renderer_versions()}
+    slide_keys = [get_segment_key(slide_shapes_info, render_settings) for slide_shapes_info in slides_shapes_info]
+
+    segments = {}  # Key -> (manim-slides entry, resolution, background color) of each distinct slide
+    pending = []  # Indices of the slides to render, one per distinct key that is not stored
+    for i, key in enumerate(slide_keys):
+        if key in segments:
+            continue
+        segments[key] = store.restore(key)
+        if segments[key] is None:
+            pending.append(i)
+
+    if pending:
+        pending_path = f'{os.path.splitext(output_path)[0]}.pending.py'
+        pending_codes = [generate_slide_code(i, slides_shapes_info[i], image_variants) for i in pending]
+        with open(pending_path, 'w', encoding='utf-8') as pending_script:
+            write_manim_code(pending_script, None, background_color, frame_width, frame_height, shard_size,
+                             pending_codes, table_cell_limit=table_cell_limit, scene_prefix='PendingSegments',
+                             telemetry=telemetry)
+        pending_scenes = get_scene_names(len(pending), shard_size, prefix='PendingSegments')
+        print(f"Rendering {len(pending)} slide(s) missing from the segment store in {len(pending_scenes)} scene(s)...")
+        if telemetry:
+            clear_render_telemetry(pending_path, pending_scenes)
+        rendered_whole = render_scenes(pending_path, pending_scenes, jobs, quality)
+        if telemetry:
+            save_render_telemetry(pending_path, get_scene_slides(pending_scenes, [i + 1 for i in pending], shard_size),
+                                  get_telemetry_path(output_path))
+        if not rendered_whole:
+            return False
+
+        rendered = []
+        for scene_name in pending_scenes:
+            config = read_scene_config(scene_name)
+            rendered.extend((slide, config['resolution'], config['background_color']) for slide in config['slides'])
+        if len(rendered) != len(pending):
+            print(f"Error: The pending scenes rendered {len(rendered)} slide(s) instead of {len(pending)}.")
+            return False
+        for i, segment in zip(pending, rendered):
+            segments[slide_keys[i]] = segment
+            store.add(slide_keys[i], *segment)
+
+    for shard_index, scene_name in enumerate(scene_names):
+        scene_keys = slide_keys[shard_index * shard_size:(shard_index + 1) * shard_size] if shard_size else slide_keys
+        _, resolution, scene_background_color = segments[scene_keys[0]]
+        write_scene_config(scene_name, [segments[key][0] for key in scene_keys], resolution, scene_background_color)
+    store.evict()
+    print(store.format_summary())
+    return True
+
+
+def render_direct(slides_shapes_info, frame_width, frame_height, shard_size=None, quality='low',
+                  image_variants=None, table_cell_limit=TABLE_CELL_LIMIT):
+    """Render the slides in this process straight from their ShapeRecords, without generating code.
+
+    Scenes are built with xml_testing.PresentationScene and create_mobject and
+    named like the generated scenes (see get_scene_names), so manim-slides
+    converts them the same way. Shards are rendered one after another, since
+    manim's configuration is global to the process. Pictures are drawn from
+    `image_variants` when given, and tables with more than `table_cell_limit`
+    cells with Text cells. Returns True when every scene rendered
+    successfully.
+    """
+    from xml_testing import render_slides  # Imports manim, which only direct rendering needs
+
+    scene_names = get_scene_names(len(slides_shapes_info), shard_size)
+    step = shard_size or max(1, len(slides_shapes_info))
+    succeeded = True
+    for shard_index, scene_name in enumerate(scene_names):
+        try:
+            render_slides(slides_shapes_info[shard_index * step:(shard_index + 1) * step], frame_width, frame_height,
+                          scene_name, f'{quality}_quality', image_variants=image_variants,
+                          table_cell_limit=table_cell_limit)
+        except Exception as error:
+            print(f"Error: Rendering {scene_name} failed: {error}")
+            succeeded = False
+    return succeeded
+
+
+def convert_scenes(scene_names, presentation_name):
+    """Convert the rendered scenes to manim_<name>.pptx and manim_<name>.html with manim-slides.
+
+    Sharded scenes are stitched back together by listing them in slide order.
+    Returns True when both conversions succeeded.
+    """
+    import subprocess
+
+    print("Converting to PPTX...")
+    pptx_result = subprocess.run(['manim-slides', 'convert', '--to=pptx', *scene_names,
+                                  f'manim_{presentation_name}.pptx'])
+
+    print(f"PPTX presentation saved as manim_{presentation_name}.pptx")
+
+    print("Converting to HTML...")
+    # Named after the deck, so decks converted in the same directory do not overwrite each other
+    html_result = subprocess.run(['manim-slides', 'convert', *scene_names, f'manim_{presentation_name}.html'])
+    return pptx_result.returncode == 0 and html_result.returncode == 0
+
+
+def build_parser():
+    """Command line options of a conversion; batch.py passes them on to every deck."""
+    parser = argparse.ArgumentParser(description="PowerPoint to Manim and HTML conversion tool.")
+    parser.add_argument('presentation', type=str, help="Path to the PowerPoint presentation file.")
+    parser.add_argument('--render', action='store_true', help="Render the Manim scene")
+    parser.add_argument('--direct', action='store_true',
+                        help="Render in this process straight from the extracted shapes, without generating code "
+                             "or starting manim")
+    parser.add_argument('--convert', action='store_true', help="Convert the Manim scene to HTML and open it in the browser")
+    parser.add_argument('--no-open', action='store_true', help="With --convert, do not open the HTML in the browser")
+    parser.add_argument('--jobs', type=int, default=1, help="Number of worker processes used to extract slides and render shards")
+    parser.add_argument('--shard-size', type=int, default=None,
+                        help="Emit one scene per N slides so the scenes can be rendered in parallel")
+    parser.add_argument('--full-rebuild', action='store_true',
+                        help="Ignore the manifest and re-extract every slide")
+    parser.add_argument('--engine', choices=['pptx', 'lxml'], default='pptx',
+                        help="Extraction backend: python-pptx objects, or slide XML read directly with lxml")
+    parser.add_argument('--profile', nargs='?', const='', default=None, metavar='REPORT',
+                        help="Print the time and peak memory of each phase and the slowest slides, and write a JSON "
+                             "report (default: beside the generated script)")
+    parser.add_argument('--profile-cprofile', metavar='PATH', default=None,
+                        help="With --profile, also save cProfile stats of the extraction phase to PATH")
+    parser.add_argument('--stream', action='store_true',
+                        help="Extract, generate and write one slide at a time in roughly constant memory "
+                             "(uses the lxml engine on a single process)")
+    parser.add_argument('--quality', choices=list(QUALITY_FLAGS), default='low',
+                        help="Render quality; pictures are downsampled to their size on screen at this quality")
+    parser.add_argument('--compact', action='store_true',
+                        help="Write the slides as data in a .slides.json file beside a short script that builds "
+                             "them, instead of unrolling every shape into code")
+    parser.add_argument('--telemetry', action='store_true',
+                        help="Instrument the generated script to time each slide and each mobject type while it "
+                             "renders; --render then saves a JSON report beside the script")
+    parser.add_argument('--table-cell-limit', type=int, default=TABLE_CELL_LIMIT,
+                        help="Tables with more cells are drawn with Text cells instead of typesetting each cell "
+                             "with LaTeX")
+    parser.add_argument('--ir', nargs='?', const='', default=None, metavar='PATH',
+                        help="Save the extracted deck to a binary IR file (default: beside the generated script) and "
+                             "skip extraction on later runs while the IR matches the deck")
+    parser.add_argument('--image-dir', default=image_dir,
+                        help="Directory of the image store, which several decks may share")
+    parser.add_argument('--segment-store', metavar='DIR', default=None,
+                        help="With --render, reuse slides already rendered into this directory by any conversion "
+                             "and add the newly rendered ones")
+    parser.add_argument('--segment-store-mb', type=float, default=None,
+                        help="Disk budget of the segment store in MiB (default: 2048); the least recently used "
+                             "slides are evicted beyond it")
+    return parser
+
+
+def convert_presentation(args):
+    """Convert one deck with the options parsed by build_parser, writing into the current directory.
+
+    Returns True when every requested stage succeeded. The module-level shape
+    stores are reset first, so one process can convert several decks in turn.
+    """
+    slides_shapes_info.clear()
+    global_shapes.clear()
+    image_dir = args.image_dir
 
-# Main Execution
-if __name__ == "__main__":
     presentation_path = args.presentation  # Use the argument for the presentation path
     presentation_name = os.path.splitext(os.path.basename(presentation_path))[0]
     output_path = f'generated_manim_code_for_{presentation_name}.py'
     if not os.path.isfile(presentation_path):
         print(f"Error: The file '{presentation_path}' does not exist.")
-        exit(1)
-    presentation = Presentation(presentation_path)
+        return False
 
-    # Define frame width and height based on the PowerPoint slide dimensions
-    frame_width = presentation.slide_width.pt / 72
-    frame_height = presentation.slide_height.pt / 72
+    # Ensure the image directory exists
+    os.makedirs(image_dir, exist_ok=True)
+    # The font's advance table is cached beside the images, so decks sharing the image store measure it once
+    get_advances(metrics_dir=os.path.join(image_dir, FONT_METRICS_DIR))
 
-    for slide_index, slide in enumerate(presentation.slides):
-        shapes = extract_shapes_from_slide(slide, frame_width, frame_height, slide_index)
-        slides_shapes_info.append(shapes)
+    if args.shard_size is not None and args.shard_size < 1:
+        print("Error: --shard-size must be at least 1.")
+        return False
+    if args.direct and args.stream:
+        print("Error: --direct renders the whole deck in memory and cannot be combined with --stream.")
+        return False
+    if args.segment_store and (args.stream or args.direct):
+        print("Error: --segment-store renders through generated code from the whole deck's shapes and cannot be "
+              "combined with --stream or --direct.")
+        return False
 
-    manim_code = generate_manim_code(slides_shapes_info, background_color, frame_width, frame_height)
+    profiler = Profiler(enabled=args.profile is not None, cprofile_path=args.profile_cprofile)
+    if args.profile_cprofile and args.jobs > 1 and not args.stream:
+        print("Warning: --profile-cprofile only covers the main process; use --jobs 1 to profile extraction.")
 
-    with open(output_path, 'w', encoding='utf-8') as manim_script:
-        manim_script.write(manim_code)
+    settings = {'slide_size': get_slide_size(presentation_path), 'image_dir': image_dir}
+    codegen_settings = {'quality': args.quality, 'compact': args.compact}
+    data_path = get_data_path(output_path) if args.compact else None
+    ir_path = (args.ir or get_ir_path(output_path)) if args.ir is not None else None
 
-    print(f"Manim code generated and saved to {output_path}")
+    # A valid IR of this exact deck replaces hashing and extraction altogether
+    ir = None
+    if ir_path and not args.full_rebuild:
+        with profiler.phase('load_ir'):
+            ir = open_ir(ir_path, presentation_path, settings)
+
+    if ir is not None:
+        frame_width, frame_height, slide_count, slide_shapes = ir
+        print(f"Loaded the extracted deck from {ir_path}, skipping extraction")
+        image_variants = ImageVariants(args.quality, frame_height)
+        if not args.stream:
+            slide_shapes = list(slide_shapes)
+            merge_slide_shapes(slide_shapes)
+        if not args.direct:
+            with profiler.phase('codegen'):
+                with open(output_path, 'w', encoding='utf-8') as manim_script:
+                    write_manim_code(manim_script, slide_shapes, background_color, frame_width, frame_height,
+                                     args.shard_size, image_variants=image_variants,
+                                     table_cell_limit=args.table_cell_limit, data_path=data_path,
+                                     telemetry=args.telemetry)
+    else:
+        # Slides whose XML and media are unchanged since the last run are taken from the manifest
+        manifest_path = get_manifest_path(output_path)
+        with profiler.phase('manifest'):
+            slide_hashes = get_slide_hashes(presentation_path)
+            # Only where each cached slide starts is kept; its shapes and code are read when it is reached
+            cached_slides = CachedSlides(None if args.full_rebuild else manifest_path, settings, slide_hashes,
+                                         codegen_settings)
+        slide_count = len(slide_hashes)
+        print(f"{cached_slides.changed_count} of {slide_count} slide(s) changed since the last run")
+
+        if args.stream:
+            # Each slide is extracted, generated, written and released before the next one is read
+            frame_width, frame_height, slide_shapes = stream_presentation(presentation_path, image_dir,
+                                                                          cached_slides=cached_slides,
+                                                                          profiler=profiler)
+            image_variants = ImageVariants(args.quality, frame_height)
+            ir_writer = IRWriter(ir_path, presentation_path, settings, frame_width, frame_height, slide_count) \
+                if ir_path else nullcontext()
+            with profiler.phase('stream'):
+                with open(output_path, 'w', encoding='utf-8') as manim_script, \
+                        ManifestWriter(manifest_path, settings, codegen_settings) as manifest_writer, ir_writer, \
+                        cached_slides:  # Closes the previous manifest before the new one replaces it
+                    if ir_path:
+                        slide_shapes = ir_writer.record(slide_shapes)
+                    stream_manim_code(manim_script, slide_shapes, slide_hashes, manifest_writer, background_color,
+                                      frame_width, frame_height, args.shard_size, cached_slides, image_variants,
+                                      args.table_cell_limit, data_path, args.telemetry)
+        else:
+            with cached_slides:
+                cached_shapes = [cached_slides.get_shapes(i) for i in range(slide_count)]
+                cached_codes = [cached_slides.get_code(i) for i in range(slide_count)]
+            frame_width, frame_height, shapes_per_slide = extract_presentation(presentation_path, args.jobs,
+                                                                               image_dir, cached_shapes,
+                                                                               engine=args.engine, profiler=profiler)
+            merge_slide_shapes(shapes_per_slide)
+            image_variants = ImageVariants(args.quality, frame_height)
+
+            with profiler.phase('codegen'):
+                if args.direct:
+                    # Nothing is generated; the manifest keeps the shapes and any code cached earlier
+                    slide_codes = cached_codes
+                else:
+                    slide_codes = generate_slide_codes(slides_shapes_info, cached_codes, image_variants,
+                                                       args.compact)
+                    with open(output_path, 'w', encoding='utf-8') as manim_script:
+                        write_manim_code(manim_script, slides_shapes_info, background_color, frame_width,
+                                         frame_height, args.shard_size, slide_codes,
+                                         table_cell_limit=args.table_cell_limit, data_path=data_path,
+                                         telemetry=args.telemetry)
+                save_manifest(manifest_path, settings, slide_hashes, slides_shapes_info, slide_codes,
+                              codegen_settings)
+            if ir_path:
+                with profiler.phase('save_ir'):
+                    save_ir(ir_path, presentation_path, settings, frame_width, frame_height, slides_shapes_info)
+    scene_names = get_scene_names(slide_count, args.shard_size)
+
+    if not args.stream:
+        mobject_reuse = count_mobject_reuse(slides_shapes_info)
+        if mobject_reuse:
+            print("Repeated mobjects built once and copied: " + ', '.join(
+                f"{repeats} of {total} {kind}" for kind, (repeats, total) in mobject_reuse.items()))
+        table_cells, distinct_cells, large_tables = count_table_cells(slides_shapes_info, args.table_cell_limit)
+        if table_cells:
+            print(f"Table cells: {table_cells}, {distinct_cells} distinct string(s) typeset once each; "
+                  f"{large_tables} table(s) over {args.table_cell_limit} cells drawn with Text cells")
+        static_slides = sum(map(is_static_slide, slides_shapes_info))
+        if static_slides:
+            print(f"Static slides rendered as a single still frame: {static_slides} of {slide_count}")
+        kept_slides, kept_mobjects = count_layer_reuse(slides_shapes_info, args.shard_size)
+        if kept_slides:
+            print(f"Master and layout layer kept on {kept_slides} of {slide_count} slide(s), "
+                  f"{kept_mobjects} mobject(s) not rebuilt")
+
+    succeeded = True
+    if args.direct:
+        print(f"Rendering {len(scene_names)} scene(s) in this process...")
+        with profiler.phase('render'):
+            succeeded = render_direct(slides_shapes_info, frame_width, frame_height, args.shard_size, args.quality,
+                                      image_variants, args.table_cell_limit)
+    else:
+        print(f"Manim code generated and saved to {output_path}")
+        if data_path:
+            print(f"Slide data saved to {data_path} ({os.path.getsize(output_path) / 1024:.1f} KiB of code, "
+                  f"{os.path.getsize(data_path) / 1024:.1f} KiB of data)")
+    variants_summary = image_variants.format_summary()
+    if variants_summary:
+        print(variants_summary)
 
     # If the user wants to render the Manim scene
-if args.render:
-    print("Running Manim rendering...")
-    subprocess.run(['manim', '-ql', output_path, 'GeneratedPresentation'])
+    if args.render and args.segment_store:
+        from segment_store import SegmentStore  # Only rendering through the store needs it
+
+        store = SegmentStore(args.segment_store, args.segment_store_mb)
+        with profiler.phase('render'):
+            succeeded = render_with_segment_store(store, output_path, scene_names, slides_shapes_info, frame_width,
+                                                  frame_height, args.shard_size, args.jobs, args.quality,
+                                                  image_variants, args.table_cell_limit, args.telemetry)
+    elif args.render and not args.direct:
+        print(f"Running Manim rendering of {len(scene_names)} scene(s)...")
+        if args.telemetry:
+            clear_render_telemetry(output_path, scene_names)
+        with profiler.phase('render'):
+            succeeded = render_scenes(output_path, scene_names, args.jobs, args.quality)
+        if args.telemetry:
+            save_render_telemetry(output_path, get_scene_slides(scene_names, range(1, slide_count + 1),
+                                                                args.shard_size), get_telemetry_path(output_path))
 
     # If the user wants to convert to HTML and open in the browser
-if args.convert:
-    print("Converting to PPTX...")
-    subprocess.run(['manim-slides', 'convert', '--to=pptx', 'GeneratedPresentation', f'manim_{presentation_name}.pptx'])
+    if args.convert:
+        with profiler.phase('convert'):
+            succeeded = convert_scenes(scene_names, presentation_name) and succeeded
 
-    print(f"PPTX presentation saved as manim_{presentation_name}.pptx")
+        if not args.no_open:
+            import webbrowser
+
+            print("Opening HTML presentation...")
+            html_path = os.path.abspath(f'manim_{presentation_name}.html')
+            webbrowser.open(f'file://{html_path}')
+
+    if profiler.enabled:
+        report_path = args.profile or f'{os.path.splitext(output_path)[0]}.profile.json'
+        print(profiler.format_summary())
+        profiler.write_report(report_path)
+        print(f"Profile report saved to {report_path}")
+    return succeeded
 
-    print("Converting to HTML...")
-    subprocess.run(['manim-slides', 'convert', 'GeneratedPresentation', 'manim_presentation.html'])
 
-    print("Opening HTML presentation...")
-    html_path = os.path.abspath('manim_presentation.html')
-    webbrowser.open(f'file://{html_path}')
+# Main Execution
+if __name__ == "__main__":
+    if not convert_presentation(build_parser().parse_args()):
+        exit(1)
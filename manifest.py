@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+import zipfile
+
+import pptx_package
+from shape_record import ShapeRecord
+
+MANIFEST_VERSION = 6
+
+# Related parts that do not affect what is extracted from a slide
+IGNORED_RELATIONSHIPS = ('/notesSlide', '/comments', '/tags')
+
+
+def get_manifest_path(output_path):
+    """The manifest is stored beside the generated script."""
+    return f'{os.path.splitext(output_path)[0]}.manifest.json'
+
+
+def load_manifest(manifest_path):
+    """Load a manifest, returning None if it is missing, unreadable or outdated."""
+    try:
+        with open(manifest_path, encoding='utf-8') as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('version') != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+class ManifestWriter:
+    """Writes a manifest one slide at a time, so a streaming run never holds every slide.
+
+    The manifest is JSON with each slide on a line of its own, so CachedSlides
+    can read one slide without parsing the others. Use it as a context manager: the manifest replaces the previous one when the
+    block completes, and is discarded if the block raises. `settings` are the
+    options the extracted shapes depend on, `codegen_settings` those that only
+    the generated code depends on (such as the render quality).
+    """
+
+    def __init__(self, manifest_path, settings, codegen_settings=None):
+        self.manifest_path = manifest_path
+        self.tmp_path = f'{manifest_path}.tmp'
+        self.slide_count = 0
+        self.manifest_file = open(self.tmp_path, 'w', encoding='utf-8')
+        self.manifest_file.write(f'{{"version": {MANIFEST_VERSION}, "settings": {json.dumps(settings)}, '
+                                 f'"codegen_settings": {json.dumps(codegen_settings)}, "slides": [')
+
+    def add_slide(self, slide_hash, shapes, code):
+        """Record the content hash, extracted shapes and generated code of the next slide."""
+        self.manifest_file.write(',\n' if self.slide_count else '\n')
+        json.dump({'hash': slide_hash, 'shapes': [shape.to_dict() for shape in shapes], 'code': code},
+                  self.manifest_file)
+        self.slide_count += 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is not None:
+            self.manifest_file.close()
+            os.remove(self.tmp_path)
+            return
+        self.manifest_file.write('\n]}')
+        self.manifest_file.close()
+        os.replace(self.tmp_path, self.manifest_path)
+
+
+def save_manifest(manifest_path, settings, slide_hashes, shapes_per_slide, slide_codes, codegen_settings=None):
+    """Record the content hash, extracted shapes and generated code of every slide."""
+    with ManifestWriter(manifest_path, settings, codegen_settings) as manifest_writer:
+        for slide_hash, shapes, code in zip(slide_hashes, shapes_per_slide, slide_codes):
+            manifest_writer.add_slide(slide_hash, shapes, code)
+
+
+def get_slide_size(presentation_path):
+    """Slide width and height in EMU, as a list so it compares equal after a JSON round trip."""
+    with zipfile.ZipFile(presentation_path) as package:
+        return list(pptx_package.get_slide_size(package))
+
+
+def get_slide_hashes(presentation_path):
+    """Content hash of every slide's XML and the parts it relates to (layout, media).
+
+    A slide also shows the shapes of its layout and slide master, so the
+    layout's hash covers the master and the media both of them use. Parts
+    shared by many slides, such as layouts and logos, are hashed once.
+    """
+    part_digests = {}
+    layer_digests = {}
+
+    def part_digest(member):
+        if member not in part_digests:
+            try:
+                part_digests[member] = hashlib.sha1(package.read(member)).hexdigest()
+            except KeyError:
+                part_digests[member] = 'missing'
+        return part_digests[member]
+
+    def layer_digest(member):
+        """Hash of a layout or master with the parts it relates to, except the master's other layouts."""
+        if member not in layer_digests:
+            digest = hashlib.sha1(part_digest(member).encode())
+            for _, rel_type, target, external in pptx_package.read_rels(package, member):
+                if external or rel_type.endswith(IGNORED_RELATIONSHIPS + ('/slideLayout',)):
+                    continue
+                target_member = pptx_package.resolve_target(member, target)
+                if rel_type.endswith('/slideMaster'):
+                    digest.update(f'{rel_type} {layer_digest(target_member)}'.encode())
+                else:
+                    digest.update(f'{rel_type} {part_digest(target_member)}'.encode())
+            layer_digests[member] = digest.hexdigest()
+        return layer_digests[member]
+
+    slide_hashes = []
+    with zipfile.ZipFile(presentation_path) as package:
+        for member in pptx_package.get_slide_members(package):
+            digest = hashlib.sha1(package.read(member))
+            for _, rel_type, target, external in pptx_package.read_rels(package, member):
+                if rel_type.endswith(IGNORED_RELATIONSHIPS):
+                    continue
+                if external:
+                    digest.update(f'{rel_type} {target}'.encode())
+                elif rel_type.endswith('/slideLayout'):
+                    digest.update(f'{rel_type} {layer_digest(pptx_package.resolve_target(member, target))}'.encode())
+                else:
+                    digest.update(f'{rel_type} {part_digest(pptx_package.resolve_target(member, target))}'.encode())
+            slide_hashes.append(digest.hexdigest())
+    return slide_hashes
+
+
+class CachedSlides:
+    """Shapes and code of the slides whose content did not change since the manifest was written.
+
+    Shapes are reused by content hash, wherever the slide now sits in the deck,
+    as long as the images they reference still exist. Generated code also
+    depends on the slide number and on `codegen_settings`, so it is only
+    reused for slides that kept their position, and only when the code was
+    generated with the same codegen settings.
+
+    Opening the manifest reads it once, one slide at a time, and keeps only
+    where each reusable slide starts in the file; get_shapes and get_code read
+    that slide again when it is needed. A streaming run therefore holds one
+    cached slide at a time, however large the deck. `manifest_path` may be
+    None, or name a missing, unreadable or outdated manifest, in which case
+    every slide has to be extracted again. Use it as a context manager, which
+    closes the manifest.
+    """
+
+    def __init__(self, manifest_path, settings, slide_hashes, codegen_settings=None):
+        self.manifest_file = None
+        self.shape_offsets = [None] * len(slide_hashes)  # Offset of the manifest line holding each slide's shapes
+        self.code_offsets = [None] * len(slide_hashes)  # Offset of the line holding the slide's code, if reusable
+        if manifest_path is None:
+            return
+        try:
+            self.manifest_file = open(manifest_path, 'rb')
+            self._index(settings, slide_hashes, codegen_settings)
+        except (OSError, ValueError, KeyError):  # Missing, unreadable or written in another format
+            self.shape_offsets = [None] * len(slide_hashes)
+            self.code_offsets = [None] * len(slide_hashes)
+            self.close()
+
+    def _index(self, settings, slide_hashes, codegen_settings):
+        header = json.loads(self.manifest_file.readline() + b']}')
+        if header.get('version') != MANIFEST_VERSION or header.get('settings') != settings:
+            self.close()
+            return
+        same_codegen = header.get('codegen_settings') == codegen_settings
+        wanted_hashes = set(slide_hashes)
+        offsets_by_hash = {}
+        position = 0
+        while True:
+            offset = self.manifest_file.tell()
+            line = self.manifest_file.readline()
+            if not line or line.startswith(b']'):
+                break
+            slide = json.loads(line.rstrip().rstrip(b','))
+            slide_hash = slide['hash']
+            if slide_hash in wanted_hashes and slide_hash not in offsets_by_hash \
+                    and all(os.path.exists(shape['image_path']) for shape in slide['shapes']
+                            if shape.get('image_path')):
+                offsets_by_hash[slide_hash] = offset
+            if same_codegen and position < len(slide_hashes) and slide_hashes[position] == slide_hash:
+                self.code_offsets[position] = offset
+            position += 1
+        self.shape_offsets = [offsets_by_hash.get(slide_hash) for slide_hash in slide_hashes]
+        # Code is only reused along with the slide's cached shapes
+        self.code_offsets = [code_offset if shape_offset is not None else None
+                             for shape_offset, code_offset in zip(self.shape_offsets, self.code_offsets)]
+
+    def _read_slide(self, offset):
+        self.manifest_file.seek(offset)
+        return json.loads(self.manifest_file.readline().rstrip().rstrip(b','))
+
+    @property
+    def changed_count(self):
+        """Number of slides that have to be extracted again."""
+        return self.shape_offsets.count(None)
+
+    def get_shapes(self, slide_index):
+        """Cached shapes of a slide as ShapeRecords of its current index, or None if it must be extracted."""
+        offset = self.shape_offsets[slide_index]
+        if offset is None:
+            return None
+        return [ShapeRecord.from_dict(shape, slide_index) for shape in self._read_slide(offset)['shapes']]
+
+    def get_code(self, slide_index):
+        """Cached generated code of a slide, or None if it must be generated again."""
+        offset = self.code_offsets[slide_index]
+        return None if offset is None else self._read_slide(offset)['code']
+
+    def close(self):
+        if self.manifest_file is not None:
+            self.manifest_file.close()
+            self.manifest_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
@@ -0,0 +1,11 @@
+# Settings of the mobject caches, shared by the generated script (main.generate_prelude) and --direct (xml_testing),
+# so both build and reuse mobjects the same way
+
+# Most distinct texts, tables and images kept built at once, per kind
+MOBJECT_CACHE_SIZE = 256
+
+# Most distinct table cell strings kept typeset at once
+TABLE_CELL_CACHE_SIZE = 4096
+
+# Tables with more cells than this are drawn with Text cells rather than typesetting each cell with LaTeX
+TABLE_CELL_LIMIT = 100
@@ -0,0 +1,62 @@
+import posixpath
+import xml.etree.ElementTree as ET
+
+ns = {
+    'p': 'http://schemas.openxmlformats.org/presentationml/2006/main',
+    'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships',
+    'rel': 'http://schemas.openxmlformats.org/package/2006/relationships',
+}
+
+PRESENTATION_MEMBER = 'ppt/presentation.xml'
+
+
+def read_rels(package, member):
+    """Relationships of a zip member as a list of (id, type, target, external), sorted by id."""
+    rels_member = posixpath.join(posixpath.dirname(member), '_rels', posixpath.basename(member) + '.rels')
+    try:
+        root = ET.fromstring(package.read(rels_member))
+    except KeyError:
+        return []
+    rels = []
+    for rel in sorted(root.findall('rel:Relationship', ns), key=lambda rel: rel.get('Id')):
+        rels.append((rel.get('Id'), rel.get('Type'), rel.get('Target'), rel.get('TargetMode') == 'External'))
+    return rels
+
+
+def resolve_target(member, target):
+    """Resolve a relationship target relative to the zip member it belongs to."""
+    if target.startswith('/'):
+        return target.lstrip('/')
+    return posixpath.normpath(posixpath.join(posixpath.dirname(member), target))
+
+
+def get_related_members(package, member):
+    """Map of relationship id to the zip member it points to, for internal relationships."""
+    return {
+        rel_id: resolve_target(member, target)
+        for rel_id, _, target, external in read_rels(package, member)
+        if not external
+    }
+
+
+def get_related_member(package, member, rel_type_suffix):
+    """The first internal zip member related to `member` by a relationship of the given type."""
+    for _, rel_type, target, external in read_rels(package, member):
+        if not external and rel_type.endswith(rel_type_suffix):
+            return resolve_target(member, target)
+    return None
+
+
+def get_slide_members(package):
+    """Zip members of the slides in presentation order."""
+    targets = get_related_members(package, PRESENTATION_MEMBER)
+    root = ET.fromstring(package.read(PRESENTATION_MEMBER))
+    rid_attr = f"{{{ns['r']}}}id"
+    return [targets[sld_id.get(rid_attr)] for sld_id in root.findall('p:sldIdLst/p:sldId', ns)]
+
+
+def get_slide_size(package):
+    """Slide width and height in EMU as stored in presentation.xml."""
+    root = ET.fromstring(package.read(PRESENTATION_MEMBER))
+    sld_sz = root.find('p:sldSz', ns)
+    return int(sld_sz.get('cx')), int(sld_sz.get('cy'))
@@ -0,0 +1,219 @@
+import cProfile
+import json
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+import image_store
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def _rusage_bytes(who):
+    peak = resource.getrusage(who).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024  # ru_maxrss is in KiB except on macOS
+
+
+def get_peak_rss():
+    """Peak resident memory of this process in bytes, or None where it cannot be read."""
+    return _rusage_bytes(resource.RUSAGE_SELF) if resource else None
+
+
+def get_child_peak_rss():
+    """Peak resident memory of the largest finished child process in bytes, or None."""
+    return _rusage_bytes(resource.RUSAGE_CHILDREN) if resource else None
+
+
+def measure_slide(function):
+    """Run a slide extraction, returning (shapes, stats) with time, memory growth and image writes.
+
+    Memory is the growth of the process's peak RSS, which is cheap enough to
+    read around every slide (unlike tracemalloc, which would distort the
+    timings) and also works in extraction worker processes.
+    """
+    before_bytes = image_store.write_stats['bytes']
+    before_seconds = image_store.write_stats['seconds']
+    start_rss = get_peak_rss()
+    start = time.perf_counter()
+    shapes = function()
+    seconds = time.perf_counter() - start
+    stats = {
+        'seconds': seconds,
+        'peak_rss_growth_bytes': get_peak_rss() - start_rss if resource else None,
+        'shape_types': dict(Counter(str(shape.type) for shape in shapes)),
+        'image_bytes_written': image_store.write_stats['bytes'] - before_bytes,
+        'image_write_seconds': image_store.write_stats['seconds'] - before_seconds,
+    }
+    return shapes, stats
+
+
+def _mib(size):
+    return '-' if size is None else f"{size / 2 ** 20:.2f}"
+
+
+# Phases run under cProfile when a cProfile dump is requested
+CPROFILE_PHASES = ('extract', 'stream')
+
+
+class Profiler:
+    """Records wall time and peak memory of each conversion phase and each extracted slide.
+
+    Peak memory is the process's peak RSS after each phase, and how much the
+    phase raised it, along with the peak RSS of the largest finished child
+    process (extraction workers, manim, manim-slides). A disabled profiler only
+    runs the wrapped code.
+    """
+
+    def __init__(self, enabled=True, cprofile_path=None):
+        self.enabled = enabled
+        self.cprofile_path = cprofile_path
+        self.phases = []
+        self.slides = {}
+
+    @contextmanager
+    def phase(self, name):
+        """Time a phase of the conversion; extraction phases are also run under cProfile if requested."""
+        if not self.enabled:
+            yield
+            return
+        profile = cProfile.Profile() if self.cprofile_path and name in CPROFILE_PHASES else None
+        start_rss = get_peak_rss()
+        start = time.perf_counter()
+        if profile:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile:
+                profile.disable()
+                profile.dump_stats(self.cprofile_path)
+            seconds = time.perf_counter() - start
+            peak_rss = get_peak_rss()
+            record = {
+                'name': name,
+                'seconds': seconds,
+                'peak_rss_bytes': peak_rss,
+                'peak_rss_growth_bytes': peak_rss - start_rss if resource else None,
+                'child_peak_rss_bytes': get_child_peak_rss(),
+            }
+            self.phases.append(record)
+
+    def extract_slide(self, slide_index, function):
+        """Run the extraction of one slide, recording its statistics."""
+        if not self.enabled:
+            return function()
+        shapes, stats = measure_slide(function)
+        self.record_slide(slide_index, stats)
+        return shapes
+
+    def record_slide(self, slide_index, stats):
+        """Record the statistics of a slide measured elsewhere, e.g. in a worker process."""
+        self.slides[slide_index] = stats
+
+    def get_report(self):
+        """The profile as a JSON-serializable dict."""
+        shape_types = Counter()
+        for stats in self.slides.values():
+            shape_types.update(stats['shape_types'])
+        return {
+            'phases': self.phases,
+            'slides': [{'slide': slide_index + 1, **stats} for slide_index, stats in sorted(self.slides.items())],
+            'totals': {
+                'seconds': sum(phase['seconds'] for phase in self.phases),
+                'extracted_slides': len(self.slides),
+                'shape_types': dict(shape_types),
+                'image_bytes_written': sum(stats['image_bytes_written'] for stats in self.slides.values()),
+                'image_write_seconds': sum(stats['image_write_seconds'] for stats in self.slides.values()),
+            },
+        }
+
+    def write_report(self, report_path):
+        with open(report_path, 'w', encoding='utf-8') as report_file:
+            json.dump(self.get_report(), report_file, indent=2)
+
+    def format_summary(self, slowest=10):
+        """Human-readable table of the phases and the slowest slides."""
+        report = self.get_report()
+        lines = [f"{'Phase':<12} {'Seconds':>10} {'Peak MiB':>10} {'Growth MiB':>11}"]
+        for phase in report['phases']:
+            lines.append(f"{phase['name']:<12} {phase['seconds']:>10.3f} {_mib(phase['peak_rss_bytes']):>10} "
+                         f"{_mib(phase['peak_rss_growth_bytes']):>11}")
+        totals = report['totals']
+        lines.append(f"{'total':<12} {totals['seconds']:>10.3f}")
+        lines.append(f"Images written: {totals['image_bytes_written'] / 2 ** 20:.2f} MiB "
+                     f"in {totals['image_write_seconds']:.3f}s")
+        lines.append("Shape types: " + ', '.join(f"{shape_type}={count}"
+                                                 for shape_type, count in sorted(totals['shape_types'].items())))
+
+        if report['slides']:
+            lines.append("")
+            lines.append(f"Slowest slides ({min(slowest, len(report['slides']))} of {len(report['slides'])} extracted):")
+            lines.append(f"{'Slide':>6} {'Seconds':>10} {'Growth MiB':>11} {'Image KiB':>10}  Shapes")
+            slides = sorted(report['slides'], key=lambda stats: stats['seconds'], reverse=True)[:slowest]
+            for stats in slides:
+                shapes = ', '.join(f"{shape_type}={count}" for shape_type, count in sorted(stats['shape_types'].items()))
+                lines.append(f"{stats['slide']:>6} {stats['seconds']:>10.4f} {_mib(stats['peak_rss_growth_bytes']):>11} "
+                             f"{stats['image_bytes_written'] / 1024:>10.1f}  {shapes}")
+        return '\n'.join(lines)
+
+
+def merge_render_telemetry(report_prefix, scene_slides):
+    """Merge the per-scene reports written by a script generated with --telemetry into one report.
+
+    The reports are `<report_prefix>.<scene>.json`; `scene_slides` pairs each
+    scene with the deck's numbers of its slides, in order. Slides whose scene
+    wrote no report are left out.
+    """
+    slides = []
+    scenes = []
+    build_seconds = Counter()
+    build_counts = Counter()
+    for scene_name, slide_numbers in scene_slides:
+        try:
+            with open(f'{report_prefix}.{scene_name}.json', encoding='utf-8') as report_file:
+                scene_report = json.load(report_file)
+        except (OSError, ValueError):  # The scene did not render
+            continue
+        scenes.append({'scene': scene_name, 'seconds': scene_report['seconds'],
+                       'slides': len(scene_report['slides'])})
+        for slide_number, stats in zip(slide_numbers, scene_report['slides']):
+            slides.append({'slide': slide_number, 'scene': scene_name, **stats})
+            build_seconds.update(stats['build_seconds'])
+            build_counts.update(stats['build_counts'])
+    return {
+        'scenes': scenes,
+        'slides': slides,
+        'totals': {
+            'seconds': sum(scene['seconds'] for scene in scenes),
+            'rendered_slides': len(slides),
+            'frames_seconds': sum(stats['frames_seconds'] for stats in slides),
+            'build_seconds': dict(build_seconds),
+            'build_counts': dict(build_counts),
+        },
+    }
+
+
+def format_render_telemetry(report, slowest=10):
+    """Human-readable table of the mobject types and the slowest slides of a render."""
+    totals = report['totals']
+    lines = [f"Render: {totals['seconds']:.3f}s in {len(report['scenes'])} scene(s), "
+             f"{totals['frames_seconds']:.3f}s of it rendering frames",
+             f"{'Mobject':<14} {'Count':>8} {'Build s':>10}"]
+    for name, seconds in sorted(totals['build_seconds'].items(), key=lambda item: item[1], reverse=True):
+        lines.append(f"{name:<14} {totals['build_counts'][name]:>8} {seconds:>10.3f}")
+
+    if report['slides']:
+        lines.append("")
+        lines.append(f"Slowest slides ({min(slowest, len(report['slides']))} of {len(report['slides'])} rendered):")
+        lines.append(f"{'Slide':>6} {'Seconds':>10} {'Frames s':>10} {'Build s':>10}  Slowest mobject")
+        slides = sorted(report['slides'], key=lambda stats: stats.get('seconds', 0.0), reverse=True)[:slowest]
+        for stats in slides:
+            build = stats['build_seconds']
+            heaviest = max(build, key=build.get) if build else '-'
+            lines.append(f"{stats['slide']:>6} {stats.get('seconds', 0.0):>10.4f} {stats['frames_seconds']:>10.4f} "
+                         f"{sum(build.values()):>10.4f}  {heaviest}")
+    return '\n'.join(lines)
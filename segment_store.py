@@ -0,0 +1,173 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+# Bumped whenever the generated code of a slide changes, so older segments are not reused
+SEGMENT_FORMAT_VERSION = 3
+
+# Default disk budget of a segment store
+SEGMENT_STORE_BUDGET_MB = 2048
+
+# manim-slides writes <scene>.json and the slide videos under files/<scene>/ in this directory
+SLIDES_DIR = 'slides'
+
+# Metadata file of each stored segment; its modification time is the segment's last use
+SEGMENT_FILENAME = 'segment.json'
+
+
+def get_renderer_versions():
+    """Installed manim and manim-slides versions, read without importing either."""
+    from importlib.metadata import PackageNotFoundError, version
+
+    versions = {}
+    for package in ('manim', 'manim-slides'):
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def get_segment_key(slide_shapes_info, render_settings):
+    """Content hash of a rendered slide: its shapes and the settings it is rendered with.
+
+    Shape ids and the slide's position in the deck are left out, and images
+    are identified by their content-addressed file name rather than their
+    path, so the same slide in another deck, or at another place in the
+    same deck, has the same key.
+    """
+    shapes = []
+    for shape_info in slide_shapes_info:
+        shape = shape_info.to_dict()
+        del shape['id']
+        if 'image_path' in shape:
+            shape['image_path'] = os.path.basename(shape['image_path'])
+        shapes.append(shape)
+    canonical = json.dumps([SEGMENT_FORMAT_VERSION, render_settings, shapes], sort_keys=True)
+    return hashlib.sha1(canonical.encode()).hexdigest()
+
+
+def get_scene_config_path(scene_name):
+    """Path of the manim-slides configuration of a rendered scene."""
+    return os.path.join(SLIDES_DIR, f'{scene_name}.json')
+
+
+def read_scene_config(scene_name):
+    """manim-slides configuration of a rendered scene.
+
+    Video paths in it are relative to the parent of the slides directory,
+    which is the directory the conversion runs in.
+    """
+    with open(get_scene_config_path(scene_name), encoding='utf-8') as config_file:
+        return json.load(config_file)
+
+
+def write_scene_config(scene_name, slides, resolution, background_color):
+    """Write the manim-slides configuration of a scene assembled from segments."""
+    with open(get_scene_config_path(scene_name), 'w', encoding='utf-8') as config_file:
+        json.dump({'slides': slides, 'resolution': resolution, 'background_color': background_color},
+                  config_file, indent=2)
+
+
+class SegmentStore:
+    """Rendered slide segments shared by every conversion, keyed by get_segment_key.
+
+    Each segment is a directory holding the slide's video, its reversed video
+    and the slide's entry of the manim-slides configuration. The store is
+    bounded to `budget_mb` MiB: `evict` removes the least recently used
+    segments, by the modification time of their metadata file, which `restore`
+    updates, until the store fits. Segments are written to a temporary
+    directory and renamed into place, so several processes can share a store.
+    """
+
+    def __init__(self, store_dir, budget_mb=None):
+        self.store_dir = store_dir
+        self.budget_bytes = int((budget_mb if budget_mb is not None else SEGMENT_STORE_BUDGET_MB) * 2 ** 20)
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0, 'evicted': 0, 'evicted_bytes': 0, 'size_bytes': 0}
+        os.makedirs(store_dir, exist_ok=True)
+
+    def _segment_dir(self, key):
+        return os.path.join(self.store_dir, key)
+
+    def restore(self, key):
+        """Copy a stored segment's videos into slides/files/segments of the current directory.
+
+        Returns the slide's manim-slides entry pointing at the copies, the
+        resolution and the background color it was rendered with, or None
+        when the segment is not stored.
+        """
+        segment_dir = self._segment_dir(key)
+        files_dir = os.path.join(SLIDES_DIR, 'files', 'segments')
+        try:
+            with open(os.path.join(segment_dir, SEGMENT_FILENAME), encoding='utf-8') as segment_file:
+                segment = json.load(segment_file)
+            os.makedirs(files_dir, exist_ok=True)
+            slide = dict(segment['slide'])
+            for field in ('file', 'rev_file'):
+                target = os.path.join(files_dir, f'{key}.{slide[field]}')
+                shutil.copyfile(os.path.join(segment_dir, slide[field]), target)
+                slide[field] = target.replace(os.sep, '/')
+            os.utime(os.path.join(segment_dir, SEGMENT_FILENAME))  # Marks the segment as recently used
+        except (OSError, ValueError, KeyError):  # Not stored, or evicted by another process meanwhile
+            self.stats['misses'] += 1
+            return None
+        self.stats['hits'] += 1
+        return slide, segment['resolution'], segment['background_color']
+
+    def add(self, key, slide, resolution, background_color):
+        """Store a freshly rendered slide, given its entry of the scene's manim-slides configuration."""
+        if os.path.exists(self._segment_dir(key)):
+            return
+        tmp_dir = tempfile.mkdtemp(prefix='.tmp-', dir=self.store_dir)
+        try:
+            stored_slide = dict(slide)
+            for field, name in (('file', 'segment'), ('rev_file', 'segment_reversed')):
+                filename = f'{name}{os.path.splitext(slide[field])[1]}'
+                shutil.copyfile(slide[field], os.path.join(tmp_dir, filename))
+                stored_slide[field] = filename
+            with open(os.path.join(tmp_dir, SEGMENT_FILENAME), 'w', encoding='utf-8') as segment_file:
+                json.dump({'slide': stored_slide, 'resolution': resolution, 'background_color': background_color},
+                          segment_file)
+            os.rename(tmp_dir, self._segment_dir(key))
+            self.stats['stored'] += 1
+        except OSError:  # Stored by another process meanwhile
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def _list_segments(self):
+        """(last use, size in bytes, directory) of every stored segment."""
+        segments = []
+        for name in os.listdir(self.store_dir):
+            segment_dir = os.path.join(self.store_dir, name)
+            if name.startswith('.tmp-') or not os.path.isdir(segment_dir):
+                continue
+            try:
+                last_use = os.path.getmtime(os.path.join(segment_dir, SEGMENT_FILENAME))
+                size = sum(entry.stat().st_size for entry in os.scandir(segment_dir))
+            except OSError:  # Evicted by another process meanwhile
+                continue
+            segments.append((last_use, size, segment_dir))
+        return segments
+
+    def evict(self):
+        """Remove the least recently used segments until the store fits in its budget."""
+        segments = sorted(self._list_segments())
+        size = sum(segment_size for _, segment_size, _ in segments)
+        for _, segment_size, segment_dir in segments:
+            if size <= self.budget_bytes:
+                break
+            shutil.rmtree(segment_dir, ignore_errors=True)
+            size -= segment_size
+            self.stats['evicted'] += 1
+            self.stats['evicted_bytes'] += segment_size
+        self.stats['size_bytes'] = size
+
+    def format_summary(self):
+        """One line on the segments reused, stored and evicted, and the size of the store."""
+        lookups = self.stats['hits'] + self.stats['misses']
+        summary = f"Segment store: {self.stats['hits']} of {lookups} distinct slide(s) reused, " \
+                  f"{self.stats['stored']} rendered and stored"
+        if self.stats['evicted']:
+            summary += f", {self.stats['evicted']} evicted ({self.stats['evicted_bytes'] / 2 ** 20:.1f} MiB)"
+        return summary + f"; {self.stats['size_bytes'] / 2 ** 20:.1f} of {self.budget_bytes / 2 ** 20:.1f} MiB used"
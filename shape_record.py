@@ -0,0 +1,80 @@
+# Attributes of a shape record; every record has all of them, unused ones are None
+SHAPE_FIELDS = ('slide_index', 'id', 'type', 'position', 'dimensions', 'text', 'image_path', 'color',
+                'dash_style', 'width', 'table_data', 'font_sizes', 'font_size', 'layer',
+                'animated')
+
+
+def _as_tuple(value):
+    """Store coordinates as tuples, also nested ones such as a line's (start point, end point)."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_as_tuple(item) for item in value)
+    return value
+
+
+class ShapeRecord:
+    """One extracted shape.
+
+    Records use __slots__ and keep positions and dimensions as tuples, so a
+    deck with tens of thousands of shapes takes a fraction of the memory of
+    per-shape dicts. The shape id is only unique within its slide; `key`,
+    (slide index, shape id), identifies a shape across the whole deck.
+
+    `layer` is 'master' or 'layout' for shapes a slide shows from its slide
+    master or layout (backgrounds, logos, page furniture), and None for the
+    slide's own shapes. `animated` is True for shapes the slide's animation
+    timeline targets (entrance, emphasis, exit or motion effects).
+    """
+
+    __slots__ = SHAPE_FIELDS
+
+    def __init__(self, slide_index, id, type=None, position=None, dimensions=None, text=None, image_path=None,
+                 color=None, dash_style=None, width=None, table_data=None, font_sizes=None, font_size=None,
+                 layer=None, animated=None):
+        self.slide_index = slide_index
+        self.id = id
+        self.type = type
+        self.position = _as_tuple(position)
+        self.dimensions = _as_tuple(dimensions)
+        self.text = text
+        self.image_path = image_path
+        self.color = color
+        self.dash_style = dash_style
+        self.width = width
+        self.table_data = table_data
+        self.font_sizes = font_sizes
+        self.font_size = font_size
+        self.layer = layer
+        self.animated = animated
+
+    @property
+    def key(self):
+        """Slide-qualified key of the shape: (slide index, shape id)."""
+        return self.slide_index, self.id
+
+    def to_dict(self):
+        """JSON-friendly dict of the set attributes, without the slide index.
+
+        The slide index is left out so a cached slide can be reused at another
+        position in the deck (see from_dict).
+        """
+        return {field: getattr(self, field) for field in SHAPE_FIELDS[1:] if getattr(self, field) is not None}
+
+    @classmethod
+    def from_dict(cls, data, slide_index):
+        """Rebuild a record saved with to_dict for the slide at `slide_index`."""
+        return cls(slide_index, **data)
+
+    def __eq__(self, other):
+        if not isinstance(other, ShapeRecord):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in SHAPE_FIELDS)
+
+    def __repr__(self):
+        attributes = ', '.join(f"{field}={getattr(self, field)!r}" for field in SHAPE_FIELDS
+                               if getattr(self, field) is not None)
+        return f"ShapeRecord({attributes})"
+
+
+def is_static_slide(slide_shapes_info):
+    """Whether none of a slide's shapes is animated, so the slide can be shown as a single still frame."""
+    return not any(shape_info.animated for shape_info in slide_shapes_info)
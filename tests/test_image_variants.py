@@ -0,0 +1,42 @@
+"""Pictures Pillow cannot resample must be drawn from their original file instead of aborting code generation."""
+import io
+import os
+import struct
+import sys
+
+from PIL import Image
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from image_store import ImageVariants, store_image  # noqa: E402
+
+
+def build_wmf_blob():
+    """A placeable WMF of 2000x2000 twips (100x100 pixels to Pillow) with an empty record list.
+
+    Pillow reads the size from the header, but has no loader for the pixels
+    unless a WMF handler is registered, as is the case off Windows.
+    """
+    header = struct.pack('<IHhhhhHI', 0x9AC6CDD7, 0, 0, 0, 2000, 2000, 1440, 0)
+    checksum = 0
+    for (word,) in struct.iter_unpack('<H', header):
+        checksum ^= word
+    metafile_header = struct.pack('<HHHIHIH', 1, 9, 0x300, 12, 0, 3, 0)
+    end_of_file = struct.pack('<IH', 3, 0)
+    return header + struct.pack('<H', checksum) + metafile_header + end_of_file
+
+
+def test_wmf_keeps_original_path(tmp_path):
+    image_path = store_image(build_wmf_blob(), str(tmp_path), 'wmf')
+    variants = ImageVariants('low', 7.5)
+    assert variants.get_path(image_path, (1.0, 1.0)) == image_path
+    assert variants.stats['created'] == 0
+
+
+def test_truncated_png_keeps_original_path(tmp_path):
+    buffer = io.BytesIO()
+    Image.effect_noise((400, 400), 64).save(buffer, 'PNG')
+    image_path = store_image(buffer.getvalue()[:2000], str(tmp_path))
+    variants = ImageVariants('low', 7.5)
+    assert variants.get_path(image_path, (1.0, 1.0)) == image_path
+    assert variants.stats['created'] == 0
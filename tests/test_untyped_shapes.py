@@ -0,0 +1,76 @@
+"""Shapes that draw nothing (freeforms, empty placeholders) must not emit code that moves another mobject."""
+import copy
+import os
+import subprocess
+import sys
+
+import pytest
+from pptx import Presentation
+from pptx.util import Inches
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+
+def build_freeform_master_deck(deck_path):
+    """Deck whose slide master starts with a freeform, then a rectangle, with two slides on a title layout.
+
+    python-pptx cannot add shapes to a master, so they are drawn on a scratch
+    slide and their XML is moved into the master's shape tree.
+    """
+    presentation = Presentation()
+    scratch = presentation.slides.add_slide(presentation.slide_layouts[6])
+    builder = scratch.shapes.build_freeform(Inches(0.5), Inches(0.5))
+    builder.add_line_segments([(Inches(1.5), Inches(0.5)), (Inches(1), Inches(1.5))])
+    freeform = builder.convert_to_shape()
+    rectangle = scratch.shapes.add_shape(1, Inches(0), Inches(6.5), Inches(10), Inches(1))  # MSO_SHAPE.RECTANGLE
+    master_tree = presentation.slide_master.shapes._spTree
+    for shape in (freeform, rectangle):
+        master_tree.append(copy.deepcopy(shape._element))
+    # Drop the scratch slide again
+    slide_ids = presentation.slides._sldIdLst
+    presentation.part.drop_rel(slide_ids[0].rId)
+    slide_ids.remove(slide_ids[0])
+
+    first = presentation.slides.add_slide(presentation.slide_layouts[5])  # Title only
+    first.shapes.title.text = 'First slide'
+    presentation.slides.add_slide(presentation.slide_layouts[5])  # Title left empty
+    presentation.save(deck_path)
+
+
+def generate(deck_path, tmp_path):
+    image_dir = tmp_path / 'extracted_images'
+    image_dir.mkdir()
+    frame_width, frame_height, shapes_per_slide = main.extract_presentation(str(deck_path), image_dir=str(image_dir))
+    return main.generate_manim_code(shapes_per_slide, 'WHITE', frame_width, frame_height)
+
+
+def test_untyped_shapes_emit_no_code(tmp_path):
+    deck_path = tmp_path / 'freeform_master.pptx'
+    build_freeform_master_deck(deck_path)
+    code = generate(deck_path, tmp_path)
+    compile(code, 'generated.py', 'exec')
+
+    # Every move_to follows a mobject built since the previous one, within the same slide
+    assigned = False
+    for line in code.splitlines():
+        stripped = line.strip()
+        if stripped.startswith('# Slide '):
+            assigned = False
+        elif stripped.startswith('mobject = '):
+            assigned = True
+        elif stripped.startswith('mobject.move_to('):
+            assert assigned, f"move_to without a mobject built for it:\n{code}"
+            assigned = False
+
+
+def test_freeform_master_deck_renders(tmp_path):
+    pytest.importorskip('manim')
+    pytest.importorskip('manim_slides')
+    deck_path = tmp_path / 'freeform_master.pptx'
+    build_freeform_master_deck(deck_path)
+    script_path = tmp_path / 'generated.py'
+    script_path.write_text(generate(deck_path, tmp_path), encoding='utf-8')
+    subprocess.run([sys.executable, '-m', 'manim', 'render', '-ql', '--dry_run', str(script_path),
+                    'GeneratedPresentation'], cwd=tmp_path, check=True)
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import os
+import re
+import sys
+from bisect import bisect_right
+from functools import lru_cache
+from itertools import accumulate, repeat
+
+# font_size the generated code draws text boxes with
+TEXT_FONT_SIZE = 24
+
+# manim draws Text so that font_size 48 has an em of half a frame unit, whatever the frame size
+FONT_SIZE_PER_EM_UNIT = 96
+
+# PowerPoint's default left and right insets of a text box, 0.1 inch each, in frame units (inches)
+TEXT_BOX_INSET = 0.2
+
+# Advances are stored in thousandths of an em, as integers
+ADVANCE_UNITS_PER_EM = 1000
+
+# Characters measured into each table: Basic Latin, Latin-1, Latin Extended-A and B and General Punctuation
+MEASURED_CHARACTERS = ''.join(chr(code) for code in (*range(0x20, 0x7F), *range(0xA0, 0x250), *range(0x2000, 0x2070)))
+
+# Width of characters missing from a table, such as CJK ideographs, which are about one em wide
+UNKNOWN_ADVANCE = ADVANCE_UNITS_PER_EM
+
+# Bumped whenever the tables are measured differently, so older cached tables are measured again
+FONT_METRICS_VERSION = 1
+
+# Directory of the cached advance tables under the image store, one JSON file per font
+FONT_METRICS_DIR = 'font_metrics'
+
+# Default sans-serif fonts Pango falls back to for manim's Text, by platform, tried in order
+SANS_FONT_FILES = {
+    'darwin': ('/System/Library/Fonts/Helvetica.ttc', '/Library/Fonts/Arial.ttf'),
+    'win32': (os.path.join(os.environ.get('WINDIR', 'C:\\Windows'), 'Fonts', 'arial.ttf'),),
+}
+LINUX_SANS_FONT_FILES = ('/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf', '/usr/share/fonts/TTF/DejaVuSans.ttf',
+                         '/usr/share/fonts/dejavu/DejaVuSans.ttf',
+                         '/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf')
+
+# Advance tables loaded by this process, by font file ('' for Pillow's built-in font)
+_advance_tables = {}
+
+
+@lru_cache(maxsize=None)
+def find_sans_font():
+    """Font file manim's Text is most likely drawn with here, or '' when none of the usual ones exists."""
+    for font_path in SANS_FONT_FILES.get(sys.platform, LINUX_SANS_FONT_FILES):
+        if os.path.exists(font_path):
+            return font_path
+    return ''
+
+
+def measure_advances(font_path):
+    """Advance of each character of MEASURED_CHARACTERS in thousandths of an em, measured with Pillow.
+
+    Characters are measured one at a time, so kerning between them is left out.
+    """
+    from PIL import ImageFont  # Pillow is only loaded when a font has not been measured yet
+
+    font = ImageFont.truetype(font_path, ADVANCE_UNITS_PER_EM) if font_path \
+        else ImageFont.load_default(ADVANCE_UNITS_PER_EM)
+    return {character: round(font.getlength(character)) for character in MEASURED_CHARACTERS}
+
+
+def get_metrics_path(font_path, metrics_dir):
+    """Path of the cached advance table of a font file; a changed font file gets a new table."""
+    stat = os.stat(font_path) if font_path else None
+    source = json.dumps([FONT_METRICS_VERSION, font_path, stat and stat.st_size, stat and stat.st_mtime_ns])
+    name = os.path.splitext(os.path.basename(font_path))[0] if font_path else 'default'
+    return os.path.join(metrics_dir, f"{name}.{hashlib.sha1(source.encode()).hexdigest()[:12]}.json")
+
+
+def get_advances(font_path=None, metrics_dir=None):
+    """Advance table of a font (see measure_advances), measured once per process.
+
+    `font_path` defaults to find_sans_font(). With `metrics_dir`, the table is
+    also cached there on disk, so later runs load it instead of measuring; it
+    is written through a temporary file, so conversions running at once never
+    read half a table. Once loaded, the table is reused whatever the directory.
+    """
+    if font_path is None:
+        font_path = find_sans_font()
+    if font_path in _advance_tables:
+        return _advance_tables[font_path]
+    if metrics_dir is None:
+        advances = measure_advances(font_path)
+    else:
+        metrics_path = get_metrics_path(font_path, metrics_dir)
+        try:
+            with open(metrics_path, encoding='utf-8') as metrics_file:
+                advances = json.load(metrics_file)
+        except (OSError, ValueError):
+            advances = measure_advances(font_path)
+            os.makedirs(metrics_dir, exist_ok=True)
+            tmp_path = f"{metrics_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as metrics_file:
+                json.dump(advances, metrics_file, ensure_ascii=False)
+            os.replace(tmp_path, metrics_path)
+    _advance_tables[font_path] = advances
+    return advances
+
+
+def _word_width(advances, word):
+    """Width of a word in thousandths of an em.
+
+    Not cached: summing a word is cheap, and a cache would keep every distinct
+    word of the deck, so code generation would no longer run in flat memory.
+    """
+    return sum(map(advances.get, word, repeat(UNKNOWN_ADVANCE)))
+
+
+def wrap_paragraph(paragraph, max_width, font_path):
+    """Break a paragraph into lines no wider than `max_width` thousandths of an em, greedily as PowerPoint does.
+
+    The end of every word is found at once as a running sum of the word and
+    space widths, so each line is a single bisection of those sums instead of
+    a measurement of trial lines. A word wider than the line is kept whole on
+    a line of its own.
+    """
+    words = paragraph.split(' ')
+    if len(words) == 1:
+        return paragraph
+    advances = _advance_tables[font_path]
+    space = advances.get(' ', UNKNOWN_ADVANCE)
+    # ends[i] is where word i ends plus one space, from the start of the paragraph
+    ends = list(accumulate(_word_width(advances, word) + space for word in words))
+    lines = []
+    start = 0
+    line_start = 0
+    while start < len(words):
+        end = max(bisect_right(ends, line_start + max_width + space, lo=start), start + 1)
+        lines.append(' '.join(words[start:end]))
+        line_start = ends[end - 1]
+        start = end
+    return '\n'.join(lines)
+
+
+def wrap_text(text, dimensions, font_size=TEXT_FONT_SIZE, font_path=None):
+    """Text with line breaks added so that manim's Text at `font_size` fits a box of `dimensions` (width, height).
+
+    Dimensions are in frame units. Paragraph and line breaks already in the
+    text are kept. The text is returned unchanged when the box has no usable
+    width, as for the text of a line, whose dimensions are its end points.
+    Uses the advance table already loaded for the font, see get_advances.
+    """
+    width = dimensions[0] if dimensions else None
+    if not text or not isinstance(width, (int, float)) or width <= TEXT_BOX_INSET:
+        return text
+    if font_path is None:
+        font_path = find_sans_font()
+    get_advances(font_path)
+    max_width = (width - TEXT_BOX_INSET) * FONT_SIZE_PER_EM_UNIT / font_size * ADVANCE_UNITS_PER_EM
+    # Break characters are kept as they are, so only the text between them is wrapped
+    parts = re.split(r'([\n\v])', text)
+    parts[::2] = [wrap_paragraph(paragraph, max_width, font_path) for paragraph in parts[::2]]
+    return ''.join(parts)
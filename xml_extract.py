@@ -0,0 +1,329 @@
+import os
+import zipfile
+
+from lxml import etree
+from pptx.enum.dml import MSO_LINE_DASH_STYLE
+from pptx.util import Emu
+
+import pptx_package
+from image_store import store_image
+from shape_record import ShapeRecord
+
+ns = {'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
+      'p': 'http://schemas.openxmlformats.org/presentationml/2006/main',
+      'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'}
+
+TABLE_URI = 'http://schemas.openxmlformats.org/drawingml/2006/table'
+
+# Shape elements of a shape tree, the same set python-pptx exposes as slide.shapes
+SHAPE_TAGS = {f"{{{ns['p']}}}{tag}" for tag in ('sp', 'grpSp', 'graphicFrame', 'cxnSp', 'pic', 'contentPart')}
+
+# Precompiled lookups, evaluated relative to a shape element
+find_spTree = etree.XPath('/p:sld/p:cSld/p:spTree | /p:sldLayout/p:cSld/p:spTree | /p:sldMaster/p:cSld/p:spTree',
+                          namespaces=ns)
+find_cNvPr = etree.XPath('*[1]/p:cNvPr', namespaces=ns)
+find_ph = etree.XPath('*[1]/p:nvPr/p:ph', namespaces=ns)
+find_xfrm = etree.XPath('p:spPr/a:xfrm | p:xfrm | p:grpSpPr/a:xfrm', namespaces=ns)
+find_txBox = etree.XPath('string(p:nvSpPr/p:cNvSpPr/@txBox)', namespaces=ns)
+find_prstGeom = etree.XPath('string(p:spPr/a:prstGeom/@prst)', namespaces=ns)
+has_prstGeom = etree.XPath('boolean(p:spPr/a:prstGeom)', namespaces=ns)
+has_custGeom = etree.XPath('boolean(p:spPr/a:custGeom)', namespaces=ns)
+find_paragraphs = etree.XPath('p:txBody/a:p | a:txBody/a:p', namespaces=ns)
+find_content = etree.XPath('a:r | a:br | a:fld', namespaces=ns)
+find_line = etree.XPath('p:spPr/a:ln', namespaces=ns)
+find_line_rgb = etree.XPath('string(a:solidFill/a:srgbClr/@val)', namespaces=ns)
+find_dash = etree.XPath('string(a:prstDash/@val)', namespaces=ns)
+find_blip_embed = etree.XPath('string(p:blipFill/a:blip/@r:embed)', namespaces=ns)
+find_graphic_uri = etree.XPath('string(a:graphic/a:graphicData/@uri)', namespaces=ns)
+find_rows = etree.XPath('a:graphic/a:graphicData/a:tbl/a:tr', namespaces=ns)
+find_cells = etree.XPath('a:tc', namespaces=ns)
+find_run_sizes = etree.XPath('a:txBody/a:p/a:r', namespaces=ns)
+find_animation_targets = etree.XPath('p:timing//p:spTgt/@spid', namespaces=ns)
+
+# Layout placeholders inherit from the master placeholder of this type (python-pptx's mapping)
+MASTER_PLACEHOLDER_TYPES = {
+    'body': 'body', 'chart': 'body', 'clipArt': 'body', 'ctrTitle': 'title', 'dgm': 'body',
+    'dt': 'dt', 'ftr': 'ftr', 'media': 'body', 'obj': 'body', 'pic': 'body', 'sldNum': 'sldNum',
+    'subTitle': 'body', 'tbl': 'body', 'title': 'title',
+}
+
+
+def local_name(element):
+    """Tag of an element without its namespace."""
+    return etree.QName(element).localname
+
+
+def get_xfrm(element):
+    """Directly applied (x, y, cx, cy) of a shape element in EMU, or None."""
+    xfrm = find_xfrm(element)
+    if not xfrm:
+        return None
+    off = xfrm[0].find('a:off', ns)
+    ext = xfrm[0].find('a:ext', ns)
+    if off is None or ext is None:
+        return None
+    return int(off.get('x')), int(off.get('y')), int(ext.get('cx')), int(ext.get('cy'))
+
+
+def get_flips(element):
+    """(flipH, flipV) of a shape element's transform."""
+    xfrm = find_xfrm(element)
+    if not xfrm:
+        return False, False
+    return xfrm[0].get('flipH') in ('1', 'true'), xfrm[0].get('flipV') in ('1', 'true')
+
+
+def shows_master_shapes(element):
+    """Whether a slide or layout root element shows the shapes of the layout or master behind it."""
+    return element.get('showMasterSp') not in ('0', 'false')
+
+
+def get_animated_shape_ids(element):
+    """Ids of the shapes a slide root element's animation timeline targets."""
+    return {int(spid) for spid in find_animation_targets(element)}
+
+
+def get_text(element):
+    """Text of a shape's text body, with the same conventions as python-pptx's `shape.text`."""
+    paragraphs = []
+    for paragraph in find_paragraphs(element):
+        parts = []
+        for child in find_content(paragraph):
+            if local_name(child) == 'br':
+                parts.append('\v')
+            else:
+                t = child.find('a:t', ns)
+                parts.append(t.text or '' if t is not None else '')
+        paragraphs.append(''.join(parts))
+    return '\n'.join(paragraphs)
+
+
+class SlideXmlReader:
+    """Extraction backend that reads slide XML straight from the .pptx zip with lxml.
+
+    It exposes `slide_width`, `slide_height` and `slides` like a python-pptx
+    Presentation, and `extract_slide` returns the same shape records as
+    main.extract_shapes_from_slide without building python-pptx proxy objects.
+    """
+
+    def __init__(self, presentation_path):
+        self.package = zipfile.ZipFile(presentation_path)
+        self.slides = pptx_package.get_slide_members(self.package)
+        slide_width, slide_height = pptx_package.get_slide_size(self.package)
+        self.slide_width, self.slide_height = Emu(slide_width), Emu(slide_height)
+        self._placeholders = {}  # Layout and master placeholders, parsed once per part
+        self._layer_shapes = {}  # Shapes layouts and masters show on their slides, parsed once per part
+        self._stored_images = {}  # (media part, image dir) -> stored path, so each blob is read once
+
+    def close(self):
+        self.package.close()
+
+    def _parse(self, member):
+        return etree.fromstring(self.package.read(member))
+
+    def _get_placeholders(self, member):
+        """Placeholder elements of a layout or master part, parsed once and cached."""
+        if member not in self._placeholders:
+            placeholders = []
+            for element in find_spTree(self._parse(member))[0]:
+                if element.tag in SHAPE_TAGS and find_ph(element):
+                    ph = find_ph(element)[0]
+                    placeholders.append((int(ph.get('idx', 0)), ph.get('type', 'obj'), get_xfrm(element)))
+            related_master = pptx_package.get_related_member(self.package, member, '/slideMaster')
+            self._placeholders[member] = (placeholders, related_master)
+        return self._placeholders[member]
+
+    def _get_layer_shapes(self, member):
+        """Non-placeholder shape elements of a layout or master part and its relationships, parsed once."""
+        if member not in self._layer_shapes:
+            root = self._parse(member)
+            elements = [element for element in find_spTree(root)[0]
+                        if element.tag in SHAPE_TAGS and not find_ph(element)]
+            self._layer_shapes[member] = (root, elements, pptx_package.get_related_members(self.package, member))
+        return self._layer_shapes[member]
+
+    def _get_layers(self, root, layout_member):
+        """(layer, member) of the master and layout whose shapes a slide shows, in drawing order."""
+        if layout_member is None or not shows_master_shapes(root):
+            return []
+        layers = [('layout', layout_member)]
+        master_member = self._get_placeholders(layout_member)[1]
+        if master_member is not None and shows_master_shapes(self._get_layer_shapes(layout_member)[0]):
+            layers.insert(0, ('master', master_member))
+        return layers
+
+    def _inherited_xfrm(self, layout_member, ph):
+        """Transform a slide placeholder inherits through its layout and master placeholders."""
+        if layout_member is None:
+            return None
+        layout_placeholders, master_member = self._get_placeholders(layout_member)
+        idx = int(ph.get('idx', 0))
+        for layout_idx, layout_type, xfrm in layout_placeholders:
+            if layout_idx != idx:
+                continue
+            if xfrm is not None or master_member is None:
+                return xfrm
+            master_type = MASTER_PLACEHOLDER_TYPES.get(layout_type)
+            for _, master_ph_type, master_xfrm in self._get_placeholders(master_member)[0]:
+                if master_ph_type == master_type:
+                    return master_xfrm
+            return None
+        return None
+
+    def extract_slide(self, slide_index, frame_width, frame_height, image_dir):
+        """Extract the shapes of one slide, as main.extract_shapes_from_slide does."""
+        member = self.slides[slide_index]
+        root = self._parse(member)
+        related = pptx_package.get_related_members(self.package, member)
+        layout_member = pptx_package.get_related_member(self.package, member, '/slideLayout')
+
+        animated_ids = get_animated_shape_ids(root)
+
+        extracted_shapes = []
+        # Master and layout shapes first, in drawing order, as main.get_slide_layers lists them
+        for layer, layer_member in self._get_layers(root, layout_member):
+            _, elements, layer_related = self._get_layer_shapes(layer_member)
+            for element in elements:
+                shape_info = self._extract_shape(element, slide_index, frame_width, frame_height, image_dir,
+                                                 layer_related, None, extracted_shapes, layer)
+                if shape_info is not None:
+                    extracted_shapes.append(shape_info)
+        for element in find_spTree(root)[0]:
+            if element.tag not in SHAPE_TAGS:
+                continue
+            shape_info = self._extract_shape(element, slide_index, frame_width, frame_height, image_dir, related,
+                                             layout_member, extracted_shapes, animated_ids=animated_ids)
+            if shape_info is not None:
+                extracted_shapes.append(shape_info)
+        return extracted_shapes
+
+    def _extract_shape(self, element, slide_index, frame_width, frame_height, image_dir, related, layout_member,
+                       extracted_shapes, layer=None, animated_ids=frozenset()):
+        """Shape record of one shape element; a text record is appended first for shapes with text."""
+        tag = local_name(element)
+        cNvPr = find_cNvPr(element)[0]
+        shape_id, name = int(cNvPr.get('id')), cNvPr.get('name', '')
+        animated = True if shape_id in animated_ids else None
+        if layer is not None:
+            shape_id = f"{layer}_{shape_id}"
+        ph = find_ph(element)
+        is_placeholder = bool(ph) and tag in ('sp', 'pic')
+
+        xfrm = get_xfrm(element)
+        if xfrm is None and is_placeholder:
+            xfrm = self._inherited_xfrm(layout_member, ph[0])
+        if xfrm is None:
+            return None  # Nothing to position, e.g. a content part
+        x, y, cx, cy = xfrm
+        # Same arithmetic as python-pptx's Length.pt used by main.convert_position
+        left, top, width, height = x / 12700.0, y / 12700.0, cx / 12700.0, cy / 12700.0
+        position = (
+            left / 72 - frame_width / 2 + width / 72 / 2,
+            frame_height / 2 - top / 72 - height / 72 / 2,
+            0
+        )
+
+        text = get_text(element) if tag == 'sp' else ''
+        # Same precedence as python-pptx: placeholder, freeform, auto shape, then text box
+        is_plain_sp = tag == 'sp' and not is_placeholder and not has_custGeom(element)
+        is_txbox = find_txBox(element) in ('1', 'true')
+        is_autoshape = is_plain_sp and has_prstGeom(element) and not is_txbox
+        is_textbox = is_plain_sp and is_txbox
+
+        shape_info = ShapeRecord(
+            slide_index,
+            shape_id,
+            position=position,
+            dimensions=(width / 72, height / 72),
+            text=text if text else None,
+            layer=layer,
+            animated=animated,
+        )
+
+        if is_autoshape:
+            prst = find_prstGeom(element)
+            if name.startswith('Line'):
+                shape_info.type = 'line'
+            elif prst == 'rect':
+                shape_info.type = 'rectangle'
+            elif prst == 'ellipse':
+                shape_info.type = 'oval'
+            else:
+                return None
+        elif "Arrow" in name:  # Detect arrows
+            shape_info.type = 'arrow'
+            shape_info.width = cx / 914440 if cx / 914440 >= 0.1 else 1
+            shape_info.dimensions = self._get_start_point_and_end_point(element, xfrm, frame_width, frame_height)
+        elif "Connector" in name:
+            shape_info.type = 'line'
+            start_point, end_point = self._get_start_point_and_end_point(element, xfrm, frame_width, frame_height)
+            line = find_line(element)
+            dash = find_dash(line[0]) if line else ''
+            try:
+                shape_info.dash_style = MSO_LINE_DASH_STYLE.from_xml(dash) if dash else 'solid'
+            except (KeyError, ValueError):
+                shape_info.dash_style = 'solid'  # Handle unrecognized dash styles
+            rgb = find_line_rgb(line[0]) if line else ''
+            shape_info.color = rgb.upper() if rgb else '000000'
+            shape_info.dimensions = (start_point, end_point)
+        elif is_textbox:
+            if text:
+                shape_info.type = 'text'
+            else:
+                return None
+        elif tag == 'pic' and not is_placeholder:  # Image
+            shape_info.type = 'image'
+            image_member = related[find_blip_embed(element)]
+            fallback_ext = os.path.splitext(image_member)[1] or 'png'
+            shape_info.image_path = self._store_image(image_member, image_dir, fallback_ext)
+        elif tag == 'graphicFrame' and find_graphic_uri(element) == TABLE_URI:  # Table
+            shape_info.type = 'table'
+            table_data = []
+            font_sizes = []
+            for row in find_rows(element):
+                row_data = []
+                row_font_sizes = []
+                for cell in find_cells(row):
+                    row_data.append(get_text(cell))
+                    for run in find_run_sizes(cell):
+                        rPr = run.find('a:rPr', ns)
+                        sz = rPr.get('sz') if rPr is not None else None
+                        row_font_sizes.append(int(sz) / 100 if sz is not None else None)
+                table_data.append(row_data)
+                font_sizes.append(row_font_sizes)
+
+            shape_info.font_sizes = font_sizes
+            shape_info.table_data = table_data
+
+        if tag == 'sp' and not is_textbox and text:
+            text_info = ShapeRecord(
+                slide_index,
+                f"{shape_id}_text",
+                type='text',
+                text=text,
+                position=position,  # Align text to the center of the shape
+                dimensions=shape_info.dimensions,
+                layer=layer,
+                animated=animated,
+            )
+            extracted_shapes.append(text_info)  # Add text as a separate shape
+
+        return shape_info
+
+    def _store_image(self, image_member, image_dir, fallback_ext):
+        """Store a media part in the image store; a part used on many slides is only read the first time."""
+        key = (image_member, image_dir)
+        if key not in self._stored_images:
+            self._stored_images[key] = store_image(self.package.read(image_member), image_dir, fallback_ext)
+        return self._stored_images[key]
+
+    @staticmethod
+    def _get_start_point_and_end_point(element, xfrm, frame_width, frame_height):
+        """Start and end point of a connector, honouring its flips like python-pptx."""
+        x, y, cx, cy = xfrm
+        flip_h, flip_v = get_flips(element)
+        begin_x, end_x = (x + cx, x) if flip_h else (x, x + cx)
+        begin_y, end_y = (y + cy, y) if flip_v else (y, y + cy)
+        start_point = (begin_x / 12700 / 72 - frame_width / 2, frame_height / 2 - begin_y / 12700 / 72, 0)
+        end_point = (end_x / 12700 / 72 - frame_width / 2, frame_height / 2 - end_y / 12700 / 72, 0)
+        return start_point, end_point
@@ -1,87 +1,38 @@
+import zipfile
+from functools import lru_cache
 from pptx import Presentation
-import xml.etree.ElementTree as ET
 from lxml import etree
 from manim import *
 from manim_slides import Slide
+import pptx_package
+from color_resolver import ColorResolver, ThemeResolver
+from mobject_cache import MOBJECT_CACHE_SIZE, TABLE_CELL_CACHE_SIZE, TABLE_CELL_LIMIT
+from shape_record import ShapeRecord, is_static_slide
+from text_layout import TEXT_FONT_SIZE, wrap_text
 background_color = WHITE
-# Function to parse the theme XML and create a map of theme colors
-def parse_theme_colors(theme_xml):
-    ns = {'a': 'http://schemas.openxmlformats.org/drawingml/2006/main'}
-    root = ET.fromstring(theme_xml)
-    theme_colors = {}
-
-    # Find the theme color definitions in the clrScheme tag
-    color_schemes = root.findall('.//a:clrScheme', namespaces=ns)
-
-    if color_schemes:
-        for scheme in color_schemes:
-            for color in scheme:
-                color_tag = color.tag.split('}')[1]  # Extract the tag after namespace
-
-                # Handle <a:srgbClr>
-                srgb_clr = color.find('.//a:srgbClr', namespaces=ns)
-                if srgb_clr is not None:
-                    color_val = srgb_clr.attrib.get('val')  # Example: "FFFFFF"
-                    theme_colors[color_tag] = f'#{color_val}'
-                    continue  # Skip to the next color if found
-
-                # Handle <a:sysClr> (system colors like bg1, tx1)
-                sys_clr = color.find('.//a:sysClr', namespaces=ns)
-                if sys_clr is not None:
-                    color_val = sys_clr.attrib.get('lastClr')  # Example: "FFFFFF"
-                    theme_colors[color_tag] = f'#{color_val}'
-                    continue  # Skip to the next color if found
-
-                # Handle luminance modification (lumMod and lumOff)
-                scheme_clr = color.find('.//a:schemeClr', namespaces=ns)
-                if scheme_clr is not None:
-                    lum_mod = scheme_clr.find('.//a:lumMod', namespaces=ns)
-                    lum_off = scheme_clr.find('.//a:lumOff', namespaces=ns)
-                    if lum_mod is not None or lum_off is not None:
-                        theme_colors[color_tag] = f'Luminance Modified Color'
-                    else:
-                        theme_colors[color_tag] = 'Scheme Color'
-
-    return theme_colors
-
-# Function to get the adjusted color with luminance and shade applied
-def get_adjusted_color(color_val, lum_mod=None, shade_mod=None, theme_colors=None):
-    if theme_colors:
-        base_color = theme_colors.get(color_val, '#FFFFFF')  # Default to white if not found
-
-        # Convert hex to RGB
-        rgb = [int(base_color[i:i+2], 16) for i in (1, 3, 5)]
-
-        # Apply luminance adjustment if present
-        if lum_mod is not None:
-            lum_factor = lum_mod / 100000
-            rgb = [int(c * lum_factor) for c in rgb]
-
-        # Apply shade adjustment if present
-        if shade_mod is not None:
-            shade_factor = shade_mod / 100000
-            rgb = [int(c * (1 + shade_factor)) for c in rgb]
-
-        # Ensure RGB values are within valid range
-        rgb = [max(0, min(255, c)) for c in rgb]
-
-        # Convert back to hex
-        return '#{:02X}{:02X}{:02X}'.format(*rgb)
-    return '#FFFFFF'
-
-
-def extract_shape_info(slide_xml, master_slide_clr_mapping, theme_colors):
+
+
+def extract_shape_info(slide_xml, master_slide_clr_mapping, theme_colors, color_resolver=None, slide_index=None):
+    """Extract shapes and text from slide XML (a string, bytes or parsed element) as ShapeRecords.
+
+    Pass a ColorResolver built once per deck to share its color table and
+    cache across slides; otherwise one is built from the mapping and theme.
+    Positions are left in EMU, (x, y) of the top-left corner, and dimensions
+    are in inches; see convert_position.
+    """
     ns = {'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
           'p': 'http://schemas.openxmlformats.org/presentationml/2006/main'}
+    if color_resolver is None:
+        color_resolver = ColorResolver(theme_colors, master_slide_clr_mapping)
 
     shape_info = []
 
-    root = etree.fromstring(slide_xml)
+    root = slide_xml if etree.iselement(slide_xml) else etree.fromstring(slide_xml)
     shapes = root.findall('.//p:sp', namespaces=ns)
 
     # Find all shapes
     for shape in shapes:
-        info = {}
+        info = ShapeRecord(slide_index, None)
 
         # Extract shape type
         shape_type_elem = shape.find('.//p:nvSpPr/p:cNvPr', namespaces=ns)
@@ -89,12 +40,12 @@ def extract_shape_info(slide_xml, master_slide_clr_mapping, theme_colors):
             shape_name = shape_type_elem.get('name')
             shape_id = shape_type_elem.get('id')  # Extract shape ID
             if shape_id:
-                info['id'] = shape_id  # Save the ID
+                info.id = shape_id  # Save the ID
             if shape_name:
                 if 'Oval' in shape_name:
-                    info['type'] = 'Oval'
+                    info.type = 'Oval'
                 else:
-                    info['type'] = 'Unknown'
+                    info.type = 'Unknown'
 
         # Extract position and size
         xfrm = shape.find('.//a:xfrm', namespaces=ns)
@@ -102,80 +53,45 @@ def extract_shape_info(slide_xml, master_slide_clr_mapping, theme_colors):
             off = xfrm.find('a:off', namespaces=ns)
             ext = xfrm.find('a:ext', namespaces=ns)
             if off is not None and ext is not None:
-                info['position'] = {'x': int(off.get('x')), 'y': int(off.get('y'))}
-                info['size'] = {
-                    'cx': int(ext.get('cx')) / 914400,  # Convert from EMU to points
-                    'cy': int(ext.get('cy')) / 914400  # Convert from EMU to points
-                }
-        else:
-            info['position'] = None
-            info['size'] = None
+                info.position = (int(off.get('x')), int(off.get('y')))
+                info.dimensions = (
+                    int(ext.get('cx')) / 914400,  # Convert from EMU to inches
+                    int(ext.get('cy')) / 914400  # Convert from EMU to inches
+                )
 
-        # Extract shape color
+        # Extract shape color; the resolver maps it through the color map and theme
         solid_fill = shape.find('.//a:solidFill', namespaces=ns)
         if solid_fill is not None:
-            scheme_clr = solid_fill.find('a:schemeClr', namespaces=ns)
-            if scheme_clr is not None:
-                color_val = scheme_clr.get('val')
-                # Map to actual color using master_slide_clr_mapping
-                actual_color_val = master_slide_clr_mapping.get(color_val, color_val)
-                # Get the actual color value from theme_colors
-                info['color'] = get_adjusted_color(
-                    actual_color_val,
-                    lum_mod=int(scheme_clr.find('a:lumMod', namespaces=ns).get('val')) if scheme_clr.find('a:lumMod',
-                                                                                                          namespaces=ns) is not None else None,
-                    shade_mod=int(scheme_clr.find('a:shade', namespaces=ns).get('val')) if scheme_clr.find('a:shade',
-                                                                                                           namespaces=ns) is not None else None,
-                    theme_colors=theme_colors
-                )
-            else:
-                info['color'] = None
-        else:
-            info['color'] = None
+            info.color = color_resolver.resolve(solid_fill.find('a:schemeClr', namespaces=ns))
 
         shape_info.append(info)
 
         # Extract text content and treat it as a separate Text object
         text_elems = shape.findall('.//a:t', namespaces=ns)
         if text_elems:
-            text_info = {}
-
             text_content = '\n'.join([elem.text for elem in text_elems if elem.text is not None])
-            text_info['type'] = 'Text'
-            text_info['text'] = text_content
 
             # Use the same position and size as the shape for the text
-            text_info['position'] = info.get('position')
-            text_info['size'] = info.get('size')
+            text_info = ShapeRecord(slide_index, f"{info.id}_text", type='Text', text=text_content,
+                                    position=info.position, dimensions=info.dimensions)
 
             # Extract text color (using the same color field)
             rPr = shape.find('.//a:rPr', namespaces=ns)
             if rPr is not None:
                 text_fill = rPr.find('.//a:solidFill/a:schemeClr', namespaces=ns)
                 if text_fill is not None:
-                    text_color_val = text_fill.get('val')
-                    # Map to actual color using master_slide_clr_mapping
-                    actual_text_color_val = master_slide_clr_mapping.get(text_color_val, text_color_val)
-                    # Get the actual text color value from theme_colors
-                    text_info['color'] = get_adjusted_color(
-                        actual_text_color_val,
-                        lum_mod=int(text_fill.find('a:lumMod', namespaces=ns).get('val')) if text_fill.find('a:lumMod',
-                                                                                                            namespaces=ns) is not None else None,
-                        shade_mod=int(text_fill.find('a:shade', namespaces=ns).get('val')) if text_fill.find('a:shade',
-                                                                                                             namespaces=ns) is not None else None,
-                        theme_colors=theme_colors
-                    )
+                    text_info.color = color_resolver.resolve(text_fill)
                 else:
-                    text_info['color'] = '#000000'  # Default text color if not found
+                    text_info.color = '#000000'  # Default text color if not found
             else:
-                text_info['color'] = '#000000'  # Default text color if no formatting is found
+                text_info.color = '#000000'  # Default text color if no formatting is found
 
             # Extract font size
             if rPr is not None:
                 sz = rPr.get('sz')
-                text_info['font_size'] = int(sz) / 100 if sz is not None else 27  # Default font size if not found
+                text_info.font_size = int(sz) / 100 if sz is not None else 27  # Default font size if not found
             else:
-                text_info['font_size'] = 27  # Default font size if no formatting is found
+                text_info.font_size = 27  # Default font size if no formatting is found
 
             # Append the text object to the list
             shape_info.append(text_info)
@@ -191,169 +107,199 @@ def convert_position(shape):
     """Convert PowerPoint coordinates to Manim coordinates."""
 
     # Convert from EMU to points
-    x_in_points = shape['position']['x'] * EMU_TO_POINTS
-    y_in_points = shape['position']['y'] * EMU_TO_POINTS
+    x_in_points = shape.position[0] * EMU_TO_POINTS
+    y_in_points = shape.position[1] * EMU_TO_POINTS
 
     # Convert to Manim coordinates
-    manim_x = x_in_points / 72 - config.frame_width / 2 + shape['size']['cx'] / 2
-    manim_y = config.frame_height / 2 - (y_in_points / 72 + shape['size']['cy'] / 2)
+    manim_x = x_in_points / 72 - config.frame_width / 2 + shape.dimensions[0] / 2
+    manim_y = config.frame_height / 2 - (y_in_points / 72 + shape.dimensions[1] / 2)
 
     return [manim_x, manim_y, 0]
 
 
-def extract_color_values_from_theme(theme_xml):
-    root = ET.fromstring(theme_xml)
-    ns = {'a': 'http://schemas.openxmlformats.org/drawingml/2006/main'}
-    color_values = {}
-
-    for color in root.findall('.//a:clrScheme/*', ns):
-        color_name = color.tag.split('}')[-1]  # Get the tag name without namespace
-        color_value = color.find('.//a:srgbClr', ns)
-        if color_value is not None:
-            color_values[color_name] = color_value.get('val')
-        else:
-            color_value = color.find('.//a:sysClr', ns)
-            if color_value is not None:
-                color_values[color_name] = color_value.get('lastClr')
-
-    return color_values
+# Texts, tables and images repeated across slides are built once; slides add copies
+@lru_cache(maxsize=MOBJECT_CACHE_SIZE)
+def cached_text(text, font_size, color):
+    return Text(text, font_size=font_size, color=color)
 
-def map_colors_to_values(master_slide_clr_mapping, color_values):
-    final_color_mapping = {}
 
-    for master_color, theme_color in master_slide_clr_mapping.items():
-        final_color_mapping[master_color] = color_values.get(theme_color, 'Color not found')
+# Each distinct table cell string is typeset once; tables add copies
+@lru_cache(maxsize=TABLE_CELL_CACHE_SIZE)
+def cached_tex_cell(text):
+    return MathTex(text, color=BLACK)
 
-    return final_color_mapping
 
-def extract_master_slide_clr_mapping(master_slide_xml):
-    root = ET.fromstring(master_slide_xml)
-    ns = {'p': 'http://schemas.openxmlformats.org/presentationml/2006/main'}
-    clr_map_elem = root.find('p:clrMap', ns)
+@lru_cache(maxsize=TABLE_CELL_CACHE_SIZE)
+def cached_text_cell(text):
+    return Text(text, color=BLACK)
 
-    if clr_map_elem is not None:
-        return {key: value for key, value in clr_map_elem.attrib.items()}
-    else:
-        return {}
 
-def create_mobject(shape_info):
-    """Create a Manim mobject based on the shape_info."""
-    mobject = None
-    if shape_info['type'] == 'rectangle':
-        mobject = Rectangle(
-            width=shape_info['dimensions'][0],
-            height=shape_info['dimensions'][1],
-            color=BLACK
-        )
-    elif shape_info['type'] == 'Oval':
-        mobject = Ellipse(
-            width=shape_info['size']['cx'],
-            height=shape_info['size']['cy'],
-        )
+@lru_cache(maxsize=MOBJECT_CACHE_SIZE)
+def cached_table(table_data, table_cell_limit=TABLE_CELL_LIMIT):
+    make_cell = cached_text_cell if sum(map(len, table_data)) > table_cell_limit else cached_tex_cell
+    mobject = MobjectTable(
+        [[make_cell(text).copy() for text in row] for row in table_data],
+        include_outer_lines=True,
+        line_config={"stroke_color": BLACK, "stroke_width": 2},
+    )
+    mobject.scale(0.4)  # Same scale as the generated code
+    return mobject
 
-        # Apply the color if it exists
-        if 'color' in shape_info:
-            mobject.set_fill(color=shape_info['color'], opacity=1)
-            mobject.set_stroke(color=BLACK)  # You can adjust the width as needed
 
+@lru_cache(maxsize=MOBJECT_CACHE_SIZE)
+def cached_image(path):
+    return ImageMobject(path)
 
 
-    elif shape_info['type'] == 'Text':
-        if shape_info['text'] is None:
-            shape_info['text']='failed'
-        font_size = shape_info.get('font_size', 27)  # Default to 27 if not provided
+def get_mobject_cache_report():
+    """Hit rate of the mobject caches, one line per kind that was used."""
+    lines = []
+    for kind, cached in (('text', cached_text), ('table', cached_table), ('image', cached_image),
+                         ('LaTeX cell', cached_tex_cell), ('Text cell', cached_text_cell)):
+        info = cached.cache_info()
+        calls = info.hits + info.misses
+        if calls:
+            lines.append(f"{kind} mobjects: {info.hits} of {calls} reused ({info.hits / calls:.0%})")
+    return '\n'.join(lines)
 
-        text_color = shape_info.get('text_color', {'val': '#000000'})  # Default to black if not provided
 
-        # Ensure text_color is not None and has a 'val' key
+def get_line_points(shape_info):
+    """Start and end point of a line record.
 
-        if text_color is None:
-            text_color = {'val': '#000000'}
+    Connectors store their two end points; a line drawn as an auto shape only
+    has its box, so the line runs across the box from corner to corner.
+    """
+    start_point, end_point = shape_info.dimensions
+    if isinstance(start_point, tuple):
+        return start_point, end_point
+    width, height = start_point, end_point
+    return (-width / 2, height / 2, 0), (width / 2, -height / 2, 0)
 
-        if font_size is None:
-            font_size = 24
-        mobject = Text(
 
-            shape_info['text'],
+def create_mobject(shape_info, image_variants=None, table_cell_limit=TABLE_CELL_LIMIT):
+    """Create a Manim mobject based on a ShapeRecord.
 
-            font_size=font_size,
+    Records from main.py's extraction (lower-case types) are built the same
+    way as in the generated code, so a direct render matches a rendered script.
+    Pictures are drawn from `image_variants` (image_store.ImageVariants) when
+    given, and tables with more than `table_cell_limit` cells with Text cells.
+    """
+    mobject = None
+    if shape_info.type == 'rectangle':
+        mobject = Rectangle(
+            width=shape_info.dimensions[0],
+            height=shape_info.dimensions[1],
+            color=BLACK
+        )
+    elif shape_info.type == 'oval':
+        mobject = Ellipse(width=shape_info.dimensions[0], height=shape_info.dimensions[1], color=BLACK)
+    elif shape_info.type == 'Oval':
+        mobject = Ellipse(
+            width=shape_info.dimensions[0],
+            height=shape_info.dimensions[1],
+        )
 
-            color=text_color['val']
+        # Apply the color if it exists
+        if shape_info.color:
+            mobject.set_fill(color=shape_info.color, opacity=1)
+            mobject.set_stroke(color=BLACK)  # You can adjust the width as needed
 
-        )
-    elif shape_info['type'] == 'image' and shape_info['image_path']:
-        mobject = ImageMobject(shape_info['image_path'])
-        mobject.width, mobject.height = shape_info['dimensions']
-    elif shape_info['type'] == 'Line':
-        start_point, end_point = shape_info['dimensions']
-        print(shape_info['color'])
-        if shape_info['dash_style'] == 'dashed':
-            mobject = DashedLine(start=start_point, end=end_point, color= ManimColor.from_rgb(shape_info['color']))
+    elif shape_info.type == 'text':
+        mobject = cached_text(wrap_text(shape_info.text, shape_info.dimensions), TEXT_FONT_SIZE, BLACK).copy()
+    elif shape_info.type == 'Text':
+        font_size = shape_info.font_size or 24
+
+        mobject = cached_text(
+            wrap_text(shape_info.text, shape_info.dimensions, font_size) if shape_info.text is not None else 'failed',
+            font_size,
+            '#000000'
+        ).copy()
+    elif shape_info.type == 'image' and shape_info.image_path:
+        image_path = image_variants.get_path(shape_info.image_path, shape_info.dimensions) \
+            if image_variants else shape_info.image_path
+        mobject = cached_image(image_path).copy()
+        mobject.width, mobject.height = shape_info.dimensions
+    elif shape_info.type in ('line', 'Line'):
+        start_point, end_point = get_line_points(shape_info)
+        color = shape_info.color or '000000'
+        color = ManimColor(color if color.startswith('#') else f"#{color}")
+        if shape_info.dash_style == 'dashed':
+            mobject = DashedLine(start=start_point, end=end_point, color=color)
         else:
-            mobject = Line(start=start_point, end=end_point, color= ManimColor.from_rgb(shape_info['color']))
-    elif shape_info['type'] == 'arrow':
-        start_point, end_point = shape_info['dimensions']
-        mobject = Arrow(start=start_point, end=end_point, color=BLACK, stroke_width=1, max_stroke_width_to_length_ratio=1, max_tip_length_to_length_ratio=0.1)
-    elif shape_info['type'] == 'table':
-        table_data = shape_info['table_data']
-        mobject = MathTable(
-            table_data,
-            include_outer_lines=True,
-            line_config={"stroke_color": BLACK, "stroke_width": 2},
-            element_to_mobject_config={"color": BLACK},
-        )
-        mobject.scale(0.2)  # Scale down the table to fit the scene
+            mobject = Line(start=start_point, end=end_point, color=color)
+    elif shape_info.type == 'arrow':
+        start_point, end_point = shape_info.dimensions
+        mobject = Arrow(start=start_point, end=end_point, color=BLACK, buff=1, max_tip_length_to_length_ratio=0.1,
+                        stroke_width=shape_info.width)
+    elif shape_info.type == 'table':
+        mobject = cached_table(tuple(tuple(row) for row in shape_info.table_data), table_cell_limit).copy()
 
-    if mobject and shape_info['position']:
-        mobject.move_to(shape_info['position'])
+    if mobject and shape_info.position:
+        mobject.move_to(shape_info.position)
 
     return mobject
+
+
 class PresentationScene(Slide):
-    def __init__(self, slides_shapes_info, background_color=None, **kwargs):
+    def __init__(self, slides_shapes_info, background_color=None, image_variants=None,
+                 table_cell_limit=TABLE_CELL_LIMIT, **kwargs):
         self.slides_shapes_info = slides_shapes_info
+        self.scene_background_color = background_color if background_color is not None else WHITE
+        self.image_variants = image_variants
+        self.table_cell_limit = table_cell_limit
         super().__init__(**kwargs)
 
     def initialize_slide(self, slide_shapes_info):
-        """Initialize shapes for a slide."""
+        """Initialize shapes for a slide; returns the mobjects added."""
+        mobjects = []
         for shape_info in slide_shapes_info:
-            mobject = create_mobject(shape_info)
+            mobject = create_mobject(shape_info, self.image_variants, self.table_cell_limit)
             if mobject:
                 self.add(mobject)
+                mobjects.append(mobject)
+        return mobjects
 
     def construct(self):
-        self.camera.background_color = background_color
+        self.camera.background_color = self.scene_background_color
+        layer = None
+        slide_mobjects = []
         for slide_shapes_info in self.slides_shapes_info:
-            self.clear()  # Clear all shapes from the previous slide
-            self.initialize_slide(slide_shapes_info)
-            self.wait(1)
+            # Shapes from the master and layout stay on screen while consecutive slides show the same ones
+            slide_layer = [shape_info.to_dict() for shape_info in slide_shapes_info if shape_info.layer is not None]
+            if slide_layer and slide_layer == layer:
+                self.remove(*slide_mobjects)
+            else:
+                self.clear()  # Clear all shapes from the previous slide
+                self.initialize_slide([shape_info for shape_info in slide_shapes_info if shape_info.layer is not None])
+                layer = slide_layer
+            slide_mobjects = self.initialize_slide(
+                [shape_info for shape_info in slide_shapes_info if shape_info.layer is None])
+            # A static slide is a single frame, held by manim-slides until the next slide
+            self.wait(1 / config.frame_rate if is_static_slide(slide_shapes_info) else 1)
             self.next_slide()
-def main():
-    # Load the presentation
-    presentation = Presentation('presentations/PathPlanning.pptx')
-
-    # Get the theme part from the related parts of the presentation
-    theme_part = None
-    for rel in presentation.part.rels.values():
-        if "theme" in rel.target_ref:
-            theme_part = rel.target_part
-            break
 
-    # Get the theme XML (if any)
-    theme_xml = theme_part._blob.decode() if theme_part else None
 
-    # Extract color values from the theme XML
-    color_values = extract_color_values_from_theme(theme_xml) if theme_xml else {}
+def render_slides(slides_shapes_info, frame_width, frame_height, scene_name='GeneratedPresentation',
+                  quality='low_quality', background_color=None, image_variants=None,
+                  table_cell_limit=TABLE_CELL_LIMIT):
+    """Render ShapeRecords in this process as a PresentationScene named `scene_name`.
 
-    # Get the Master Slide XML
-    master_slide = presentation.slide_master
-    master_slide_xml = master_slide._element.xml
-    master_slide_clr_mapping = extract_master_slide_clr_mapping(master_slide_xml)
+    The scene class takes the given name so its video and manim-slides files
+    are named like those of a rendered script.
+    """
+    scene_class = type(scene_name, (PresentationScene,), {})
+    with tempconfig({'quality': quality, 'frame_width': frame_width, 'frame_height': frame_height}):
+        scene = scene_class(slides_shapes_info, background_color, image_variants, table_cell_limit)
+        scene.render()
+    report = get_mobject_cache_report()
+    if report:
+        print(report)
 
-    # Map master slide colors to actual color values
-    final_color_mapping = map_colors_to_values(master_slide_clr_mapping, color_values)
 
-    # Extract color values from theme
-    theme_colors = parse_theme_colors(theme_xml) if theme_xml else {}
+def main():
+    # Load the presentation
+    presentation_path = 'presentations/PathPlanning.pptx'
+    presentation = Presentation(presentation_path)
 
     # Extract shape info
     slides_shapes_info = []  # Store shapes info for all slides
@@ -367,20 +313,30 @@ def main():
 
     # Optionally set Manim's pixel resolution to match PowerPoint's
     config.pixel_width = int(slide_width_in_inches * config.pixel_height / slide_height_in_inches)
-    for slide in presentation.slides:
-        slide_xml = slide._element.xml
+    # Read the raw slide XML from the zip instead of serializing python-pptx's element tree.
+    # Each slide gets the theme and color map of its own layout -> master chain; masters,
+    # layouts and themes are parsed once and shared between slides.
+    with zipfile.ZipFile(presentation_path) as package:
+        theme_resolver = ThemeResolver(package)
+        slides_xml = []
+        for member in pptx_package.get_slide_members(package):
+            slide_root = etree.fromstring(package.read(member))
+            slides_xml.append((slide_root, theme_resolver.get_resolver(member, slide_root)))
+
+    for slide_index, (slide_xml, color_resolver) in enumerate(slides_xml):
 
         # Extract shape info for the current slide
-        slide_shape_info = extract_shape_info(slide_xml, master_slide_clr_mapping, theme_colors)
+        slide_shape_info = extract_shape_info(slide_xml, color_resolver.clr_map, color_resolver.theme_colors,
+                                              color_resolver, slide_index)
 
         # Convert positions for shapes on the slide
 
 
         for shape_info in slide_shape_info:
-            if shape_info.get('position'):
-                shape_info['position'] = convert_position(
+            if shape_info.position:
+                shape_info.position = tuple(convert_position(
                     shape_info,
-                )
+                ))
 
         # Append the shape info for the current slide to the list
         slides_shapes_info.append(slide_shape_info)